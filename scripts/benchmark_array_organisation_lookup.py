@@ -0,0 +1,60 @@
+import json
+import pickle
+import tracemalloc
+from tempfile import TemporaryDirectory
+from timeit import timeit
+
+from prmdata.domain.ods_portal.array_organisation_lookup import ArrayOrganisationLookup
+from prmdata.domain.ods_portal.organisation_metadata_monthly import construct_organisation_lookup
+from scripts.benchmark_ods_lookup_load import PRACTICE_COUNT, _organisation_metadata_json
+
+LOOKUP_COUNT = 100_000
+
+
+def _allocated_mib(build):
+    tracemalloc.start()
+    lookup = build()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return lookup, allocated / 2**20
+
+
+def _look_up(organisation_lookup, asids):
+    for asid in asids:
+        ods_code = organisation_lookup.practice_ods_code_from_asid(asid)
+        organisation_lookup.sicbl_ods_code_from_practice_ods_code(ods_code)
+
+
+def run_benchmark():
+    organisation_metadata = json.loads(_organisation_metadata_json())
+    asids = [f"{index % PRACTICE_COUNT:012d}" for index in range(LOOKUP_COUNT)]
+    with TemporaryDirectory() as directory:
+        path = f"{directory}/lookup.arrow"
+        with open(path, "wb") as file:
+            file.write(
+                ArrayOrganisationLookup.from_organisation_lookup(
+                    construct_organisation_lookup(organisation_metadata)
+                ).buffer.to_pybytes()
+            )
+
+        dict_lookup, dict_mib = _allocated_mib(
+            lambda: construct_organisation_lookup(organisation_metadata)
+        )
+        array_lookup, array_mib = _allocated_mib(lambda: ArrayOrganisationLookup.open(path))
+        dict_seconds = timeit(lambda: _look_up(dict_lookup, asids), number=1)
+        array_seconds = timeit(lambda: _look_up(array_lookup, asids), number=1)
+
+        print(f"{PRACTICE_COUNT} practices, {LOOKUP_COUNT} lookups")
+        print(
+            f"  dicts:             {dict_mib:.2f} MiB heap, {len(pickle.dumps(dict_lookup))} B"
+            f" pickled, {dict_seconds:.2f}s"
+        )
+        print(
+            f"  memory-mapped:     {array_mib:.2f} MiB heap, {len(pickle.dumps(array_lookup))} B"
+            f" pickled, {array_seconds:.2f}s"
+        )
+        print(f"  mapped buffer:     {array_lookup.buffer.size / 2**20:.2f} MiB shared")
+
+
+if __name__ == "__main__":
+    run_benchmark()
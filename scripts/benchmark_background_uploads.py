@@ -0,0 +1,73 @@
+import random
+import time
+from timeit import timeit
+
+from prmdata.pipeline.arrow import TransferTableBuilder
+from prmdata.utils.background_tasks import BackgroundTasks
+from prmdata.utils.input_output.s3 import S3DataManager
+from scripts import benchmark_parquet_options
+from scripts.benchmark_parquet_options import _transfers
+
+DAY_COUNT = 30
+TRANSFERS_PER_DAY = 10_000
+UPLOAD_LATENCY_SECONDS = 0.25
+WORKER_COUNTS = [0, 1, 2, 4]
+
+
+# Stands in for S3, taking a fixed time to accept each upload
+class _SlowObject:
+    def put(self, Body, Metadata):
+        time.sleep(UPLOAD_LATENCY_SECONDS)
+
+
+class _SlowS3DataManager(S3DataManager):
+    def __init__(self):
+        super().__init__(client=None)
+
+    def _object_from_uri(self, uri: str):
+        return _SlowObject()
+
+
+# As in SpineRunner, each day's upload is submitted as soon as the day has been classified, so
+# it overlaps classifying the following days.
+def _classify_and_upload(daily_transfers, worker_count: int):
+    s3_manager = _SlowS3DataManager()
+    with BackgroundTasks(worker_count, thread_name_prefix="upload") as uploads:
+        for day, transfers in enumerate(daily_transfers):
+            builder = TransferTableBuilder()
+            for transfer in transfers:
+                builder.add(transfer)
+            table = builder.build()
+            uploads.submit(
+                lambda table=table, day=day: s3_manager.write_parquet(
+                    table, f"s3://a-bucket/{day}-transfers.parquet", {}
+                )
+            )
+
+
+def _classify(daily_transfers):
+    for transfers in daily_transfers:
+        builder = TransferTableBuilder()
+        for transfer in transfers:
+            builder.add(transfer)
+        builder.build()
+
+
+def run_benchmark():
+    benchmark_parquet_options.TRANSFER_COUNT = TRANSFERS_PER_DAY
+    random.seed(0)
+    daily_transfers = [list(_transfers()) for _ in range(DAY_COUNT)]
+    print(
+        f"{DAY_COUNT} days of {TRANSFERS_PER_DAY} transfers, {UPLOAD_LATENCY_SECONDS}s per upload"
+    )
+    print(f"  total upload latency: {DAY_COUNT * UPLOAD_LATENCY_SECONDS:.1f}s")
+    classify_seconds = timeit(lambda: _classify(daily_transfers), number=1)
+    print(f"  classifying every day (the work uploads overlap): {classify_seconds:.1f}s")
+    for worker_count in WORKER_COUNTS:
+        seconds = timeit(lambda: _classify_and_upload(daily_transfers, worker_count), number=1)
+        label = "uploading in turn" if worker_count == 0 else f"{worker_count} upload workers"
+        print(f"  {label:18}: {seconds:.1f}s to classify and upload")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,88 @@
+import logging
+import random
+import tracemalloc
+from datetime import datetime, timedelta
+
+from prmdata.domain.gp2gp.transfer_service import TransferService, TransferServiceObservabilityProbe
+from prmdata.domain.ods_portal.organisation_lookup import OrganisationLookup
+from prmdata.domain.spine.gp2gp_conversation import assign_conversations_to_days
+from prmdata.pipeline.arrow import convert_transfers_to_table
+from prmdata.pipeline.daily_transfers import build_daily_transfer_tables
+from scripts.benchmark_gp2gp_conversation import _build_conversation_messages
+
+CONVERSATION_COUNT = 50_000
+CUTOFF = timedelta(days=14)
+ORGANISATION_LOOKUPS = {
+    datetime(2022, 1, 10): OrganisationLookup(practices=[], sicbls=[], year_month=(2022, 1))
+}
+
+
+def _gp2gp_conversations(transfer_service, messages):
+    conversations = transfer_service.group_into_conversations(messages)
+    return transfer_service.parse_conversations_into_gp2gp_conversations(conversations)
+
+
+def _classify_materialised(transfer_service, messages):
+    gp2gp_conversations = list(_gp2gp_conversations(transfer_service, messages))
+    conversations_by_day = {
+        daily_start_datetime: [] for daily_start_datetime in ORGANISATION_LOOKUPS
+    }
+    for daily_start_datetime, conversation in assign_conversations_to_days(
+        gp2gp_conversations, list(ORGANISATION_LOOKUPS)
+    ):
+        conversations_by_day[daily_start_datetime].append(conversation)
+    transfers_by_day = {
+        daily_start_datetime: list(
+            transfer_service.convert_to_transfers(
+                conversations_by_day[daily_start_datetime], organisation_lookup
+            )
+        )
+        for daily_start_datetime, organisation_lookup in ORGANISATION_LOOKUPS.items()
+    }
+    return {
+        daily_start_datetime: convert_transfers_to_table(transfers)
+        for daily_start_datetime, transfers in transfers_by_day.items()
+    }
+
+
+def _classify_streaming(transfer_service, messages):
+    return dict(
+        build_daily_transfer_tables(
+            transfer_service, _gp2gp_conversations(transfer_service, messages), ORGANISATION_LOOKUPS
+        )
+    )
+
+
+# The messages are built before tracing starts, so the peak only counts what classification
+# holds on to: the grouped conversations, their parsed features and the transfers.
+def _peak_bytes(classify) -> int:
+    random.seed(0)
+    messages = [
+        message
+        for index in range(CONVERSATION_COUNT)
+        for message in _build_conversation_messages(index)
+    ]
+    transfer_service = TransferService(
+        cutoff=CUTOFF, observability_probe=TransferServiceObservabilityProbe()
+    )
+    tracemalloc.start()
+    transfer_tables = classify(transfer_service, messages)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del transfer_tables
+    return peak
+
+
+def run_benchmark():
+    logging.disable(logging.WARNING)
+    materialised_peak = _peak_bytes(_classify_materialised)
+    streaming_peak = _peak_bytes(_classify_streaming)
+
+    print(f"{CONVERSATION_COUNT} conversations classified")
+    print(f"  materialised: {materialised_peak / 2 ** 20:.1f} MiB")
+    print(f"  streaming:    {streaming_peak / 2 ** 20:.1f} MiB")
+    print(f"  reduction:    {1 - streaming_peak / materialised_peak:.1%}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
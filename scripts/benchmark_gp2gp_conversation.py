@@ -0,0 +1,119 @@
+import random
+import tracemalloc
+from datetime import datetime, timedelta
+from timeit import timeit
+from unittest.mock import Mock
+
+from prmdata.domain.gp2gp.transfer_outcome import TransferOutcome
+from prmdata.domain.spine.gp2gp_conversation import Gp2gpConversation
+from prmdata.domain.spine.message import (
+    APPLICATION_ACK,
+    COMMON_POINT_TO_POINT,
+    EHR_REQUEST_COMPLETED,
+    EHR_REQUEST_STARTED,
+    Message,
+)
+
+CONVERSATION_COUNT = 50_000
+PRACTICE_COUNT = 7_000
+REPEATS = 1
+
+
+class _ConversationBuilder:
+    def __init__(self, index: int):
+        self._conversation_id = f"conversation-{index}"
+        self._requesting_asid = f"{random.randrange(PRACTICE_COUNT):012d}"
+        self._sending_asid = f"{random.randrange(PRACTICE_COUNT):012d}"
+        self._time = datetime(2022, 1, 10) + timedelta(seconds=random.randrange(86_400))
+        self.messages = []
+
+    def add(self, interaction_id, from_requester, message_ref=None, error_code=None):
+        self._time += timedelta(minutes=random.randrange(1, 120))
+        guid = f"{self._conversation_id}-{len(self.messages)}"
+        self.messages.append(
+            Message(
+                time=self._time,
+                conversation_id=self._conversation_id,
+                guid=guid,
+                interaction_id=interaction_id,
+                from_party_asid=self._requesting_asid if from_requester else self._sending_asid,
+                to_party_asid=self._sending_asid if from_requester else self._requesting_asid,
+                message_ref=message_ref,
+                error_code=error_code,
+                from_system="SupplierA" if from_requester else "SupplierB",
+                to_system="SupplierB" if from_requester else "SupplierA",
+            )
+        )
+        return guid
+
+
+def _build_conversation_messages(index: int):
+    builder = _ConversationBuilder(index)
+    request = builder.add(EHR_REQUEST_STARTED, from_requester=True)
+    builder.add(APPLICATION_ACK, from_requester=False, message_ref=request)
+    ehr = builder.add(EHR_REQUEST_COMPLETED, from_requester=False)
+
+    for _ in range(random.choice([0, 0, 2, 5, 20])):
+        if random.random() < 0.2:
+            builder.add(COMMON_POINT_TO_POINT, from_requester=True)
+        fragment = builder.add(COMMON_POINT_TO_POINT, from_requester=False)
+        if random.random() < 0.95:
+            builder.add(APPLICATION_ACK, from_requester=True, message_ref=fragment)
+
+    if random.random() < 0.9:
+        error_code = random.choice([None, None, None, 15, 12, 30])
+        builder.add(APPLICATION_ACK, from_requester=True, message_ref=ehr, error_code=error_code)
+    return builder.messages
+
+
+def _classify(conversation: Gp2gpConversation):
+    completed_time = conversation.effective_request_completed_time()
+    final_ack_time = conversation.effective_final_acknowledgement_time()
+    sla_duration = final_ack_time - completed_time if final_ack_time and completed_time else None
+    return (
+        TransferOutcome.from_gp2gp_conversation(conversation, sla_duration).status,
+        conversation.sender_error_codes(),
+        conversation.final_error_codes(),
+        conversation.intermediate_error_codes(),
+        conversation.date_requested(),
+        conversation.last_sender_message_timestamp(),
+    )
+
+
+def _construct_and_classify(conversation_messages, probe):
+    return [_classify(Gp2gpConversation(messages, probe)) for messages in conversation_messages]
+
+
+def _retained_bytes(probe) -> int:
+    random.seed(0)
+    tracemalloc.start()
+    conversations = [
+        Gp2gpConversation(_build_conversation_messages(i), probe) for i in range(CONVERSATION_COUNT)
+    ]
+    retained_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del conversations
+    return retained_bytes
+
+
+def run_benchmark():
+    random.seed(0)
+    probe = Mock()
+    conversation_messages = [_build_conversation_messages(i) for i in range(CONVERSATION_COUNT)]
+    message_count = sum(len(messages) for messages in conversation_messages)
+
+    seconds = (
+        timeit(lambda: _construct_and_classify(conversation_messages, probe), number=REPEATS)
+        / REPEATS
+    )
+    retained_bytes = _retained_bytes(probe)
+
+    print(f"{CONVERSATION_COUNT} conversations ({message_count} messages)")
+    print(f"  construct and classify: {seconds / CONVERSATION_COUNT * 1e6:.1f} us per conversation")
+    print(
+        f"  retained after build:   {retained_bytes / CONVERSATION_COUNT:.0f} bytes per conversation"
+    )
+
+
+if __name__ == "__main__":
+    run_benchmark()
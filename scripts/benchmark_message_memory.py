@@ -0,0 +1,104 @@
+import random
+import tracemalloc
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from prmdata.domain.spine.message import (
+    APPLICATION_ACK,
+    COMMON_POINT_TO_POINT,
+    EHR_REQUEST_COMPLETED,
+    EHR_REQUEST_STARTED,
+    construct_messages_from_splunk_items,
+)
+from prmdata.utils.date_converter import parse_timestamp
+
+MESSAGE_COUNT = 200_000
+PRACTICE_COUNT = 5_000
+INTERACTION_IDS = [
+    EHR_REQUEST_STARTED,
+    EHR_REQUEST_COMPLETED,
+    APPLICATION_ACK,
+    COMMON_POINT_TO_POINT,
+]
+SYSTEMS = ["SupplierA", "SupplierB", "SupplierC", "Unknown"]
+
+
+class NamedTupleMessage(NamedTuple):
+    time: datetime
+    conversation_id: str
+    guid: str
+    interaction_id: str
+    from_party_asid: str
+    to_party_asid: str
+    message_ref: Optional[str]
+    error_code: Optional[int]
+    from_system: Optional[str]
+    to_system: Optional[str]
+
+
+def _copy(value: str) -> str:
+    # Each value read from a CSV is a distinct string object
+    return (value + ".")[:-1]
+
+
+def _splunk_items(count: int):
+    asids = [f"{random.randrange(10 ** 12):012d}" for _ in range(PRACTICE_COUNT)]
+    for i in range(count):
+        yield {
+            "_time": f"2022-01-10 {i % 24:02d}:{i % 60:02d}:{i % 60:02d}.{i % 1000:03d} UTC",
+            "conversationID": f"{random.getrandbits(128):032x}",
+            "GUID": f"{random.getrandbits(128):032x}",
+            "interactionID": _copy(random.choice(INTERACTION_IDS)),
+            "messageSender": _copy(random.choice(asids)),
+            "messageRecipient": _copy(random.choice(asids)),
+            "messageRef": "NotProvided",
+            "jdiEvent": "NONE",
+            "fromSystem": _copy(random.choice(SYSTEMS)),
+            "toSystem": _copy(random.choice(SYSTEMS)),
+        }
+
+
+def _peak_bytes(build) -> int:
+    random.seed(0)
+    tracemalloc.start()
+    messages = build(_splunk_items(MESSAGE_COUNT))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del messages
+    return peak
+
+
+def _build_named_tuples(items):
+    return [
+        NamedTupleMessage(
+            time=parse_timestamp(item["_time"]),
+            conversation_id=item["conversationID"],
+            guid=item["GUID"],
+            interaction_id=item["interactionID"],
+            from_party_asid=item["messageSender"],
+            to_party_asid=item["messageRecipient"],
+            message_ref=None,
+            error_code=None,
+            from_system=item["fromSystem"],
+            to_system=item["toSystem"],
+        )
+        for item in items
+    ]
+
+
+def _build_messages(items):
+    return list(construct_messages_from_splunk_items(items))
+
+
+def run_benchmark():
+    named_tuple_peak = _peak_bytes(_build_named_tuples)
+    message_peak = _peak_bytes(_build_messages)
+
+    print(f"{MESSAGE_COUNT} messages held in memory")
+    print(f"  NamedTuple with raw strings: {named_tuple_peak / 2 ** 20:.1f} MiB")
+    print(f"  Message:                     {message_peak / 2 ** 20:.1f} MiB")
+    print(f"  reduction:                   {1 - message_peak / named_tuple_peak:.1%}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,50 @@
+import logging
+import os
+from timeit import timeit
+
+from prmdata.domain.gp2gp.transfer_service import (
+    AggregatingTransferServiceObservabilityProbe,
+    TransferServiceObservabilityProbe,
+)
+from prmdata.utils.input_output.json_formatter import JsonFormatter
+
+EVENT_COUNT = 200_000
+UNKNOWN_ASID_COUNT = 10
+SAMPLE_SIZE = 5
+
+
+def _json_logger() -> logging.Logger:
+    logger = logging.getLogger("benchmark_observability_probe")
+    logger.propagate = False
+    handler = logging.StreamHandler(open(os.devnull, "w"))
+    handler.setFormatter(JsonFormatter())
+    logger.addHandler(handler)
+    return logger
+
+
+def _record_unknown_asids(probe):
+    for index in range(EVENT_COUNT):
+        probe.record_no_ods_code_for_asid(f"conversation-{index}", f"{index % UNKNOWN_ASID_COUNT}")
+    probe.flush()
+
+
+def run_benchmark():
+    logger = _json_logger()
+    per_event_seconds = timeit(
+        lambda: _record_unknown_asids(TransferServiceObservabilityProbe(logger=logger)), number=1
+    )
+    aggregating_seconds = timeit(
+        lambda: _record_unknown_asids(
+            AggregatingTransferServiceObservabilityProbe(SAMPLE_SIZE, logger=logger)
+        ),
+        number=1,
+    )
+
+    print(f"{EVENT_COUNT} unknown ODS code events over {UNKNOWN_ASID_COUNT} ASIDs")
+    print(f"  log line per event: {per_event_seconds:.2f}s")
+    print(f"  aggregated:         {aggregating_seconds:.2f}s")
+    print(f"  speedup:            {per_event_seconds / aggregating_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark()
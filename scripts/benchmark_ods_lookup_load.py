@@ -0,0 +1,58 @@
+import json
+from tempfile import TemporaryDirectory
+from timeit import timeit
+
+from prmdata.domain.ods_portal.organisation_metadata_monthly import construct_organisation_lookup
+from prmdata.pipeline.ods_lookup_cache import CompiledOdsLookupCache
+from prmdata.utils.input_output.disk_cache import S3ObjectDiskCache
+
+PRACTICE_COUNT = 7_000
+SICBL_COUNT = 100
+REPEATS = 10
+OBJECT_URI = "s3://ods-metadata/v5/2022/1/organisationMetadata.json"
+
+
+def _organisation_metadata_json() -> bytes:
+    return json.dumps(
+        {
+            "generated_on": "2022-02-01T00:00:00.000000+00:00",
+            "year": 2022,
+            "month": 1,
+            "practices": [
+                {"ods_code": f"P{index}", "name": f"Practice {index}", "asids": [f"{index:012d}"]}
+                for index in range(PRACTICE_COUNT)
+            ],
+            "sicbls": [
+                {
+                    "ods_code": f"S{index}",
+                    "name": f"SICBL {index}",
+                    "practices": [
+                        f"P{practice}" for practice in range(index, PRACTICE_COUNT, SICBL_COUNT)
+                    ],
+                }
+                for index in range(SICBL_COUNT)
+            ],
+        }
+    ).encode("utf8")
+
+
+def run_benchmark():
+    body = _organisation_metadata_json()
+    with TemporaryDirectory() as cache_directory:
+        cache = CompiledOdsLookupCache(S3ObjectDiskCache(cache_directory, 1024 * 1024 * 1024))
+        cache.write(OBJECT_URI, "an-e-tag", construct_organisation_lookup(json.loads(body)))
+
+        json_seconds = timeit(
+            lambda: construct_organisation_lookup(json.loads(body.decode("utf8"))),
+            number=REPEATS,
+        )
+        compiled_seconds = timeit(lambda: cache.read(OBJECT_URI, "an-e-tag"), number=REPEATS)
+
+    print(f"{PRACTICE_COUNT} practices, {SICBL_COUNT} SICBLs ({len(body) / 2 ** 20:.1f} MiB JSON)")
+    print(f"  parse JSON:         {json_seconds / REPEATS * 1000:.1f}ms per month")
+    print(f"  map compiled Arrow: {compiled_seconds / REPEATS * 1000:.1f}ms per month")
+    print(f"  speedup:            {json_seconds / compiled_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark()
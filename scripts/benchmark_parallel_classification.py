@@ -0,0 +1,115 @@
+import os
+import random
+from datetime import datetime, timedelta
+from timeit import timeit
+
+import pyarrow as pa
+
+from prmdata.domain.gp2gp.transfer_service import TransferService, TransferServiceObservabilityProbe
+from prmdata.domain.spine.message import SPLUNK_COLUMNS
+from prmdata.pipeline.arrow import (
+    SpineTable,
+    convert_spine_tables_to_messages,
+    sort_transfers_by_conversation_id,
+)
+from prmdata.pipeline.daily_transfers import build_daily_transfer_tables
+from prmdata.pipeline.parallel_classification import (
+    PartitionClassificationSettings,
+    classify_partitions_in_parallel,
+    partition_spine_tables,
+)
+from scripts.benchmark_gp2gp_conversation import _build_conversation_messages
+from scripts.benchmark_vectorised_classification import _build_organisation_lookup
+
+CONVERSATION_COUNT = 100_000
+CUTOFF = timedelta(days=14)
+DAILY_START_DATETIME = datetime(2022, 1, 10)
+WORKER_COUNTS = [1, 2, 4, 8, 16]
+
+
+# The Splunk CSV columns as read_gzip_csv_table returns them, so both modes start from what is
+# read from S3 and pay for building the messages.
+def _splunk_table(messages):
+    rows = [
+        (
+            message.time.isoformat(),
+            message.conversation_id,
+            message.guid,
+            message.interaction_id,
+            message.from_party_asid,
+            message.to_party_asid,
+            message.message_ref or "NotProvided",
+            "NONE" if message.error_code is None else str(message.error_code),
+            message.from_system,
+            message.to_system,
+        )
+        for message in messages
+    ]
+    return pa.table(
+        {
+            name: pa.array(values, type=pa.string())
+            for name, values in zip(SPLUNK_COLUMNS, zip(*rows))
+        }
+    )
+
+
+def _classify_serially(spine_tables, settings):
+    transfer_service = TransferService(
+        cutoff=CUTOFF, observability_probe=TransferServiceObservabilityProbe()
+    )
+    conversations = transfer_service.group_into_conversations(
+        convert_spine_tables_to_messages(spine_tables)
+    )
+    gp2gp_conversations = transfer_service.parse_conversations_into_gp2gp_conversations(
+        conversations
+    )
+    return dict(
+        build_daily_transfer_tables(
+            transfer_service, gp2gp_conversations, settings.organisation_lookups
+        )
+    )
+
+
+def _classify_in_parallel(spine_tables, settings, worker_count):
+    partitions = partition_spine_tables(spine_tables, worker_count)
+    return classify_partitions_in_parallel(partitions, settings)
+
+
+def run_benchmark():
+    random.seed(0)
+    messages = [
+        message
+        for index in range(CONVERSATION_COUNT)
+        for message in _build_conversation_messages(index)
+    ]
+    messages.sort(key=lambda message: message.time)
+    spine_tables = [SpineTable(_splunk_table(messages), is_parsed=False)]
+    settings = PartitionClassificationSettings(
+        cutoff=CUTOFF,
+        organisation_lookups={DAILY_START_DATETIME: _build_organisation_lookup(messages)},
+    )
+
+    expected = _classify_serially(spine_tables, settings)[DAILY_START_DATETIME]
+    actual = _classify_in_parallel(spine_tables, settings, 2)[DAILY_START_DATETIME]
+    assert sort_transfers_by_conversation_id(actual).equals(
+        sort_transfers_by_conversation_id(expected)
+    ), "parallel and serial classification disagree"
+
+    print(f"{CONVERSATION_COUNT} conversations ({len(messages)} messages)")
+    print(f"{os.cpu_count()} CPU cores available")
+    partition_seconds = timeit(lambda: partition_spine_tables(spine_tables, 16), number=1)
+    print(f"  partitioning into 16: {partition_seconds:.2f}s")
+    serial_seconds = timeit(lambda: _classify_serially(spine_tables, settings), number=1)
+    print(f"  serial:     {serial_seconds:.2f}s")
+    for worker_count in WORKER_COUNTS:
+        parallel_seconds = timeit(
+            lambda: _classify_in_parallel(spine_tables, settings, worker_count), number=1
+        )
+        print(
+            f"  {worker_count:2d} workers: {parallel_seconds:.2f}s"
+            f" ({serial_seconds / parallel_seconds:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,171 @@
+import random
+import uuid
+from datetime import datetime, timedelta
+from io import BytesIO
+from timeit import timeit
+
+import pyarrow.compute as pc
+from pyarrow import parquet
+
+from prmdata.domain.gp2gp.transfer import Practice, Transfer
+from prmdata.domain.gp2gp.transfer_outcome import (
+    TransferFailureReason,
+    TransferOutcome,
+    TransferStatus,
+)
+from prmdata.pipeline.arrow import convert_transfers_to_table
+from prmdata.pipeline.config import DEFAULT_PARQUET_DICTIONARY_COLUMNS
+from prmdata.utils.input_output.parquet_options import ParquetWriteOptions
+from prmdata.utils.input_output.s3 import S3DataManager
+
+TRANSFER_COUNT = 100_000
+PRACTICE_COUNT = 7_000
+SICBL_COUNT = 100
+SUPPLIERS = ["EMIS", "SystmOne", "Vision"]
+DAY_START = datetime(2022, 1, 10)
+REPEATS = 5
+
+PRESETS = {
+    "current output": ParquetWriteOptions(row_group_size=TRANSFER_COUNT),
+    "zstd 3": ParquetWriteOptions(compression="zstd", compression_level=3),
+    "categorical dictionary, snappy": ParquetWriteOptions(
+        dictionary_columns=DEFAULT_PARQUET_DICTIONARY_COLUMNS
+    ),
+    "categorical dictionary, zstd 3": ParquetWriteOptions(
+        dictionary_columns=DEFAULT_PARQUET_DICTIONARY_COLUMNS,
+        compression="zstd",
+        compression_level=3,
+    ),
+    "categorical dictionary, zstd 9": ParquetWriteOptions(
+        dictionary_columns=DEFAULT_PARQUET_DICTIONARY_COLUMNS,
+        compression="zstd",
+        compression_level=9,
+    ),
+    "categorical dictionary, zstd, 64k rows (default)": ParquetWriteOptions(
+        dictionary_columns=DEFAULT_PARQUET_DICTIONARY_COLUMNS,
+        compression="zstd",
+        row_group_size=65_536,
+    ),
+    "categorical dictionary, zstd 3, no stats": ParquetWriteOptions(
+        dictionary_columns=DEFAULT_PARQUET_DICTIONARY_COLUMNS,
+        compression="zstd",
+        compression_level=3,
+        write_statistics=False,
+    ),
+}
+
+
+def _practice(index: int) -> Practice:
+    sicbl = index % SICBL_COUNT
+    return Practice(
+        asid=f"{index:012d}",
+        supplier=SUPPLIERS[index % len(SUPPLIERS)],
+        ods_code=f"A{index:05d}",
+        name=f"Practice {index}",
+        sicbl_ods_code=f"{sicbl:02d}D",
+        sicbl_name=f"NHS Sub ICB Location {sicbl}",
+    )
+
+
+def _outcome() -> TransferOutcome:
+    if random.random() < 0.8:
+        return TransferOutcome(status=TransferStatus.INTEGRATED_ON_TIME, failure_reason=None)
+    return TransferOutcome(
+        status=random.choice([TransferStatus.TECHNICAL_FAILURE, TransferStatus.PROCESS_FAILURE]),
+        failure_reason=random.choice(list(TransferFailureReason)),
+    )
+
+
+def _transfers():
+    for index in range(TRANSFER_COUNT):
+        date_requested = DAY_START + timedelta(seconds=index * 86400 // TRANSFER_COUNT)
+        yield Transfer(
+            conversation_id=str(uuid.UUID(int=random.getrandbits(128))),
+            sla_duration=timedelta(seconds=random.randrange(3600 * 24 * 8)),
+            requesting_practice=_practice(random.randrange(PRACTICE_COUNT)),
+            sending_practice=_practice(random.randrange(PRACTICE_COUNT)),
+            sender_error_codes=[],
+            final_error_codes=random.choice([[], [], [], [30]]),
+            intermediate_error_codes=[],
+            outcome=_outcome(),
+            date_requested=date_requested,
+            date_completed=date_requested + timedelta(hours=random.randrange(48)),
+            last_sender_message_timestamp=date_requested + timedelta(minutes=random.randrange(60)),
+        )
+
+
+# Stands in for S3, keeping what is uploaded in memory
+class _InMemoryObject:
+    def __init__(self):
+        self.body = BytesIO()
+
+    def put(self, Body, Metadata):
+        self.body.write(Body.getbuffer())
+
+    def initiate_multipart_upload(self, Metadata):
+        return self
+
+    def Part(self, part_number):
+        return self
+
+    def upload(self, Body):
+        self.body.write(Body)
+        return {"ETag": "an-e-tag"}
+
+    def complete(self, MultipartUpload):
+        pass
+
+
+class _InMemoryS3DataManager(S3DataManager):
+    def __init__(self, parquet_options: ParquetWriteOptions):
+        super().__init__(client=None, parquet_options=parquet_options)
+        self.s3_object = _InMemoryObject()
+
+    def _object_from_uri(self, uri: str):
+        return self.s3_object
+
+
+def _write(transfers, parquet_options: ParquetWriteOptions) -> bytes:
+    s3_manager = _InMemoryS3DataManager(parquet_options)
+    s3_manager.write_parquet(transfers, "s3://a-bucket/transfers.parquet", {})
+    return s3_manager.s3_object.body.getvalue()
+
+
+# A typical downstream query: failed transfers per SICBL, reading only the columns it needs
+def _scan(body: bytes):
+    table = parquet.read_table(
+        BytesIO(body),
+        columns=["requesting_practice_sicbl_name", "status"],
+        filters=[("status", "!=", "Integrated on time")],
+    )
+    return table.group_by("requesting_practice_sicbl_name").aggregate([("status", "count")])
+
+
+def _read_all(body: bytes):
+    return parquet.read_table(BytesIO(body))
+
+
+def run_benchmark():
+    random.seed(0)
+    transfers = convert_transfers_to_table(_transfers())
+    expected = transfers
+
+    print(f"{TRANSFER_COUNT} transfers")
+    print(f"  {'preset':50} {'size':>9} {'write':>7} {'read all':>9} {'scan':>7}")
+    for name, parquet_options in PRESETS.items():
+        body = _write(transfers, parquet_options)
+        assert _read_all(body).equals(expected), f"{name} does not round trip"
+        assert pc.sum(_scan(body)["status_count"]).as_py() > 0
+        write_seconds = timeit(lambda: _write(transfers, parquet_options), number=REPEATS)
+        read_seconds = timeit(lambda: _read_all(body), number=REPEATS)
+        scan_seconds = timeit(lambda: _scan(body), number=REPEATS)
+        print(
+            f"  {name:50} {len(body) / 2 ** 20:7.2f}MiB"
+            f" {write_seconds / REPEATS * 1000:5.0f}ms"
+            f" {read_seconds / REPEATS * 1000:7.0f}ms"
+            f" {scan_seconds / REPEATS * 1000:5.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,114 @@
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from io import BytesIO
+from multiprocessing import get_context
+
+import pyarrow as pa
+from pyarrow import PythonFile, parquet
+
+from prmdata.domain.gp2gp.transfer import Practice, Transfer
+from prmdata.domain.gp2gp.transfer_outcome import TransferOutcome, TransferStatus
+from prmdata.pipeline.arrow import TransferTableBuilder
+from prmdata.utils.input_output.s3 import S3DataManager
+
+TRANSFER_COUNT = 300_000
+DATE_REQUESTED = datetime(2022, 1, 10)
+
+
+def _transfers():
+    for index in range(TRANSFER_COUNT):
+        yield Transfer(
+            conversation_id=str(uuid.UUID(int=index)),
+            sla_duration=timedelta(hours=index % 100),
+            requesting_practice=Practice(
+                f"{index % 7000:012d}", "SystmOne", f"A{index % 7000}", "A practice", "10D", "SICBL"
+            ),
+            sending_practice=Practice(
+                f"{index % 6000:012d}", "EMIS", f"B{index % 6000}", "B practice", "20D", "SICBL"
+            ),
+            sender_error_codes=[],
+            final_error_codes=[],
+            intermediate_error_codes=[],
+            outcome=TransferOutcome(status=TransferStatus.INTEGRATED_ON_TIME, failure_reason=None),
+            date_requested=DATE_REQUESTED,
+            date_completed=None,
+            last_sender_message_timestamp=None,
+        )
+
+
+# Stands in for S3, keeping only the size of what is uploaded
+class _DiscardingObject:
+    def __init__(self):
+        self.size = 0
+
+    def put(self, Body, Metadata):
+        self.size += len(Body.getbuffer())
+
+    def initiate_multipart_upload(self, Metadata):
+        return self
+
+    def Part(self, part_number):
+        return self
+
+    def upload(self, Body):
+        self.size += len(Body)
+        return {"ETag": "an-e-tag"}
+
+    def complete(self, MultipartUpload):
+        pass
+
+
+class _DiscardingS3DataManager(S3DataManager):
+    def __init__(self):
+        super().__init__(client=None)
+        self.s3_object = _DiscardingObject()
+
+    def _object_from_uri(self, uri: str):
+        return self.s3_object
+
+
+# Converts the whole day at once, as every column's list used to be
+def _write_whole_table():
+    builder = TransferTableBuilder(batch_size=TRANSFER_COUNT)
+    for transfer in _transfers():
+        builder.add(transfer)
+    table = builder.build()
+    buffer = BytesIO()
+    parquet.write_table(table, PythonFile(buffer))
+    buffer.seek(0)
+    _DiscardingObject().put(Body=buffer, Metadata={})
+
+
+# As SpineRunner writes each day: the table is built a batch at a time and its row groups are
+# streamed into a multipart upload
+def _write_streaming():
+    builder = TransferTableBuilder()
+    for transfer in _transfers():
+        builder.add(transfer)
+    s3_manager = _DiscardingS3DataManager()
+    s3_manager.write_parquet(builder.build(), "s3://a-bucket/transfers.parquet", {})
+
+
+# Run in a fresh process so that the Arrow memory pool peak only counts this write
+def _peak_bytes(write) -> int:
+    tracemalloc.start()
+    write()
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return python_peak + pa.default_memory_pool().max_memory()
+
+
+def run_benchmark():
+    with get_context("spawn").Pool(1, maxtasksperchild=1) as pool:
+        whole_table_peak = pool.apply(_peak_bytes, (_write_whole_table,))
+        streaming_peak = pool.apply(_peak_bytes, (_write_streaming,))
+
+    print(f"{TRANSFER_COUNT} transfers written as Parquet")
+    print(f"  whole table and put: {whole_table_peak / 2 ** 20:.1f} MiB")
+    print(f"  streamed batches:    {streaming_peak / 2 ** 20:.1f} MiB")
+    print(f"  reduction:           {1 - streaming_peak / whole_table_peak:.1%}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,88 @@
+import logging
+import random
+from timeit import timeit
+
+import pyarrow as pa
+
+from prmdata.domain.gp2gp.transfer_service import TransferServiceObservabilityProbe
+from prmdata.domain.ods_portal.organisation_lookup import OrganisationLookup
+from prmdata.domain.ods_portal.organisation_metadata import PracticeMetadata, SicblMetadata
+from prmdata.pipeline.arrow import transfer_table_schema
+from prmdata.pipeline.vectorised_classification import add_practice_metadata
+
+PRACTICE_COUNT = 7_000
+SICBL_COUNT = 100
+UNKNOWN_ASID_COUNT = 50
+TRANSFER_COUNTS = [10_000, 100_000, 1_000_000]
+
+
+def _build_organisation_lookup() -> OrganisationLookup:
+    practices = [
+        PracticeMetadata(ods_code=f"P{index}", name=f"Practice {index}", asids=[f"{index:012d}"])
+        for index in range(PRACTICE_COUNT)
+    ]
+    sicbls = [
+        SicblMetadata(
+            ods_code=f"S{index}",
+            name=f"SICBL {index}",
+            practices=[f"P{practice}" for practice in range(index, PRACTICE_COUNT, SICBL_COUNT)],
+        )
+        for index in range(SICBL_COUNT)
+    ]
+    return OrganisationLookup(practices, sicbls, year_month=(2022, 1))
+
+
+def _random_asids(count: int) -> pa.Array:
+    return pa.array(
+        [f"{random.randrange(PRACTICE_COUNT + UNKNOWN_ASID_COUNT):012d}" for _ in range(count)],
+        type=pa.string(),
+    )
+
+
+def _build_transfers(count: int) -> pa.Table:
+    schema = transfer_table_schema()
+    columns = {
+        name: pa.nulls(count, type=schema.field(name).type)
+        for name in schema.names
+        if "_practice_" not in name
+    }
+    columns["conversation_id"] = pa.array([f"conversation-{index}" for index in range(count)])
+    columns["requesting_practice_asid"] = _random_asids(count)
+    columns["sending_practice_asid"] = _random_asids(count)
+    return pa.table(columns)
+
+
+def _enrich_one_at_a_time(transfers: pa.Table, organisation_lookup: OrganisationLookup):
+    for asid in transfers["requesting_practice_asid"].to_pylist():
+        if organisation_lookup.has_asid_code(asid):
+            ods_code = organisation_lookup.practice_ods_code_from_asid(asid)
+            organisation_lookup.practice_name_from_asid(asid)
+            organisation_lookup.sicbl_ods_code_from_practice_ods_code(ods_code)  # type: ignore
+            organisation_lookup.sicbl_name_from_practice_ods_code(ods_code)  # type: ignore
+
+
+def run_benchmark():
+    logging.disable(logging.WARNING)
+    random.seed(0)
+    organisation_lookup = _build_organisation_lookup()
+    probe = TransferServiceObservabilityProbe()
+
+    print(f"{PRACTICE_COUNT} practices, {SICBL_COUNT} SICBLs")
+    for transfer_count in TRANSFER_COUNTS:
+        transfers = _build_transfers(transfer_count)
+        lookup_seconds = timeit(
+            lambda: _enrich_one_at_a_time(transfers, organisation_lookup), number=1
+        )
+        join_seconds = timeit(
+            lambda: add_practice_metadata(transfers, organisation_lookup, probe), number=1
+        )
+        print(
+            f"  {transfer_count:>9} transfers:"
+            f" method calls (requesting side only) {lookup_seconds:.2f}s,"
+            f" join (both sides) {join_seconds:.2f}s"
+            f" ({join_seconds / transfer_count * 1e9:.0f}ns per transfer)"
+        )
+
+
+if __name__ == "__main__":
+    run_benchmark()
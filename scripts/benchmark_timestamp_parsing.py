@@ -0,0 +1,49 @@
+import random
+from datetime import datetime, timedelta
+from timeit import timeit
+
+from dateutil import parser
+
+from prmdata.utils.date_converter import parse_timestamp
+
+MESSAGES_PER_DAY = 200_000
+REPEATS = 1
+
+
+def _splunk_timestamps(day: datetime, count: int):
+    timezone_name = "BST" if 4 <= day.month <= 10 else "UTC"
+    offsets = sorted(random.randrange(0, 86_400_000) for _ in range(count))
+    return [
+        (day + timedelta(milliseconds=offset)).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+        + f" {timezone_name}"
+        for offset in offsets
+    ]
+
+
+def _time_parser(parse, timestamps) -> float:
+    return timeit(lambda: [parse(timestamp) for timestamp in timestamps], number=REPEATS) / REPEATS
+
+
+def _parse_with_dateutil(timestamp: str) -> datetime:
+    return parser.parse(timestamp, tzinfos={"BST": 3600, "UTC": 0})
+
+
+def run_benchmark():
+    random.seed(0)
+    for day in [datetime(2022, 1, 10), datetime(2022, 7, 11)]:
+        timestamps = _splunk_timestamps(day, MESSAGES_PER_DAY)
+        assert [parse_timestamp(t) for t in timestamps] == [
+            _parse_with_dateutil(t) for t in timestamps
+        ]
+
+        dateutil_seconds = _time_parser(_parse_with_dateutil, timestamps)
+        fast_path_seconds = _time_parser(parse_timestamp, timestamps)
+
+        print(f"{day.date()} ({len(timestamps)} timestamps, e.g. {timestamps[0]!r})")
+        print(f"  dateutil.parser.parse: {dateutil_seconds:.3f}s")
+        print(f"  parse_timestamp:       {fast_path_seconds:.3f}s")
+        print(f"  speedup:               {dateutil_seconds / fast_path_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,65 @@
+import random
+from io import BytesIO
+from timeit import timeit
+
+from pyarrow import parquet
+
+from prmdata.pipeline.arrow import convert_transfers_to_table, sort_transfers
+from prmdata.pipeline.config import DEFAULT_PARQUET_DICTIONARY_COLUMNS
+from prmdata.utils.input_output.parquet_options import ParquetWriteOptions
+from scripts.benchmark_parquet_options import _transfers, _write
+
+ROW_GROUP_SIZE = 8_192
+REPEATS = 5
+SORT_KEYS = ["requesting_practice_sicbl_ods_code", "requesting_practice_ods_code", "date_requested"]
+ORDERS = {
+    "as classified": None,
+    "conversation_id": [],
+    "SICBL, practice, date": SORT_KEYS,
+    "practice, date": SORT_KEYS[1:],
+}
+FILTERS = {
+    "one SICBL": ("requesting_practice_sicbl_ods_code", "42D"),
+    "one practice": ("requesting_practice_ods_code", "A01234"),
+}
+PARQUET_OPTIONS = ParquetWriteOptions(
+    dictionary_columns=DEFAULT_PARQUET_DICTIONARY_COLUMNS,
+    compression="zstd",
+    row_group_size=ROW_GROUP_SIZE,
+)
+
+
+# Row groups whose min/max statistics cannot rule out the value, so a reader has to scan them
+def _candidate_row_groups(body: bytes, column: str, value: str) -> int:
+    metadata = parquet.ParquetFile(BytesIO(body)).metadata
+    column_index = metadata.schema.names.index(column)
+    candidates = 0
+    for index in range(metadata.num_row_groups):
+        statistics = metadata.row_group(index).column(column_index).statistics
+        candidates += statistics.min <= value <= statistics.max
+    return candidates
+
+
+def run_benchmark():
+    random.seed(0)
+    transfers = convert_transfers_to_table(_transfers())
+
+    print(f"{transfers.num_rows} transfers in row groups of {ROW_GROUP_SIZE}")
+    for order_name, sort_keys in ORDERS.items():
+        table = transfers if sort_keys is None else sort_transfers(transfers, sort_keys)
+        body = _write(table, PARQUET_OPTIONS)
+        print(f"  {order_name}: {len(body) / 2 ** 20:.2f} MiB")
+        for filter_name, (column, value) in FILTERS.items():
+            candidates = _candidate_row_groups(body, column, value)
+            seconds = timeit(
+                lambda: parquet.read_table(BytesIO(body), filters=[(column, "=", value)]),
+                number=REPEATS,
+            )
+            print(
+                f"    {filter_name:13} {candidates:2d} row groups scanned,"
+                f" {seconds / REPEATS * 1000:.0f}ms"
+            )
+
+
+if __name__ == "__main__":
+    run_benchmark()
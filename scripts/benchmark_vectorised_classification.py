@@ -0,0 +1,73 @@
+import random
+from datetime import timedelta
+from timeit import timeit
+from unittest.mock import Mock
+
+from prmdata.domain.gp2gp.transfer_service import TransferService
+from prmdata.domain.ods_portal.organisation_lookup import OrganisationLookup
+from prmdata.domain.ods_portal.organisation_metadata import PracticeMetadata
+from prmdata.pipeline.arrow import convert_messages_to_table, convert_transfers_to_table
+from prmdata.pipeline.vectorised_classification import add_practice_metadata, classify_message_table
+from scripts.benchmark_gp2gp_conversation import _build_conversation_messages
+
+CONVERSATION_COUNT = 100_000
+CUTOFF = timedelta(days=14)
+REPEATS = 1
+
+
+def _classify_with_object_engine(messages, organisation_lookup):
+    transfer_service = TransferService(cutoff=CUTOFF, observability_probe=Mock())
+    conversations = transfer_service.group_into_conversations(messages)
+    gp2gp_conversations = transfer_service.parse_conversations_into_gp2gp_conversations(
+        conversations
+    )
+    transfers = transfer_service.convert_to_transfers(gp2gp_conversations, organisation_lookup)
+    return convert_transfers_to_table(transfers)
+
+
+def _classify_with_vectorised_engine(message_table, organisation_lookup):
+    transfers = classify_message_table(message_table, CUTOFF)
+    return add_practice_metadata(transfers, organisation_lookup, Mock())
+
+
+def _build_organisation_lookup(messages) -> OrganisationLookup:
+    asids = {message.from_party_asid for message in messages}
+    practices = [
+        PracticeMetadata(ods_code=f"A{index}", name=f"Practice {index}", asids=[asid])
+        for index, asid in enumerate(asids)
+    ]
+    return OrganisationLookup(practices=practices, sicbls=[], year_month=(2022, 1))
+
+
+def _seconds(classify) -> float:
+    return timeit(classify, number=REPEATS) / REPEATS
+
+
+def run_benchmark():
+    random.seed(0)
+    messages = [
+        message
+        for index in range(CONVERSATION_COUNT)
+        for message in _build_conversation_messages(index)
+    ]
+    messages.sort(key=lambda message: message.time)
+    message_table = convert_messages_to_table(messages)
+    organisation_lookup = _build_organisation_lookup(messages)
+
+    expected = _classify_with_object_engine(messages, organisation_lookup)
+    actual = _classify_with_vectorised_engine(message_table, organisation_lookup)
+    assert actual.equals(expected), "engines disagree"
+
+    object_seconds = _seconds(lambda: _classify_with_object_engine(messages, organisation_lookup))
+    vectorised_seconds = _seconds(
+        lambda: _classify_with_vectorised_engine(message_table, organisation_lookup)
+    )
+
+    print(f"{CONVERSATION_COUNT} conversations ({len(messages)} messages)")
+    print(f"  object engine:     {object_seconds:.2f}s")
+    print(f"  vectorised engine: {vectorised_seconds:.2f}s")
+    print(f"  speed up:          {object_seconds / vectorised_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -9,6 +9,7 @@ setup(
         "python-dateutil>=2.8",
         "boto3>=1.18",
         "PyArrow>=5.0",
+        "numpy>=1.16",
         "urllib3==1.26.18",
     ],
 )
@@ -5,7 +5,7 @@ from typing import List, NamedTuple, Optional
 from prmdata.domain.gp2gp.transfer_outcome import TransferOutcome
 
 
-@dataclass
+@dataclass(frozen=True)
 class Practice:
     asid: str
     supplier: str
@@ -43,3 +43,7 @@ class Transfer(NamedTuple):
     def failure_reason(self) -> Optional[str]:
         failure_reason = self.outcome.failure_reason
         return None if failure_reason is None else failure_reason.value
+
+    @property
+    def outcome_predicates(self) -> Optional[int]:
+        return self.outcome.predicates
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from datetime import timedelta
-from enum import Enum
-from typing import Optional, Tuple
+from enum import Enum, IntFlag
+from typing import List, Optional, Tuple
 
 from prmdata.domain.spine.gp2gp_conversation import Gp2gpConversation
 
@@ -26,18 +26,110 @@ class TransferFailureReason(Enum):
     AMBIGUOUS_COPCS = "Ambiguous COPC messages"
 
 
+# Bit positions are part of the outcome_predicates output column, so only ever append to this.
+class TransferOutcomePredicate(IntFlag):
+    IS_INTEGRATED = 1 << 0
+    HAS_CONCLUDED_WITH_FAILURE = 1 << 1
+    CONTAINS_COPC_FRAGMENTS = 1 << 2
+    CONTAINS_FATAL_SENDER_ERROR_CODE = 1 << 3
+    IS_MISSING_REQUEST_ACKNOWLEDGED = 1 << 4
+    IS_MISSING_CORE_EHR = 1 << 5
+    CONTAINS_CORE_EHR_WITH_SENDER_ERROR = 1 << 6
+    CONTAINS_UNACKNOWLEDGED_DUPLICATE_EHR_AND_COPC_FRAGMENTS = 1 << 7
+    CONTAINS_COPC_ERROR = 1 << 8
+    IS_MISSING_COPC = 1 << 9
+    IS_MISSING_COPC_ACK = 1 << 10
+    INTEGRATED_WITHIN_SLA = 1 << 11
+
+
+_CONVERSATION_PREDICATES = [
+    (TransferOutcomePredicate.IS_INTEGRATED, "is_integrated"),
+    (TransferOutcomePredicate.HAS_CONCLUDED_WITH_FAILURE, "has_concluded_with_failure"),
+    (TransferOutcomePredicate.CONTAINS_COPC_FRAGMENTS, "contains_copc_fragments"),
+    (
+        TransferOutcomePredicate.CONTAINS_FATAL_SENDER_ERROR_CODE,
+        "contains_fatal_sender_error_code",
+    ),
+    (TransferOutcomePredicate.IS_MISSING_REQUEST_ACKNOWLEDGED, "is_missing_request_acknowledged"),
+    (TransferOutcomePredicate.IS_MISSING_CORE_EHR, "is_missing_core_ehr"),
+    (
+        TransferOutcomePredicate.CONTAINS_CORE_EHR_WITH_SENDER_ERROR,
+        "contains_core_ehr_with_sender_error",
+    ),
+    (
+        TransferOutcomePredicate.CONTAINS_UNACKNOWLEDGED_DUPLICATE_EHR_AND_COPC_FRAGMENTS,
+        "contains_unacknowledged_duplicate_ehr_and_copc_fragments",
+    ),
+    (TransferOutcomePredicate.CONTAINS_COPC_ERROR, "contains_copc_error"),
+    (TransferOutcomePredicate.IS_MISSING_COPC, "is_missing_copc"),
+    (TransferOutcomePredicate.IS_MISSING_COPC_ACK, "is_missing_copc_ack"),
+]
+
+_PREDICATES_BY_METHOD_NAME = {name: predicate for predicate, name in _CONVERSATION_PREDICATES}
+
+# Plain ints, as combining IntFlag members is several times slower than combining ints.
+_CONVERSATION_PREDICATE_BITS = [
+    (int(predicate), name) for predicate, name in _CONVERSATION_PREDICATES
+]
+_INTEGRATED_WITHIN_SLA_BIT = int(TransferOutcomePredicate.INTEGRATED_WITHIN_SLA)
+
+_SLA_THRESHOLD = timedelta(days=8)
+
+
 @dataclass
 class TransferOutcome:
     @classmethod
     def from_gp2gp_conversation(
         cls, conversation: Gp2gpConversation, sla_duration: Optional[timedelta]
     ):
-        [status, failure_reason] = _assign_transfer_outcome(conversation, sla_duration)
-        return cls(status, failure_reason)
-
-    def __init__(self, status: TransferStatus, failure_reason: Optional[TransferFailureReason]):
+        predicates = evaluate_transfer_outcome_predicates(conversation, sla_duration)
+        [status, failure_reason] = _TRANSFER_OUTCOME_TABLE[predicates]
+        return cls(status, failure_reason, predicates)
+
+    def __init__(
+        self,
+        status: TransferStatus,
+        failure_reason: Optional[TransferFailureReason],
+        predicates: Optional[int] = None,
+    ):
         self.status = status
         self.failure_reason = failure_reason
+        self.predicates = predicates
+
+
+def evaluate_transfer_outcome_predicates(
+    conversation: Gp2gpConversation, sla_duration: Optional[timedelta]
+) -> int:
+    predicates = _INTEGRATED_WITHIN_SLA_BIT if _is_within_sla(sla_duration) else 0
+    for bit, method_name in _CONVERSATION_PREDICATE_BITS:
+        if getattr(conversation, method_name)():
+            predicates |= bit
+    return predicates
+
+
+class _ConversationPredicates:
+    def __init__(self, predicates: int):
+        self._predicates = predicates
+
+    def __getattr__(self, method_name: str):
+        predicate = _PREDICATES_BY_METHOD_NAME[method_name]
+        return lambda: bool(self._predicates & predicate)
+
+
+# The rule chain below is the definition of the classification; it is evaluated once for
+# every combination of predicates so that classifying a conversation is a single lookup.
+def _build_transfer_outcome_table() -> List[Tuple[TransferStatus, Optional[TransferFailureReason]]]:
+    table = []
+    for predicates in range(1 << len(TransferOutcomePredicate)):
+        conversation = _ConversationPredicates(predicates)
+        within_sla = predicates & TransferOutcomePredicate.INTEGRATED_WITHIN_SLA
+        sla_duration = timedelta(0) if within_sla else None
+        table.append(_assign_transfer_outcome(conversation, sla_duration))  # type: ignore
+    return table
+
+
+def transfer_outcome_table() -> List[Tuple[TransferStatus, Optional[TransferFailureReason]]]:
+    return list(_TRANSFER_OUTCOME_TABLE)
 
 
 # flake8: noqa: C901
@@ -80,11 +172,15 @@ def _copc_transfer_outcome(
 def _integrated_within_sla(
     sla_duration: Optional[timedelta],
 ) -> Tuple[TransferStatus, Optional[TransferFailureReason]]:
-    if sla_duration is not None and sla_duration <= timedelta(days=8):
+    if _is_within_sla(sla_duration):
         return _integrated_on_time()
     return _process_failure(TransferFailureReason.INTEGRATED_LATE)
 
 
+def _is_within_sla(sla_duration: Optional[timedelta]) -> bool:
+    return sla_duration is not None and sla_duration <= _SLA_THRESHOLD
+
+
 def _integrated_on_time() -> Tuple[TransferStatus, Optional[TransferFailureReason]]:
     return TransferStatus.INTEGRATED_ON_TIME, None
 
@@ -103,3 +199,6 @@ def _unclassified_failure(
     reason: Optional[TransferFailureReason] = None,
 ) -> Tuple[TransferStatus, Optional[TransferFailureReason]]:
     return TransferStatus.UNCLASSIFIED_FAILURE, reason
+
+
+_TRANSFER_OUTCOME_TABLE = _build_transfer_outcome_table()
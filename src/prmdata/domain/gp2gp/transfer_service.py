@@ -1,18 +1,22 @@
 from collections import defaultdict
-from datetime import timedelta
+from datetime import datetime, timedelta
 from logging import Logger, getLogger
-from typing import Dict, Iterable, Iterator, List, Optional
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
 
 from prmdata.domain.gp2gp.transfer import Practice, Transfer
 from prmdata.domain.gp2gp.transfer_outcome import TransferOutcome
-from prmdata.domain.ods_portal.organisation_lookup import OrganisationLookup
+from prmdata.domain.ods_portal.organisation_lookup import OrganisationLookup, YearMonth
 from prmdata.domain.spine.conversation import Conversation
+from prmdata.domain.spine.conversation_assembler import WatermarkConversationAssembler
 from prmdata.domain.spine.gp2gp_conversation import (
+    AggregatingGp2gpConversationObservabilityProbe,
     ConversationMissingStart,
     Gp2gpConversation,
     Gp2gpConversationObservabilityProbe,
 )
 from prmdata.domain.spine.message import Message
+from prmdata.utils.input_output.spill import spill_into_partitions
+from prmdata.utils.sampled_events import SampledEventCounter, log_event_summaries
 
 module_logger = getLogger(__name__)
 
@@ -42,23 +46,132 @@ class TransferServiceObservabilityProbe:
             },
         )
 
+    def record_late_spine_messages_dropped(self, late_message_count: int):
+        self._logger.warning(
+            "Dropped spine messages that arrived after their conversation was finalised",
+            extra={
+                "event": "LATE_SPINE_MESSAGES_DROPPED",
+                "late_message_count": late_message_count,
+            },
+        )
+
+    def record_irrelevant_spine_data_filtered(
+        self, dropped_message_count: int, evicted_conversation_count: int
+    ):
+        self._logger.info(
+            "Filtered irrelevant spine messages and conversations before classification",
+            extra={
+                "event": "IRRELEVANT_SPINE_DATA_FILTERED",
+                "dropped_message_count": dropped_message_count,
+                "evicted_conversation_count": evicted_conversation_count,
+            },
+        )
+
+    def flush(self):
+        pass
+
+
+# Counts unknown ASIDs rather than logging every conversation they appear in, keeping a few
+# example conversations per ASID, and logs them as one summary when flushed.
+class AggregatingTransferServiceObservabilityProbe(TransferServiceObservabilityProbe):
+    def __init__(self, sample_size: int, logger: Logger = module_logger):
+        super().__init__(logger)
+        self._events = SampledEventCounter(sample_size)
+
+    def record_no_ods_code_for_asid(self, conversation_id: str, asid: str):
+        event = "UNKNOWN_ODS_CODE_FOR_CONVERSATION"
+        if self._events.count(event, asid):
+            self._events.sample(event, asid, {"conversation_id": conversation_id})
+
+    def flush(self):
+        log_event_summaries(self._logger, self._events)
+
+
+def build_observability_probes(
+    event_sample_size: Optional[int], logger: Logger = module_logger
+) -> Tuple[TransferServiceObservabilityProbe, Gp2gpConversationObservabilityProbe]:
+    if event_sample_size is None:
+        return (
+            TransferServiceObservabilityProbe(logger=logger),
+            Gp2gpConversationObservabilityProbe(logger=logger),
+        )
+    return (
+        AggregatingTransferServiceObservabilityProbe(event_sample_size, logger=logger),
+        AggregatingGp2gpConversationObservabilityProbe(event_sample_size, logger=logger),
+    )
+
+
+class _PracticeCache(NamedTuple):
+    organisation_lookup: OrganisationLookup
+    practices: Dict[Tuple[str, str], Practice]
+    unknown_asids: Set[str]
+
 
 class TransferService:
     def __init__(
         self,
         cutoff: timedelta,
         observability_probe: TransferServiceObservabilityProbe,
+        filter_irrelevant_messages: bool = False,
+        spill_memory_budget_bytes: int = 0,
+        spill_directory: Optional[str] = None,
+        streaming_allowed_lateness: Optional[timedelta] = None,
+        gp2gp_conversation_probe: Optional[Gp2gpConversationObservabilityProbe] = None,
     ):
         self._probe = observability_probe
+        self._gp2gp_conversation_probe = (
+            gp2gp_conversation_probe
+            if gp2gp_conversation_probe is not None
+            else Gp2gpConversationObservabilityProbe(logger=module_logger)
+        )
         self._cutoff = cutoff
+        self._filter_irrelevant_messages = filter_irrelevant_messages
+        self._spill_memory_budget_bytes = spill_memory_budget_bytes
+        self._spill_directory = spill_directory
+        self._streaming_allowed_lateness = streaming_allowed_lateness
+        self._practice_caches: Dict[YearMonth, _PracticeCache] = {}
 
     def group_into_conversations(self, message_stream: Iterable[Message]) -> Iterator[Conversation]:
-        conversations: Dict[str, List[Message]] = defaultdict(list)
+        if self._filter_irrelevant_messages:
+            return self._group_relevant_messages_into_conversations(message_stream)
+        return self._group_messages_into_conversations(message_stream)
 
-        for message in message_stream:
-            conversations[message.conversation_id].append(message)
+    def _group_messages(
+        self, message_stream: Iterable[Message]
+    ) -> Iterator[Dict[str, List[Message]]]:
+        if self._streaming_allowed_lateness is not None:
+            yield from self._assemble_conversations_by_watermark(
+                message_stream, self._streaming_allowed_lateness
+            )
+            return
 
-        for conversation_id, unordered_messages in conversations.items():
+        if self._spill_memory_budget_bytes <= 0:
+            yield _group_by_conversation_id(message_stream)
+            return
+
+        partitions = spill_into_partitions(
+            message_stream,
+            key=lambda message: message.conversation_id,
+            memory_budget_bytes=self._spill_memory_budget_bytes,
+            directory=self._spill_directory,
+        )
+        for partition in partitions:
+            yield _group_by_conversation_id(partition)
+
+    def _assemble_conversations_by_watermark(
+        self, message_stream: Iterable[Message], allowed_lateness: timedelta
+    ) -> Iterator[Dict[str, List[Message]]]:
+        assembler = WatermarkConversationAssembler(self._cutoff, allowed_lateness)
+        yield from assembler.assemble(message_stream)
+        if assembler.late_message_count > 0:
+            self._probe.record_late_spine_messages_dropped(assembler.late_message_count)
+
+    def _sort_conversations(
+        self, conversations: Dict[str, List[Message]]
+    ) -> Iterator[Conversation]:
+        # Popping each conversation lets its messages be freed once it has been classified.
+        for conversation_id in list(conversations):
+            unordered_messages = conversations.pop(conversation_id)
             sorted_messages = sorted(unordered_messages, key=lambda m: m.time)
             filtered_messages = _ignore_messages_sent_after(self._cutoff, sorted_messages)
 
@@ -67,25 +180,44 @@ class TransferService:
                 messages=filtered_messages,
             )
 
-    @staticmethod
-    def parse_conversations_into_gp2gp_conversations(
-        conversations: Iterator[Conversation],
-    ) -> List[Gp2gpConversation]:
-        gp2gp_conversation_observability_probe = Gp2gpConversationObservabilityProbe(
-            logger=module_logger
+    def _group_messages_into_conversations(
+        self, message_stream: Iterable[Message]
+    ) -> Iterator[Conversation]:
+        for conversations in self._group_messages(message_stream):
+            yield from self._sort_conversations(conversations)
+
+    def _group_relevant_messages_into_conversations(
+        self, message_stream: Iterable[Message]
+    ) -> Iterator[Conversation]:
+        message_filter = _Gp2gpMessageFilter()
+        conversation_count = 0
+        yielded_conversation_count = 0
+
+        for conversations in self._group_messages(message_filter.filter(message_stream)):
+            conversation_count += len(conversations)
+            _drop_conversations_without_request_started(conversations)
+            for conversation in self._sort_conversations(conversations):
+                if conversation.messages[0].is_ehr_request_started():
+                    yielded_conversation_count += 1
+                    yield conversation
+
+        self._probe.record_irrelevant_spine_data_filtered(
+            dropped_message_count=message_filter.dropped_message_count,
+            evicted_conversation_count=conversation_count - yielded_conversation_count,
         )
-        gp2gp_conversations = []
 
+    def parse_conversations_into_gp2gp_conversations(
+        self,
+        conversations: Iterable[Conversation],
+    ) -> Iterator[Gp2gpConversation]:
         for conversation in conversations:
             try:
                 gp2gp_conversation = Gp2gpConversation(
-                    conversation.messages, gp2gp_conversation_observability_probe
+                    conversation.messages, self._gp2gp_conversation_probe
                 )
-                gp2gp_conversations.append(gp2gp_conversation)
             except ConversationMissingStart:
-                pass
-
-        return gp2gp_conversations
+                continue
+            yield gp2gp_conversation
 
     def convert_to_transfers(
         self, conversations: Iterator[Gp2gpConversation], organisation_lookup: OrganisationLookup
@@ -95,15 +227,38 @@ class TransferService:
             for conversation in conversations
         )
 
+    # Practices are shared between the transfers of a month, so each (asid, supplier) is only
+    # looked up once, and an unknown ASID is only recorded for the first conversation it is in.
+    def _practice_cache(self, organisation_lookup: OrganisationLookup) -> _PracticeCache:
+        year_month = (organisation_lookup.year, organisation_lookup.month)
+        cache = self._practice_caches.get(year_month)
+        if cache is None or cache.organisation_lookup is not organisation_lookup:
+            cache = _PracticeCache(organisation_lookup, practices={}, unknown_asids=set())
+            self._practice_caches[year_month] = cache
+        return cache
+
     def _create_practice(
         self,
         asid: str,
         supplier: str,
         conversation_id: str,
         organisation_lookup: OrganisationLookup,
-    ):
+    ) -> Practice:
+        cache = self._practice_cache(organisation_lookup)
+        practice = cache.practices.get((asid, supplier))
+        if practice is None:
+            practice = self._lookup_practice(asid, supplier, conversation_id, cache)
+            cache.practices[asid, supplier] = practice
+        return practice
+
+    def _lookup_practice(
+        self, asid: str, supplier: str, conversation_id: str, cache: _PracticeCache
+    ) -> Practice:
+        organisation_lookup = cache.organisation_lookup
         if not organisation_lookup.has_asid_code(asid):
-            self._probe.record_no_ods_code_for_asid(conversation_id, asid)
+            if asid not in cache.unknown_asids:
+                cache.unknown_asids.add(asid)
+                self._probe.record_no_ods_code_for_asid(conversation_id, asid)
             return Practice(
                 asid=asid,
                 supplier=supplier,
@@ -155,6 +310,49 @@ class TransferService:
         )
 
 
+# Keeps a non-GP2GP message only while it is earlier than every message seen so far in its
+# conversation, as sorting could make it the first message. The conversation is then still
+# rejected for not starting with a request started message, as it is when nothing is filtered.
+class _Gp2gpMessageFilter:
+    def __init__(self):
+        self.dropped_message_count = 0
+        self._earliest_times: Dict[str, datetime] = {}
+
+    def _is_earliest_in_conversation(self, message: Message) -> bool:
+        earliest_time = self._earliest_times.get(message.conversation_id)
+        if earliest_time is not None and earliest_time <= message.time:
+            return False
+        self._earliest_times[message.conversation_id] = message.time
+        return True
+
+    def filter(self, message_stream: Iterable[Message]) -> Iterator[Message]:
+        for message in message_stream:
+            is_earliest = self._is_earliest_in_conversation(message)
+            if message.is_gp2gp_interaction() or is_earliest:
+                yield message
+            else:
+                self.dropped_message_count += 1
+
+
+def _group_by_conversation_id(messages: Iterable[Message]) -> Dict[str, List[Message]]:
+    conversations: Dict[str, List[Message]] = defaultdict(list)
+
+    for message in messages:
+        conversations[message.conversation_id].append(message)
+
+    return conversations
+
+
+def _drop_conversations_without_request_started(conversations: Dict[str, List[Message]]):
+    unstarted_conversation_ids = [
+        conversation_id
+        for conversation_id, messages in conversations.items()
+        if not any(message.is_ehr_request_started() for message in messages)
+    ]
+    for conversation_id in unstarted_conversation_ids:
+        del conversations[conversation_id]
+
+
 def _ignore_messages_sent_after(cutoff: timedelta, messages: List[Message]) -> List[Message]:
     if cutoff.total_seconds() == 0:
         return messages
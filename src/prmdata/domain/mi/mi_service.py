@@ -1,8 +1,6 @@
 from datetime import timedelta
 from typing import List, Optional
 
-from dateutil import parser
-
 from prmdata.domain.mi.event_type import EventType
 from prmdata.domain.mi.mi_message import (
     Attachment,
@@ -23,6 +21,7 @@ from prmdata.domain.mi.mi_message import (
     UnsupportedDataItem,
 )
 from prmdata.domain.mi.mi_transfer import EventSummary, MiPractice, MiTransfer
+from prmdata.utils.date_converter import parse_timestamp
 from prmdata.utils.filters import find_first
 
 GroupedMiMessages = dict[str, List[MiMessage]]
@@ -129,23 +128,16 @@ class MiService:
         return (transfer_received_datetime - transfer_requested_datetime) > timedelta(days=1)
 
     def construct_mi_messages_from_mi_events(self, mi_events: List[dict]) -> List[MiMessage]:
-        one_hour_in_seconds = 3600
-        timezone_info = {"BST": one_hour_in_seconds, "UTC": 0}
-
         return [
             MiMessage(
                 conversation_id=event["conversationId"],
                 event_id=event["eventId"],
                 event_type=EventType[event["eventType"]],
                 transfer_protocol=event["transferProtocol"],
-                event_generated_datetime=parser.parse(
-                    event["eventGeneratedDateTime"], tzinfos=timezone_info
-                ),
+                event_generated_datetime=parse_timestamp(event["eventGeneratedDateTime"]),
                 reporting_system_supplier=event["reportingSystemSupplier"],
                 reporting_practice_ods_code=event["reportingPracticeOdsCode"],
-                transfer_event_datetime=parser.parse(
-                    event["transferEventDateTime"], tzinfos=timezone_info
-                ),
+                transfer_event_datetime=parse_timestamp(event["transferEventDateTime"]),
                 payload=MiMessagePayload(
                     registration=MiMessagePayloadRegistration(
                         registration_type=event.get("payload", {})
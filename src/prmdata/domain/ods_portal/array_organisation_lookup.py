@@ -0,0 +1,235 @@
+import os
+from typing import Dict, List, Optional, Tuple
+from zlib import crc32
+
+import pyarrow as pa
+from pyarrow import Array, Buffer, RecordBatch, Table
+
+from prmdata.domain.ods_portal.organisation_lookup import OrganisationLookup, YearMonth
+
+_EMPTY_SLOT = -1
+
+_SCHEMA = pa.schema(
+    [
+        ("asids", pa.list_(pa.string())),
+        ("asid_slots", pa.list_(pa.int32())),
+        ("asid_practices", pa.list_(pa.int32())),
+        ("practice_ods_codes", pa.list_(pa.string())),
+        ("practice_names", pa.list_(pa.string())),
+        ("sicbl_practice_ods_codes", pa.list_(pa.string())),
+        ("sicbl_practice_ods_code_slots", pa.list_(pa.int32())),
+        ("practice_sicbls", pa.list_(pa.int32())),
+        ("sicbl_ods_codes", pa.list_(pa.string())),
+        ("sicbl_names", pa.list_(pa.string())),
+    ]
+)
+
+
+# Reads the strings of an Arrow string array straight from its offsets and data buffers, so
+# nothing is copied out of the buffer it was read from.
+class _Strings:
+    def __init__(self, array: Array):
+        _, offsets, data = array.buffers()
+        self._offsets = _int32s(offsets, array.offset, len(array) + 1)
+        self._data = memoryview(data) if data is not None else memoryview(b"")
+        self._length = len(array)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def encoded(self, index: int) -> bytes:
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return self._data[start:end].tobytes()
+
+    def __getitem__(self, index: int) -> str:
+        return self.encoded(index).decode("utf8")
+
+
+# Finds a string by hashing it into an open-addressing table of indexes, kept in the same buffer
+# as the strings themselves.
+class _HashedStrings(_Strings):
+    def __init__(self, array: Array, slots: Array):
+        super().__init__(array)
+        self._slots = _indexes(slots)
+        self._mask = len(self._slots) - 1
+
+    def index(self, value: str) -> Optional[int]:
+        encoded = value.encode("utf8")
+        slot = crc32(encoded) & self._mask
+        while True:
+            index = self._slots[slot]
+            if index == _EMPTY_SLOT or self.encoded(index) == encoded:
+                return None if index == _EMPTY_SLOT else index
+            slot = (slot + 1) & self._mask
+
+
+# Indexing a memoryview gives plain ints, which are much quicker to work with than numpy scalars
+def _int32s(buffer: Buffer, offset: int, length: int) -> memoryview:
+    start, end = offset * 4, (offset + length) * 4
+    return memoryview(buffer).cast("B")[start:end].cast("i")
+
+
+def _indexes(array: Array) -> memoryview:
+    return _int32s(array.buffers()[1], array.offset, len(array))
+
+
+def _list_column(values: list, value_type: pa.DataType) -> Array:
+    return pa.ListArray.from_arrays(
+        pa.array([0, len(values)], type=pa.int32()), pa.array(values, type=value_type)
+    )
+
+
+# Sized to at least twice the number of strings, so probes stay short
+def _hash_slots(strings: List[str]) -> List[int]:
+    mask = (1 << (2 * len(strings)).bit_length()) - 1
+    slots = [_EMPTY_SLOT] * (mask + 1)
+    for index, string in enumerate(strings):
+        slot = crc32(string.encode("utf8")) & mask
+        while slots[slot] != _EMPTY_SLOT:
+            slot = (slot + 1) & mask
+        slots[slot] = index
+    return slots
+
+
+def _entry_indexes(keys: List[str], entries: List[Tuple[str, str]]) -> Tuple[list, list, list]:
+    unique_entries: Dict[Tuple[str, str], int] = {}
+    entry_indexes = [unique_entries.setdefault(entry, len(unique_entries)) for entry in entries]
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    return (
+        [keys[index] for index in order],
+        [entry_indexes[index] for index in order],
+        list(unique_entries),
+    )
+
+
+def _build_record_batch(organisation_lookup: OrganisationLookup) -> RecordBatch:
+    practices = organisation_lookup.asid_to_practice_table()
+    sicbls = organisation_lookup.practice_to_sicbl_table()
+    asids, asid_practices, practice_entries = _entry_indexes(
+        practices["asid"].to_pylist(),
+        list(zip(practices["ods_code"].to_pylist(), practices["name"].to_pylist())),
+    )
+    sicbl_practice_ods_codes, practice_sicbls, sicbl_entries = _entry_indexes(
+        sicbls["practice_ods_code"].to_pylist(),
+        list(zip(sicbls["sicbl_ods_code"].to_pylist(), sicbls["sicbl_name"].to_pylist())),
+    )
+    return RecordBatch.from_arrays(
+        [
+            _list_column(asids, pa.string()),
+            _list_column(_hash_slots(asids), pa.int32()),
+            _list_column(asid_practices, pa.int32()),
+            _list_column([ods_code for ods_code, _ in practice_entries], pa.string()),
+            _list_column([name for _, name in practice_entries], pa.string()),
+            _list_column(sicbl_practice_ods_codes, pa.string()),
+            _list_column(_hash_slots(sicbl_practice_ods_codes), pa.int32()),
+            _list_column(practice_sicbls, pa.int32()),
+            _list_column([ods_code for ods_code, _ in sicbl_entries], pa.string()),
+            _list_column([name for _, name in sicbl_entries], pa.string()),
+        ],
+        schema=_SCHEMA.with_metadata(
+            {"year": str(organisation_lookup.year), "month": str(organisation_lookup.month)}
+        ),
+    )
+
+
+def _year_month(record_batch: RecordBatch) -> YearMonth:
+    metadata = record_batch.schema.metadata
+    return int(metadata[b"year"]), int(metadata[b"month"])
+
+
+# Holds every mapping in one read-only Arrow IPC buffer: sorted, deduplicated ASIDs and practice
+# ODS codes, each hashed into a table of slots and indexing into deduplicated practice and SICBL
+# entries. Opened from a file, the buffer is memory-mapped, and worker processes are handed the
+# path rather than a copy.
+class ArrayOrganisationLookup(OrganisationLookup):
+    def __init__(self, buffer: Buffer, path: Optional[str] = None):
+        self._buffer = buffer
+        self._path = path
+        record_batch = pa.ipc.open_file(buffer).get_batch(0)
+        self._year_month = _year_month(record_batch)
+
+        def values(name: str) -> Array:
+            return record_batch.column(name).values
+
+        self._asids = _HashedStrings(values("asids"), values("asid_slots"))
+        self._asid_practices = _indexes(values("asid_practices"))
+        self._practice_ods_codes = _Strings(values("practice_ods_codes"))
+        self._practice_names = _Strings(values("practice_names"))
+        self._sicbl_practice_ods_codes = _HashedStrings(
+            values("sicbl_practice_ods_codes"), values("sicbl_practice_ods_code_slots")
+        )
+        self._practice_sicbls = _indexes(values("practice_sicbls"))
+        self._sicbl_ods_codes = _Strings(values("sicbl_ods_codes"))
+        self._sicbl_names = _Strings(values("sicbl_names"))
+        self._tables = {name: values(name) for name in _SCHEMA.names}
+
+    @classmethod
+    def from_organisation_lookup(
+        cls, organisation_lookup: OrganisationLookup
+    ) -> "ArrayOrganisationLookup":
+        record_batch = _build_record_batch(organisation_lookup)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_file(sink, record_batch.schema) as writer:
+            writer.write_batch(record_batch)
+        return cls(sink.getvalue())
+
+    @classmethod
+    def open(cls, path: str) -> "ArrayOrganisationLookup":
+        with pa.memory_map(path) as source:
+            return cls(source.read_buffer(), path=path)
+
+    @property
+    def buffer(self) -> Buffer:
+        return self._buffer
+
+    def __reduce__(self):
+        if self._path is not None and os.path.exists(self._path):
+            return ArrayOrganisationLookup.open, (self._path,)
+        return ArrayOrganisationLookup, (self._buffer,)
+
+    def _practice_index(self, asid: str) -> Optional[int]:
+        asid_index = self._asids.index(asid)
+        return None if asid_index is None else self._asid_practices[asid_index]
+
+    def _sicbl_index(self, ods_code: str) -> Optional[int]:
+        practice_index = self._sicbl_practice_ods_codes.index(ods_code)
+        return None if practice_index is None else self._practice_sicbls[practice_index]
+
+    def has_asid_code(self, asid: str) -> bool:
+        return self._asids.index(asid) is not None
+
+    def practice_ods_code_from_asid(self, asid: str) -> Optional[str]:
+        practice_index = self._practice_index(asid)
+        return None if practice_index is None else self._practice_ods_codes[practice_index]
+
+    def practice_name_from_asid(self, asid: str) -> Optional[str]:
+        practice_index = self._practice_index(asid)
+        return None if practice_index is None else self._practice_names[practice_index]
+
+    def sicbl_name_from_practice_ods_code(self, ods_code: str) -> Optional[str]:
+        sicbl_index = self._sicbl_index(ods_code)
+        return None if sicbl_index is None else self._sicbl_names[sicbl_index]
+
+    def sicbl_ods_code_from_practice_ods_code(self, ods_code: str) -> Optional[str]:
+        sicbl_index = self._sicbl_index(ods_code)
+        return None if sicbl_index is None else self._sicbl_ods_codes[sicbl_index]
+
+    def asid_to_practice_table(self) -> Table:
+        asid_practices = self._tables["asid_practices"]
+        return pa.table(
+            {
+                "asid": self._tables["asids"],
+                "ods_code": self._tables["practice_ods_codes"].take(asid_practices),
+                "name": self._tables["practice_names"].take(asid_practices),
+            }
+        )
+
+    def practice_to_sicbl_table(self) -> Table:
+        practice_sicbls = self._tables["practice_sicbls"]
+        return pa.table(
+            {
+                "practice_ods_code": self._tables["sicbl_practice_ods_codes"],
+                "sicbl_ods_code": self._tables["sicbl_ods_codes"].take(practice_sicbls),
+                "sicbl_name": self._tables["sicbl_names"].take(practice_sicbls),
+            }
+        )
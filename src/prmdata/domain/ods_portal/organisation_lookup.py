@@ -1,5 +1,8 @@
 from typing import List, Optional, Tuple
 
+import pyarrow as pa
+from pyarrow import Table
+
 from prmdata.domain.ods_portal.organisation_metadata import PracticeMetadata, SicblMetadata
 
 YearNumber = int
@@ -28,6 +31,8 @@ class OrganisationLookup:
             for practice_ods_code in sicbl.practices
         }
         self._year_month = year_month
+        self._asid_to_practice_table: Optional[Table] = None
+        self._practice_to_sicbl_table: Optional[Table] = None
 
     def has_asid_code(self, asid: str) -> bool:
         return asid in self._asid_to_practice_ods_mapping
@@ -44,6 +49,48 @@ class OrganisationLookup:
     def sicbl_ods_code_from_practice_ods_code(self, ods_code: str) -> Optional[str]:
         return self._ods_to_sicbl_ods_mapping.get(ods_code)
 
+    def asid_to_practice_table(self) -> Table:
+        if self._asid_to_practice_table is None:
+            asids = list(self._asid_to_practice_ods_mapping)
+            self._asid_to_practice_table = pa.table(
+                {
+                    "asid": pa.array(asids, type=pa.string()),
+                    "ods_code": pa.array(
+                        [self._asid_to_practice_ods_mapping[asid] for asid in asids],
+                        type=pa.string(),
+                    ),
+                    "name": pa.array(
+                        [self._asid_to_practice_name_mapping[asid] for asid in asids],
+                        type=pa.string(),
+                    ),
+                }
+            )
+        return self._asid_to_practice_table
+
+    def practice_to_sicbl_table(self) -> Table:
+        if self._practice_to_sicbl_table is None:
+            practice_ods_codes = list(self._ods_to_sicbl_ods_mapping)
+            self._practice_to_sicbl_table = pa.table(
+                {
+                    "practice_ods_code": pa.array(practice_ods_codes, type=pa.string()),
+                    "sicbl_ods_code": pa.array(
+                        [
+                            self._ods_to_sicbl_ods_mapping[ods_code]
+                            for ods_code in practice_ods_codes
+                        ],
+                        type=pa.string(),
+                    ),
+                    "sicbl_name": pa.array(
+                        [
+                            self._ods_to_sicbl_name_mapping[ods_code]
+                            for ods_code in practice_ods_codes
+                        ],
+                        type=pa.string(),
+                    ),
+                }
+            )
+        return self._practice_to_sicbl_table
+
     @property
     def year(self) -> int:
         return self._year_month[0]
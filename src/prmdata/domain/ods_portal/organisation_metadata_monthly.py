@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Dict, Iterator
+from typing import Dict, Iterable, Iterator
 
 from dateutil.relativedelta import relativedelta
 
@@ -7,21 +7,30 @@ from prmdata.domain.ods_portal.organisation_lookup import OrganisationLookup, Ye
 from prmdata.domain.ods_portal.organisation_metadata import OrganisationMetadata
 
 
+def construct_organisation_lookup(data: Dict) -> OrganisationLookup:
+    organisation_metadata = OrganisationMetadata.from_dict(data)
+    year_month = (organisation_metadata.year, organisation_metadata.month)
+    return OrganisationLookup(
+        organisation_metadata.practices, organisation_metadata.sicbls, year_month=year_month
+    )
+
+
 class OrganisationMetadataMonthly:
     def __init__(self, metadata_dict: Dict[YearMonth, OrganisationLookup]):
         self._metadata_dict = metadata_dict
 
     @classmethod
     def from_list(cls, datas: Iterator[Dict]):
-        metadata_dict = {}
-        for data in datas:
-            organisation_metadata = OrganisationMetadata.from_dict(data)
-            year_month = (organisation_metadata.year, organisation_metadata.month)
-            organisation_lookup = OrganisationLookup(
-                organisation_metadata.practices, organisation_metadata.sicbls, year_month=year_month
-            )
-            metadata_dict[year_month] = organisation_lookup
-        return cls(metadata_dict)
+        return cls.from_lookups(construct_organisation_lookup(data) for data in datas)
+
+    @classmethod
+    def from_lookups(cls, organisation_lookups: Iterable[OrganisationLookup]):
+        return cls(
+            {
+                (organisation_lookup.year, organisation_lookup.month): organisation_lookup
+                for organisation_lookup in organisation_lookups
+            }
+        )
 
     def get_lookup(self, year_month: YearMonth) -> OrganisationLookup:
         try:
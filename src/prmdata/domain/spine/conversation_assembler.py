@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+from heapq import heappop, heappush
+from itertools import count
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from prmdata.domain.spine.message import Message
+
+
+# A conversation can receive no further messages once the watermark (the latest message
+# time seen, less the allowed lateness) passes its start plus the cutoff, so it is
+# released then rather than at the end of the stream. Its id is kept for the rest of the run,
+# so stragglers are dropped rather than starting a second conversation with the same id. Its
+# deadline, used to count stragglers within the cutoff as late, is only kept until the watermark
+# passes it by the allowed lateness again; after that any straggler behind the watermark counts.
+class WatermarkConversationAssembler:
+    def __init__(self, cutoff: timedelta, allowed_lateness: timedelta):
+        self._cutoff = cutoff
+        self._allowed_lateness = allowed_lateness
+        self._open_conversations: Dict[str, List[Message]] = {}
+        self._starts: Dict[str, datetime] = {}
+        self._starts_heap: List[Tuple[datetime, int, str]] = []
+        self._sequence = count()
+        self._released_ids: Set[str] = set()
+        self._finalised_deadlines: Dict[str, datetime] = {}
+        self._deadlines_heap: List[Tuple[datetime, int, str]] = []
+        self._watermark: Optional[datetime] = None
+        self.late_message_count = 0
+
+    def assemble(self, message_stream: Iterable[Message]) -> Iterator[Dict[str, List[Message]]]:
+        for message in message_stream:
+            self._add(message)
+            finalised = self._finalise_passed_by(message.time)
+            if finalised:
+                yield finalised
+
+        remaining = self._open_conversations
+        self._open_conversations = {}
+        self._starts.clear()
+        self._starts_heap.clear()
+        self._released_ids.clear()
+        self._finalised_deadlines.clear()
+        self._deadlines_heap.clear()
+        yield remaining
+
+    def _add(self, message: Message):
+        conversation_id = message.conversation_id
+        if conversation_id in self._released_ids:
+            if self._is_late(message):
+                self.late_message_count += 1
+            return
+
+        messages = self._open_conversations.get(conversation_id)
+        if messages is None:
+            self._open_conversations[conversation_id] = [message]
+            self._set_start(conversation_id, message.time)
+        else:
+            messages.append(message)
+            if message.time < self._starts[conversation_id]:
+                self._set_start(conversation_id, message.time)
+
+    def _is_late(self, message: Message) -> bool:
+        deadline = self._finalised_deadlines.get(message.conversation_id)
+        if deadline is not None:
+            return message.time <= deadline
+        return (
+            self._watermark is not None and message.time < self._watermark - self._allowed_lateness
+        )
+
+    def _set_start(self, conversation_id: str, start: datetime):
+        self._starts[conversation_id] = start
+        heappush(self._starts_heap, (start, next(self._sequence), conversation_id))
+
+    def _finalise_passed_by(self, time: datetime) -> Dict[str, List[Message]]:
+        if not self._cutoff or (self._watermark is not None and time <= self._watermark):
+            return {}
+        self._watermark = time
+        threshold = time - self._allowed_lateness - self._cutoff
+
+        finalised = {}
+        while self._starts_heap and self._starts_heap[0][0] < threshold:
+            start, _, conversation_id = heappop(self._starts_heap)
+            if self._starts.get(conversation_id) != start:
+                continue
+            del self._starts[conversation_id]
+            finalised[conversation_id] = self._open_conversations.pop(conversation_id)
+            self._remember_finalised(conversation_id, start + self._cutoff)
+        self._forget_finalised_before(threshold + self._cutoff - self._allowed_lateness)
+        return finalised
+
+    def _remember_finalised(self, conversation_id: str, deadline: datetime):
+        self._released_ids.add(conversation_id)
+        self._finalised_deadlines[conversation_id] = deadline
+        heappush(self._deadlines_heap, (deadline, next(self._sequence), conversation_id))
+
+    def _forget_finalised_before(self, time: datetime):
+        while self._deadlines_heap and self._deadlines_heap[0][0] < time:
+            _, _, conversation_id = heappop(self._deadlines_heap)
+            del self._finalised_deadlines[conversation_id]
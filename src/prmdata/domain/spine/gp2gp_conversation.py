@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta
 from logging import Logger, getLogger
-from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
 from prmdata.domain.spine.message import (
     DUPLICATE_ERROR,
@@ -8,6 +8,7 @@ from prmdata.domain.spine.message import (
     FATAL_SENDER_ERROR_CODES,
     Message,
 )
+from prmdata.utils.sampled_events import SampledEventCounter, log_event_summaries
 
 module_logger = getLogger(__name__)
 
@@ -39,13 +40,6 @@ class ConversationMissingStart(Exception):
     pass
 
 
-class Gp2gpMessagesByType(NamedTuple):
-    request_started: AcknowledgedMessage
-    copc_continue: List[Message]
-    copc_fragments: List[AcknowledgedMessage]
-    request_completed: List[AcknowledgedMessage]
-
-
 class Gp2gpConversationObservabilityProbe:
     def __init__(self, logger: Logger = module_logger):
         self._logger = logger
@@ -69,6 +63,38 @@ class Gp2gpConversationObservabilityProbe:
             },
         )
 
+    def flush(self):
+        pass
+
+
+# Counts the per-message warnings by the acknowledging ASID or the interaction id, keeping a few
+# examples of each, and logs them as one summary per event when flushed.
+class AggregatingGp2gpConversationObservabilityProbe(Gp2gpConversationObservabilityProbe):
+    def __init__(self, sample_size: int, logger: Logger = module_logger):
+        super().__init__(logger)
+        self._events = SampledEventCounter(sample_size)
+
+    def record_ehr_missing_message_for_an_acknowledgement(self, message: Message):
+        event = "MISSING_MESSAGE_FOR_ACKNOWLEDGEMENT"
+        if self._events.count(event, message.from_party_asid):
+            self._events.sample(
+                event,
+                message.from_party_asid,
+                {"conversation_id": message.conversation_id, "message_ref": message.message_ref},
+            )
+
+    def record_unknown_message_purpose(self, message: Message):
+        event = "UNKNOWN_MESSAGE_PURPOSE"
+        if self._events.count(event, message.interaction_id):
+            self._events.sample(
+                event,
+                message.interaction_id,
+                {"conversation_id": message.conversation_id, "guid": message.guid},
+            )
+
+    def flush(self):
+        log_event_summaries(self._logger, self._events)
+
 
 class Gp2gpConversation:
     def __init__(
@@ -82,82 +108,97 @@ class Gp2gpConversation:
 
         self._probe = probe
 
-        acked_messages = self._pair_messages_with_acks(messages)
-        message_bundle = self._group_message_by_type(acked_messages)
+        acked_messages, sender_message_times = self._pair_messages_with_acks(
+            messages, sending_asid=first_message.to_party_asid
+        )
+        request_started, *remaining_messages = acked_messages
+
+        self._request_started = request_started.message
+        self._sender_error_codes = [ack.error_code for ack in request_started.acknowledgements]
+        self._contains_fatal_sender_error_code = any(
+            error_code in FATAL_SENDER_ERROR_CODES for error_code in self._sender_error_codes
+        )
+        self._contains_any_sender_error = any(
+            error_code is not None for error_code in self._sender_error_codes
+        )
+
+        self._final_error_codes: List[Optional[int]] = []
+        self._request_completed_count = 0
+        self._all_ehr_acknowledged = True
+        self._all_ehr_acks_are_duplicates = True
+        self._successfully_acked_ehr: Optional[Tuple[Message, Message]] = None
+        self._unsuccessfully_acked_ehr: Optional[Tuple[Message, Message]] = None
 
-        self._request_started = message_bundle.request_started
-        self._request_completed = message_bundle.request_completed
-        self._copc_continue = message_bundle.copc_continue
-        self._copc_fragments = message_bundle.copc_fragments
+        self._intermediate_error_codes: List[int] = []
+        self._contains_copc_continue = False
+        self._copc_fragment_count = 0
+        self._all_copc_fragments_acknowledged = True
 
-        self._effective_ehr = None
-        self._effective_ehr_ack = None
+        self._accumulate_messages_by_type(remaining_messages)
 
-        effective_request_completed = _find_effective_request_completed(self._request_completed)
-        if effective_request_completed is not None:
-            (self._effective_ehr, self._effective_ehr_ack) = effective_request_completed
+        effective_ehr: Optional[Tuple[Message, Message]] = (
+            self._successfully_acked_ehr or self._unsuccessfully_acked_ehr
+        )
+        self._effective_ehr: Optional[Message] = effective_ehr[0] if effective_ehr else None
+        self._effective_ehr_ack: Optional[Message] = effective_ehr[1] if effective_ehr else None
 
-        self._sender_messages = self._find_sender_messages(messages)
+        if self.sending_practice_asid() != first_message.to_party_asid:
+            sender_message_times = [
+                message.time
+                for message in messages
+                if message.from_party_asid == self.sending_practice_asid()
+            ]
+        self._set_last_sender_message_times(sender_message_times)
 
     def conversation_id(self) -> str:
-        return self._request_started.message.conversation_id
+        return self._request_started.conversation_id
 
     def sending_practice_asid(self) -> str:
-        return self._request_started.to_asid()
+        return self._request_started.to_party_asid
 
     def requesting_practice_asid(self) -> str:
-        return self._request_started.from_asid()
+        return self._request_started.from_party_asid
 
     def requesting_supplier(self) -> str:
-        return self._request_started.message.from_system
+        return self._request_started.from_system
 
     def sending_supplier(self) -> str:
-        return self._request_started.message.to_system
+        return self._request_started.to_system
 
     def final_error_codes(self) -> List[Optional[int]]:
-        return [
-            ack.error_code
-            for message in self._request_completed
-            for ack in message.acknowledgements
-        ]
+        return self._final_error_codes
 
     def sender_error_codes(self) -> List[int]:
-        return [ack.error_code for ack in self._request_started.acknowledgements]
+        return self._sender_error_codes
 
     def intermediate_error_codes(self) -> List[int]:
-        return [
-            ack.error_code
-            for message in self._copc_fragments
-            for ack in message.acknowledgements
-            if ack.error_code is not None
-        ]
+        return self._intermediate_error_codes
 
     def date_requested(self) -> datetime:
-        return self._request_started.message.time
+        return self._request_started.time
 
-    def _find_sender_messages(self, messages: List[Message]) -> List[Message]:
-        sender_messages = [
-            message
-            for message in messages
-            if self.sending_practice_asid() == message.from_party_asid
-        ]
-        return sender_messages
+    def _set_last_sender_message_times(self, sender_message_times: List[datetime]):
+        self._last_sender_message_time = max(sender_message_times, default=None)
+        self._last_sender_message_time_before_final_ack = None
+
+        if self._effective_ehr_ack is not None and self.is_integrated():
+            final_acknowledgement_time = self._effective_ehr_ack.time
+            self._last_sender_message_time_before_final_ack = max(
+                (time for time in sender_message_times if time <= final_acknowledgement_time),
+                default=None,
+            )
 
     def last_sender_message_timestamp(self) -> Optional[datetime]:
-        if len(self._sender_messages) == 0:
+        if self._last_sender_message_time is None:
             return None
 
         # check if integrated and get latest message before integration
         if self.is_integrated():
-            return max(
-                [
-                    message.time
-                    for message in self._sender_messages
-                    if message.time <= self.effective_final_acknowledgement_time()
-                ]
-            )
+            if self._last_sender_message_time_before_final_ack is None:
+                raise ValueError("No sender message before the final acknowledgement")
+            return self._last_sender_message_time_before_final_ack
 
-        return max([message.time for message in self._sender_messages])
+        return self._last_sender_message_time
 
     def is_integrated(self) -> bool:
         return self._effective_ehr_ack is not None and _integrated_or_suppressed(
@@ -173,35 +214,25 @@ class Gp2gpConversation:
         return self._effective_ehr_ack is None
 
     def is_missing_request_acknowledged(self) -> bool:
-        return not self._request_started.has_acknowledgements()
+        return len(self._sender_error_codes) == 0
 
     def is_missing_core_ehr(self) -> bool:
-        return len(self._request_completed) == 0
+        return self._request_completed_count == 0
 
     def is_missing_copc(self) -> bool:
-        return len(self._copc_continue) > 0 and len(self._copc_fragments) == 0
+        return self._contains_copc_continue and self._copc_fragment_count == 0
 
     def is_missing_copc_ack(self) -> bool:
-        return any(not message.has_acknowledgements() for message in self._copc_fragments)
+        return not self._all_copc_fragments_acknowledged
 
     def contains_copc_error(self) -> bool:
-        return any(
-            ack.error_code is not None
-            for message in self._copc_fragments
-            for ack in message.acknowledgements
-        )
+        return len(self._intermediate_error_codes) > 0
 
     def contains_fatal_sender_error_code(self) -> bool:
-        return any(
-            ack.error_code in FATAL_SENDER_ERROR_CODES
-            for ack in self._request_started.acknowledgements
-        )
+        return self._contains_fatal_sender_error_code
 
     def contains_core_ehr_with_sender_error(self) -> bool:
-        contains_any_sender_error = any(
-            ack.error_code is not None for ack in self._request_started.acknowledgements
-        )
-        return not self.is_missing_core_ehr() and contains_any_sender_error
+        return not self.is_missing_core_ehr() and self._contains_any_sender_error
 
     def effective_request_completed_time(self) -> Optional[datetime]:
         return self._effective_ehr.time if self._effective_ehr else None
@@ -210,124 +241,104 @@ class Gp2gpConversation:
         return self._effective_ehr_ack.time if self._effective_ehr_ack else None
 
     def contains_copc_fragments(self) -> bool:
-        return len(self._copc_continue) > 0 or len(self._copc_fragments) > 0
+        return self._contains_copc_continue or self._copc_fragment_count > 0
 
     def contains_unacknowledged_duplicate_ehr_and_copc_fragments(self) -> bool:
         has_duplicates = self._count_duplicate_errors() > 0
         contains_copcs = self.contains_copc_fragments()
 
-        return has_duplicates and contains_copcs and not self._all_ehr_acknowledged()
+        return has_duplicates and contains_copcs and not self._all_ehr_acknowledged
 
     def contains_only_duplicate_ehr(self) -> bool:
-        return self._all_ehr_acknowledged() and self._all_ehr_acks_are_duplicates()
-
-    def _all_ehr_acknowledged(self) -> bool:
-        return all(message.has_acknowledgements() for message in self._request_completed)
-
-    def _all_ehr_acks_are_duplicates(self) -> bool:
-        return all(
-            ack.error_code == DUPLICATE_ERROR
-            for message in self._request_completed
-            for ack in message.acknowledgements
-        )
+        return self._all_ehr_acknowledged and self._all_ehr_acks_are_duplicates
 
     def _count_duplicate_errors(self) -> int:
-        return self.final_error_codes().count(DUPLICATE_ERROR)
+        return self._final_error_codes.count(DUPLICATE_ERROR)
 
-    def _pair_messages_with_acks(self, messages: Iterable[Message]) -> List[AcknowledgedMessage]:
-        acked_messages: dict[str, AcknowledgedMessage] = {}
+    def _pair_messages_with_acks(
+        self, messages: Iterable[Message], sending_asid: str
+    ) -> Tuple[List[AcknowledgedMessage], List[datetime]]:
+        acked_messages: Dict[str, AcknowledgedMessage] = {}
+        sender_message_times = []
 
         for message in messages:
+            if message.from_party_asid == sending_asid:
+                sender_message_times.append(message.time)
             if message.is_acknowledgement():
-                try:
-                    acked_messages[message.message_ref].acknowledgements.append(message)
-                except KeyError:
-                    self._probe.record_ehr_missing_message_for_an_acknowledgement(message)
+                self._pair_ack(acked_messages, message)
             else:
                 acked_messages[message.guid] = AcknowledgedMessage(
                     message=message, acknowledgements=[]
                 )
 
-        return list(acked_messages.values())
-
-    def _group_message_by_type(
-        self, messages: Iterable[AcknowledgedMessage]
-    ) -> Gp2gpMessagesByType:
-        request_completed_messages = []
-        copc_continue_messages = []
-        copc_fragment_messages = []
+        return list(acked_messages.values()), sender_message_times
 
-        request_started, *remaining_messages = messages
+    def _pair_ack(self, acked_messages: Dict[str, AcknowledgedMessage], ack: Message):
+        try:
+            acked_messages[ack.message_ref].acknowledgements.append(ack)
+        except KeyError:
+            self._probe.record_ehr_missing_message_for_an_acknowledgement(ack)
 
-        requesting_asid = request_started.from_asid()
-        sending_asid = request_started.to_asid()
+    def _accumulate_messages_by_type(self, messages: Iterable[AcknowledgedMessage]):
+        requesting_asid = self.requesting_practice_asid()
+        sending_asid = self.sending_practice_asid()
 
-        for acked_message in remaining_messages:
+        for acked_message in messages:
             if acked_message.is_ehr_request_completed():
-                request_completed_messages.append(acked_message)
+                self._accumulate_request_completed(acked_message)
             elif acked_message.is_copc() and acked_message.is_sent_by(requesting_asid):
-                copc_continue_messages.append(acked_message.message)
+                self._contains_copc_continue = True
             elif acked_message.message.is_copc() and acked_message.is_sent_by(sending_asid):
-                copc_fragment_messages.append(acked_message)
+                self._accumulate_copc_fragment(acked_message)
             else:
                 self._probe.record_unknown_message_purpose(acked_message.message)
 
-        return Gp2gpMessagesByType(
-            request_started=request_started,
-            request_completed=request_completed_messages,
-            copc_continue=copc_continue_messages,
-            copc_fragments=copc_fragment_messages,
-        )
+    def _accumulate_request_completed(self, request_completed: AcknowledgedMessage):
+        self._request_completed_count += 1
+        if not request_completed.has_acknowledgements():
+            self._all_ehr_acknowledged = False
 
+        for ack in request_completed.acknowledgements:
+            self._accumulate_final_ack(request_completed.message, ack)
 
-def _integrated_or_suppressed(request_completed_ack: Message) -> bool:
-    return (
-        request_completed_ack.error_code is None
-        or request_completed_ack.error_code == ERROR_SUPPRESSED
-    )
+    def _accumulate_final_ack(self, request_completed: Message, ack: Message):
+        self._final_error_codes.append(ack.error_code)
+        if self._successfully_acked_ehr is None and _integrated_or_suppressed(ack):
+            self._successfully_acked_ehr = (request_completed, ack)
+        if ack.error_code != DUPLICATE_ERROR:
+            self._all_ehr_acks_are_duplicates = False
+            if self._unsuccessfully_acked_ehr is None:
+                self._unsuccessfully_acked_ehr = (request_completed, ack)
 
+    def _accumulate_copc_fragment(self, copc_fragment: AcknowledgedMessage):
+        self._copc_fragment_count += 1
+        if not copc_fragment.has_acknowledgements():
+            self._all_copc_fragments_acknowledged = False
 
-def _find_acked_ehr_completed_where_ack(
-    request_completed_messages: List[AcknowledgedMessage], predicate
-):
-    return next(
-        (
-            (request_completed.message, ack)
-            for request_completed in request_completed_messages
-            for ack in request_completed.acknowledgements
-            if predicate(ack)
-        ),
-        None,
-    )
+        for ack in copc_fragment.acknowledgements:
+            if ack.error_code is not None:
+                self._intermediate_error_codes.append(ack.error_code)
 
 
-def _find_effective_request_completed(
-    request_completed_messages: List[AcknowledgedMessage],
-) -> Optional[Tuple[Message, Message]]:
-    successfully_acked_ehr = _find_acked_ehr_completed_where_ack(
-        request_completed_messages, _integrated_or_suppressed
-    )
-
-    if successfully_acked_ehr is not None:
-        return successfully_acked_ehr
-
-    unsuccessfully_acked_ehr = _find_acked_ehr_completed_where_ack(
-        request_completed_messages, lambda ack: ack.error_code != DUPLICATE_ERROR
+def _integrated_or_suppressed(request_completed_ack: Message) -> bool:
+    return (
+        request_completed_ack.error_code is None
+        or request_completed_ack.error_code == ERROR_SUPPRESSED
     )
 
-    if unsuccessfully_acked_ehr is not None:
-        return unsuccessfully_acked_ehr
-
-    return None
-
 
-def filter_conversations_by_day(
+def assign_conversations_to_days(
     conversations: Iterable[Gp2gpConversation],
-    daily_start_datetime: datetime,
-) -> Iterator[Gp2gpConversation]:
-    daily_end_datetime = daily_start_datetime + timedelta(days=1)
-    return (
-        conversation
-        for conversation in conversations
-        if daily_start_datetime <= conversation.date_requested() < daily_end_datetime
-    )
+    daily_start_datetimes: List[datetime],
+) -> Iterator[Tuple[datetime, Gp2gpConversation]]:
+    if not daily_start_datetimes:
+        return
+
+    one_day = timedelta(days=1)
+    first_daily_start_datetime = daily_start_datetimes[0]
+    days = set(daily_start_datetimes)
+    for conversation in conversations:
+        days_after_first = (conversation.date_requested() - first_daily_start_datetime) // one_day
+        daily_start_datetime = first_daily_start_datetime + days_after_first * one_day
+        if daily_start_datetime in days:
+            yield daily_start_datetime, conversation
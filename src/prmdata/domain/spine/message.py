@@ -1,8 +1,10 @@
 import logging
+import sys
 from datetime import datetime
-from typing import Iterable, Iterator, NamedTuple, Optional
+from enum import IntEnum
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
-from dateutil import parser
+from prmdata.utils.date_converter import parse_timestamp
 
 logger = logging.getLogger(__name__)
 
@@ -15,37 +17,164 @@ ERROR_SUPPRESSED = 15
 DUPLICATE_ERROR = 12
 FATAL_SENDER_ERROR_CODES = [6, 7, 10, 14, 23, 24, 99, 30]
 
+SPLUNK_COLUMNS = [
+    "_time",
+    "conversationID",
+    "GUID",
+    "interactionID",
+    "messageSender",
+    "messageRecipient",
+    "messageRef",
+    "jdiEvent",
+    "fromSystem",
+    "toSystem",
+]
+OPTIONAL_SPLUNK_COLUMNS = ["fromSystem", "toSystem"]
+REQUIRED_SPLUNK_COLUMNS = [name for name in SPLUNK_COLUMNS if name not in OPTIONAL_SPLUNK_COLUMNS]
+
+SplunkRow = Tuple[Any, ...]
+
+# Bump whenever construct_messages_from_splunk_items would build different messages
+# from the same input, so that cached parsed spine files are invalidated.
+PARSER_VERSION = "1"
+
 
 class FailedToConstructMessagesFromSplunkItemsError(Exception):
     pass
 
 
-class Message(NamedTuple):
-    time: datetime
-    conversation_id: str
-    guid: str
-    interaction_id: str
-    from_party_asid: str
-    to_party_asid: str
-    message_ref: Optional[str]
-    error_code: Optional[int]
-    from_system: Optional[str]
-    to_system: Optional[str]
+class InteractionType(IntEnum):
+    UNKNOWN = 0
+    EHR_REQUEST_STARTED = 1
+    EHR_REQUEST_COMPLETED = 2
+    APPLICATION_ACK = 3
+    COMMON_POINT_TO_POINT = 4
+
+
+_INTERACTION_TYPES = {
+    EHR_REQUEST_STARTED: InteractionType.EHR_REQUEST_STARTED,
+    EHR_REQUEST_COMPLETED: InteractionType.EHR_REQUEST_COMPLETED,
+    APPLICATION_ACK: InteractionType.APPLICATION_ACK,
+    COMMON_POINT_TO_POINT: InteractionType.COMMON_POINT_TO_POINT,
+}
+_INTERACTION_IDS = {
+    interaction_type: interaction_id
+    for interaction_id, interaction_type in _INTERACTION_TYPES.items()
+}
+
+
+def interaction_type_of(interaction_id: Optional[str]) -> InteractionType:
+    return _INTERACTION_TYPES.get(interaction_id, InteractionType.UNKNOWN)  # type: ignore
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return None if value is None else sys.intern(value)
+
+
+class Message:
+    __slots__ = (
+        "time",
+        "conversation_id",
+        "guid",
+        "interaction_type",
+        "_unknown_interaction_id",
+        "from_party_asid",
+        "to_party_asid",
+        "message_ref",
+        "error_code",
+        "from_system",
+        "to_system",
+    )
+
+    def __init__(
+        self,
+        time: datetime,
+        conversation_id: str,
+        guid: str,
+        interaction_id: str,
+        from_party_asid: str,
+        to_party_asid: str,
+        message_ref: Optional[str],
+        error_code: Optional[int],
+        from_system: Optional[str],
+        to_system: Optional[str],
+    ):
+        interaction_type = interaction_type_of(interaction_id)
+        self.time = time
+        self.conversation_id = conversation_id
+        self.guid = guid
+        self.interaction_type = interaction_type
+        self._unknown_interaction_id = (
+            interaction_id if interaction_type is InteractionType.UNKNOWN else None
+        )
+        self.from_party_asid = _intern(from_party_asid)
+        self.to_party_asid = _intern(to_party_asid)
+        self.message_ref = message_ref
+        self.error_code = error_code
+        self.from_system = _intern(from_system)
+        self.to_system = _intern(to_system)
+
+    @property
+    def interaction_id(self) -> str:
+        if self.interaction_type is InteractionType.UNKNOWN:
+            return self._unknown_interaction_id  # type: ignore
+        return _INTERACTION_IDS[self.interaction_type]
+
+    def _values(self) -> tuple:
+        return (
+            self.time,
+            self.conversation_id,
+            self.guid,
+            self.interaction_id,
+            self.from_party_asid,
+            self.to_party_asid,
+            self.message_ref,
+            self.error_code,
+            self.from_system,
+            self.to_system,
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, Message):
+            return NotImplemented
+        return self._values() == other._values()
+
+    # Messages compare by value but their slots can be reassigned, so they are left unhashable
+    # rather than hashing by values that could change while held in a set or dict.
+    __hash__ = None  # type: ignore
+
+    def __repr__(self):
+        return (
+            f"Message(time={self.time!r}, conversation_id={self.conversation_id!r}, "
+            f"guid={self.guid!r}, interaction_id={self.interaction_id!r}, "
+            f"from_party_asid={self.from_party_asid!r}, to_party_asid={self.to_party_asid!r}, "
+            f"message_ref={self.message_ref!r}, error_code={self.error_code!r}, "
+            f"from_system={self.from_system!r}, to_system={self.to_system!r})"
+        )
+
+    def __reduce__(self):
+        return Message, self._values()
+
+    def is_gp2gp_interaction(self):
+        return self.interaction_type is not InteractionType.UNKNOWN
 
     def is_ehr_request_started(self):
-        return self.interaction_id == EHR_REQUEST_STARTED
+        return self.interaction_type is InteractionType.EHR_REQUEST_STARTED
 
     def is_ehr_request_completed(self):
-        return self.interaction_id == EHR_REQUEST_COMPLETED
+        return self.interaction_type is InteractionType.EHR_REQUEST_COMPLETED
 
     def is_acknowledgement_of(self, other_message):
-        return self.interaction_id == APPLICATION_ACK and self.message_ref == other_message.guid
+        return (
+            self.interaction_type is InteractionType.APPLICATION_ACK
+            and self.message_ref == other_message.guid
+        )
 
     def is_acknowledgement(self):
-        return self.interaction_id == APPLICATION_ACK
+        return self.interaction_type is InteractionType.APPLICATION_ACK
 
     def is_copc(self):
-        return self.interaction_id == COMMON_POINT_TO_POINT
+        return self.interaction_type is InteractionType.COMMON_POINT_TO_POINT
 
 
 def _parse_error_code(error):
@@ -58,29 +187,67 @@ def _parse_message_ref(ref):
     return None if ref == "NotProvided" or not ref else ref
 
 
-def construct_messages_from_splunk_items(items: Iterable[dict]) -> Iterator[Message]:
-    one_hour_in_seconds = 3600
-    timezone_info = {"BST": one_hour_in_seconds, "UTC": 0}
-
-    for item in items:
+def _construct_message(row: SplunkRow) -> Message:
+    (
+        time,
+        conversation_id,
+        guid,
+        interaction_id,
+        message_sender,
+        message_recipient,
+        message_ref,
+        jdi_event,
+        from_system,
+        to_system,
+    ) = row
+    return Message(
+        time=parse_timestamp(time),
+        conversation_id=conversation_id,
+        guid=guid,
+        interaction_id=interaction_id,
+        from_party_asid=message_sender,
+        to_party_asid=message_recipient,
+        message_ref=_parse_message_ref(message_ref),
+        error_code=_parse_error_code(jdi_event),
+        from_system=from_system,
+        to_system=to_system,
+    )
+
+
+def _construct_messages_from_splunk_rows(rows: Iterable[SplunkRow]) -> Iterator[Message]:
+    for row in rows:
         try:
-            yield Message(
-                time=parser.parse(item["_time"], tzinfos=timezone_info),
-                conversation_id=item["conversationID"],
-                guid=item["GUID"],
-                interaction_id=item["interactionID"],
-                from_party_asid=item["messageSender"],
-                to_party_asid=item["messageRecipient"],
-                message_ref=_parse_message_ref(item["messageRef"]),
-                error_code=_parse_error_code(item["jdiEvent"]),
-                from_system=item.get("fromSystem"),
-                to_system=item.get("toSystem"),
-            )
+            yield _construct_message(row)
 
         except ValueError as e:
             logger.error("Failed to parse messages when constructing messages from splunk")
             raise FailedToConstructMessagesFromSplunkItemsError(
-                f"Failed to construct_messages_from_splunk_items with message GUID: {item['GUID']} "
-                + f"and time: {item['_time']}",
+                f"Failed to construct_messages_from_splunk_items with message GUID: {row[2]} "
+                + f"and time: {row[0]}",
                 e,
             )
+
+
+def _splunk_item_to_row(item: dict) -> SplunkRow:
+    return (
+        item["_time"],
+        item["conversationID"],
+        item["GUID"],
+        item["interactionID"],
+        item["messageSender"],
+        item["messageRecipient"],
+        item["messageRef"],
+        item["jdiEvent"],
+        item.get("fromSystem"),
+        item.get("toSystem"),
+    )
+
+
+def construct_messages_from_splunk_items(items: Iterable[dict]) -> Iterator[Message]:
+    return _construct_messages_from_splunk_rows(_splunk_item_to_row(item) for item in items)
+
+
+def construct_messages_from_splunk_columns(
+    columns: Dict[str, List[Optional[str]]]
+) -> Iterator[Message]:
+    return _construct_messages_from_splunk_rows(zip(*(columns[name] for name in SPLUNK_COLUMNS)))
@@ -1,9 +1,14 @@
-from typing import Callable, Generic, Iterable, List, Tuple, TypeVar
+from datetime import datetime, tzinfo
+from functools import lru_cache
+from typing import Callable, Generic, Iterable, Iterator, List, NamedTuple, Optional, Tuple, TypeVar
 
 import pyarrow as pa
-from pyarrow import DataType, Table
+import pyarrow.compute as pc
+from dateutil.tz import tzoffset
+from pyarrow import Array, ChunkedArray, DataType, RecordBatch, Schema, Table
 
 from prmdata.domain.gp2gp.transfer import Transfer
+from prmdata.domain.spine.message import Message, construct_messages_from_splunk_columns
 
 Value = TypeVar("Value")
 
@@ -19,8 +24,10 @@ class Column(Generic[Value]):
         value = self._read_value(transfer)
         self._items.append(value)
 
-    def data(self) -> Tuple[str, List]:
-        return self._name, self._items
+    def take_array(self) -> Array:
+        array = pa.array(self._items, type=self._data_type)
+        self._items = []
+        return array
 
     def schema(self) -> Tuple[str, DataType]:
         return self._name, self._data_type
@@ -30,8 +37,8 @@ def _int_list():
     return pa.list_(pa.int64())
 
 
-def _transfer_columns():
-    return [
+def _transfer_columns(include_outcome_predicates: bool = False):
+    columns = [
         Column("conversation_id", pa.string(), lambda t: t.conversation_id),
         Column("sla_duration", pa.uint64(), lambda t: t.sla_duration_seconds),
         Column("requesting_practice_asid", pa.string(), lambda t: t.requesting_practice.asid),
@@ -73,16 +80,202 @@ def _transfer_columns():
             lambda t: t.last_sender_message_timestamp,
         ),
     ]
+    if include_outcome_predicates:
+        columns.append(Column("outcome_predicates", pa.uint16(), lambda t: t.outcome_predicates))
+    return columns
 
 
-def convert_transfers_to_table(transfers: Iterable[Transfer]) -> Table:
-    columns = _transfer_columns()
+def transfer_table_schema(include_outcome_predicates: bool = False) -> Schema:
+    return pa.schema(column.schema() for column in _transfer_columns(include_outcome_predicates))
 
-    for transfer in transfers:
-        for column in columns:
+
+TRANSFER_RECORD_BATCH_SIZE = 16_384
+
+
+# Converts every batch_size transfers into an Arrow record batch, so the Python lists behind
+# each column never hold more than one batch of transfers.
+class TransferTableBuilder:
+    def __init__(
+        self,
+        include_outcome_predicates: bool = False,
+        batch_size: int = TRANSFER_RECORD_BATCH_SIZE,
+    ):
+        self._columns = _transfer_columns(include_outcome_predicates)
+        self._schema = pa.schema(column.schema() for column in self._columns)
+        self._batch_size = batch_size
+        self._pending_count = 0
+        self._batches: List[RecordBatch] = []
+
+    def add(self, transfer: Transfer):
+        for column in self._columns:
             column.add(transfer)
+        self._pending_count += 1
+        if self._pending_count == self._batch_size:
+            self._batches.append(self._take_batch())
+
+    def _take_batch(self) -> RecordBatch:
+        self._pending_count = 0
+        return RecordBatch.from_arrays(
+            [column.take_array() for column in self._columns], schema=self._schema
+        )
+
+    def take_batches(self) -> List[RecordBatch]:
+        batches, self._batches = self._batches, []
+        return batches
+
+    def build(self) -> Table:
+        if self._pending_count > 0:
+            self._batches.append(self._take_batch())
+        return Table.from_batches(self.take_batches(), schema=self._schema)
+
+
+def convert_transfers_to_table(
+    transfers: Iterable[Transfer], include_outcome_predicates: bool = False
+) -> Table:
+    builder = TransferTableBuilder(include_outcome_predicates)
 
-    return pa.table(
-        data=dict(column.data() for column in columns),
-        schema=pa.schema(column.schema() for column in columns),
+    for transfer in transfers:
+        builder.add(transfer)
+
+    return builder.build()
+
+
+# Ends with the conversation id, which is unique, so that the row order is fully determined
+def sort_transfers(transfers: Table, sort_keys: List[str]) -> Table:
+    keys = [key for key in sort_keys if key != "conversation_id"] + ["conversation_id"]
+    return transfers.take(
+        pc.sort_indices(transfers, sort_keys=[(key, "ascending") for key in keys])
     )
+
+
+def sort_transfers_by_conversation_id(transfers: Table) -> Table:
+    return sort_transfers(transfers, sort_keys=[])
+
+
+def _dictionary_string():
+    return pa.dictionary(pa.int32(), pa.string())
+
+
+MESSAGE_TABLE_SCHEMA = pa.schema(
+    [
+        ("time", pa.timestamp("us")),
+        ("time_utc_offset", pa.int32()),
+        ("time_zone_name", _dictionary_string()),
+        ("conversation_id", pa.string()),
+        ("guid", pa.string()),
+        ("interaction_id", _dictionary_string()),
+        ("from_party_asid", pa.string()),
+        ("to_party_asid", pa.string()),
+        ("message_ref", pa.string()),
+        ("error_code", pa.int32()),
+        ("from_system", _dictionary_string()),
+        ("to_system", _dictionary_string()),
+    ]
+)
+
+
+def _utc_offset_seconds(time: datetime) -> Optional[int]:
+    offset = time.utcoffset()
+    return None if offset is None else int(offset.total_seconds())
+
+
+def convert_messages_to_table(messages: Iterable[Message]) -> Table:
+    columns: List[List] = [[] for _ in MESSAGE_TABLE_SCHEMA]
+
+    for message in messages:
+        values = (
+            message.time.replace(tzinfo=None),
+            _utc_offset_seconds(message.time),
+            message.time.tzname(),
+            message.conversation_id,
+            message.guid,
+            message.interaction_id,
+            message.from_party_asid,
+            message.to_party_asid,
+            message.message_ref,
+            message.error_code,
+            message.from_system,
+            message.to_system,
+        )
+        for column, value in zip(columns, values):
+            column.append(value)
+
+    return pa.table(dict(zip(MESSAGE_TABLE_SCHEMA.names, columns)), schema=MESSAGE_TABLE_SCHEMA)
+
+
+@lru_cache(maxsize=None)
+def _timezone(name: Optional[str], utc_offset: int) -> tzinfo:
+    return tzoffset(name, utc_offset)
+
+
+def _restore_timezone(
+    time: datetime, utc_offset: Optional[int], time_zone_name: Optional[str]
+) -> datetime:
+    if utc_offset is None:
+        return time
+    return time.replace(tzinfo=_timezone(time_zone_name, utc_offset))
+
+
+def _decode_column(column: Array) -> list:
+    # Array.to_pylist builds a pyarrow scalar per value, which costs several times more than
+    # classifying the message, so columns are decoded a whole array at a time instead.
+    if pa.types.is_dictionary(column.type):
+        values = _decode_column(column.dictionary) + [None]
+        return [values[index] for index in _decode_column(pc.fill_null(column.indices, -1))]
+    if pa.types.is_timestamp(column.type):
+        return column.to_numpy(zero_copy_only=False).astype("datetime64[us]").tolist()
+    if pa.types.is_integer(column.type) and column.null_count > 0:
+        values = pc.fill_null(column, 0).to_numpy().tolist()
+        is_valid = column.is_valid().to_numpy(zero_copy_only=False).tolist()
+        return [value if valid else None for value, valid in zip(values, is_valid)]
+    return column.to_numpy(zero_copy_only=False).tolist()
+
+
+def convert_table_to_messages(table: Table) -> Iterator[Message]:
+    for record_batch in table.select(MESSAGE_TABLE_SCHEMA.names).to_batches():
+        rows = zip(*(_decode_column(column) for column in record_batch.columns))
+        for (
+            time,
+            utc_offset,
+            time_zone_name,
+            conversation_id,
+            guid,
+            interaction_id,
+            from_party_asid,
+            to_party_asid,
+            message_ref,
+            error_code,
+            from_system,
+            to_system,
+        ) in rows:
+            yield Message(
+                time=_restore_timezone(time, utc_offset, time_zone_name),
+                conversation_id=conversation_id,
+                guid=guid,
+                interaction_id=interaction_id,
+                from_party_asid=from_party_asid,
+                to_party_asid=to_party_asid,
+                message_ref=message_ref,
+                error_code=error_code,
+                from_system=from_system,
+                to_system=to_system,
+            )
+
+
+# A spine file read into Arrow without building its messages: either the Splunk CSV columns as
+# read, or the table the parsed spine cache holds for it.
+class SpineTable(NamedTuple):
+    table: Table
+    is_parsed: bool
+
+    def conversation_ids(self) -> ChunkedArray:
+        return self.table["conversation_id" if self.is_parsed else "conversationID"]
+
+
+def convert_spine_tables_to_messages(spine_tables: Iterable[SpineTable]) -> Iterator[Message]:
+    for spine_table in spine_tables:
+        if spine_table.is_parsed:
+            yield from convert_table_to_messages(spine_table.table)
+            continue
+        for record_batch in spine_table.table.to_batches():
+            yield from construct_messages_from_splunk_columns(record_batch.to_pydict())
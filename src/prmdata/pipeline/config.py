@@ -1,17 +1,40 @@
 import logging
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import List, Optional
 
 from dateutil.parser import isoparse
 
 logger = logging.getLogger(__name__)
 
+# Transfer columns whose values repeat from row to row, which dictionary encode well. Unique
+# conversation ids, durations and timestamps are left plain.
+DEFAULT_PARQUET_DICTIONARY_COLUMNS = [
+    "status",
+    "failure_reason",
+    "requesting_supplier",
+    "sending_supplier",
+    "requesting_practice_asid",
+    "requesting_practice_ods_code",
+    "requesting_practice_name",
+    "requesting_practice_sicbl_ods_code",
+    "requesting_practice_sicbl_name",
+    "sending_practice_asid",
+    "sending_practice_ods_code",
+    "sending_practice_name",
+    "sending_practice_sicbl_ods_code",
+    "sending_practice_sicbl_name",
+]
+
 
 class MissingEnvironmentVariable(Exception):
     pass
 
 
+class IncompatibleConfiguration(Exception):
+    pass
+
+
 class EnvConfig:
     def __init__(self, env_vars):
         self._env_vars = env_vars
@@ -40,6 +63,17 @@ class EnvConfig:
     def read_optional_int(self, name: str, default: int) -> int:
         return self._read_env(name, optional=True, converter=int, default=default)
 
+    def read_optional_int_or_none(self, name: str) -> Optional[int]:
+        return self._read_env(name, optional=True, converter=int)
+
+    def read_optional_list(self, name: str, default: List[str]) -> List[str]:
+        return self._read_env(
+            name,
+            optional=True,
+            converter=lambda env_var: [item.strip() for item in env_var.split(",") if item.strip()],
+            default=default,
+        )
+
     def read_optional_timedelta_days(self, name: str, default: timedelta) -> timedelta:
         return self._read_env(
             name,
@@ -69,6 +103,61 @@ class TransferClassifierConfig:
     conversation_cutoff: timedelta
     s3_endpoint_url: Optional[str]
     classify_mi_events: Optional[bool]
+    arrow_spine_ingestion: bool
+    spine_prefetch_workers: int
+    spine_prefetch_depth: int
+    s3_cache_directory: Optional[str]
+    s3_cache_max_size_mb: int
+    parsed_spine_cache_directory: Optional[str]
+    parsed_spine_cache_max_size_mb: int
+    filter_irrelevant_spine_messages: bool
+    conversation_spill_memory_budget_mb: int
+    conversation_spill_directory: Optional[str]
+    streaming_conversation_assembly: bool
+    streaming_allowed_lateness: timedelta
+    vectorised_classification: bool
+    include_outcome_predicates: bool
+    classification_workers: int
+    normalise_transfer_order: bool
+    aggregate_observability_events: bool
+    observability_event_sample_size: int
+    ods_lookup_cache_directory: Optional[str]
+    ods_lookup_cache_max_size_mb: int
+    parquet_dictionary_columns: List[str]
+    parquet_compression: str
+    parquet_compression_level: Optional[int]
+    parquet_row_group_size: int
+    parquet_write_statistics: bool
+    transfer_sort_keys: List[str]
+    output_upload_workers: int
+    skip_unchanged_outputs: bool
+
+    def __post_init__(self):
+        if self.vectorised_classification:
+            self._reject_settings_ignored_by(
+                "VECTORISED_CLASSIFICATION", filters_messages=False, uses_workers=False
+            )
+        elif self.classification_workers > 0:
+            self._reject_settings_ignored_by(
+                "CLASSIFICATION_WORKERS", filters_messages=True, uses_workers=True
+            )
+
+    # The vectorised and parallel engines group conversations themselves, so they cannot spill
+    # or stream them. Only the parallel one filters irrelevant messages first, and the vectorised
+    # one runs in a single process.
+    def _reject_settings_ignored_by(self, engine: str, filters_messages: bool, uses_workers: bool):
+        ignored_settings = {
+            "FILTER_IRRELEVANT_SPINE_MESSAGES": self.filter_irrelevant_spine_messages
+            and not filters_messages,
+            "CLASSIFICATION_WORKERS": self.classification_workers > 0 and not uses_workers,
+            "CONVERSATION_SPILL_MEMORY_BUDGET_MB": self.conversation_spill_memory_budget_mb > 0,
+            "STREAMING_CONVERSATION_ASSEMBLY": self.streaming_conversation_assembly,
+        }
+        ignored_names = [name for name, is_set in ignored_settings.items() if is_set]
+        if ignored_names:
+            raise IncompatibleConfiguration(
+                f"{', '.join(ignored_names)} cannot be used with {engine}, exiting..."
+            )
 
     def __str__(self):
         return str(self.__dict__)
@@ -89,4 +178,58 @@ class TransferClassifierConfig:
             ),
             s3_endpoint_url=env.read_optional_str("S3_ENDPOINT_URL"),
             classify_mi_events=env.read_optional_bool("CLASSIFY_MI_EVENTS", default=False),
+            arrow_spine_ingestion=env.read_optional_bool("ARROW_SPINE_INGESTION", default=True),
+            spine_prefetch_workers=env.read_optional_int("SPINE_PREFETCH_WORKERS", default=2),
+            spine_prefetch_depth=env.read_optional_int("SPINE_PREFETCH_DEPTH", default=2),
+            s3_cache_directory=env.read_optional_str("S3_CACHE_DIRECTORY"),
+            s3_cache_max_size_mb=env.read_optional_int("S3_CACHE_MAX_SIZE_MB", default=10240),
+            parsed_spine_cache_directory=env.read_optional_str("PARSED_SPINE_CACHE_DIRECTORY"),
+            parsed_spine_cache_max_size_mb=env.read_optional_int(
+                "PARSED_SPINE_CACHE_MAX_SIZE_MB", default=10240
+            ),
+            filter_irrelevant_spine_messages=env.read_optional_bool(
+                "FILTER_IRRELEVANT_SPINE_MESSAGES", default=False
+            ),
+            conversation_spill_memory_budget_mb=env.read_optional_int(
+                "CONVERSATION_SPILL_MEMORY_BUDGET_MB", default=0
+            ),
+            conversation_spill_directory=env.read_optional_str("CONVERSATION_SPILL_DIRECTORY"),
+            streaming_conversation_assembly=env.read_optional_bool(
+                "STREAMING_CONVERSATION_ASSEMBLY", default=False
+            ),
+            streaming_allowed_lateness=env.read_optional_timedelta_days(
+                "STREAMING_ALLOWED_LATENESS_DAYS", timedelta(days=1)
+            ),
+            vectorised_classification=env.read_optional_bool(
+                "VECTORISED_CLASSIFICATION", default=False
+            ),
+            include_outcome_predicates=env.read_optional_bool(
+                "INCLUDE_OUTCOME_PREDICATES", default=False
+            ),
+            classification_workers=env.read_optional_int("CLASSIFICATION_WORKERS", default=0),
+            normalise_transfer_order=env.read_optional_bool(
+                "NORMALISE_TRANSFER_ORDER", default=False
+            ),
+            aggregate_observability_events=env.read_optional_bool(
+                "AGGREGATE_OBSERVABILITY_EVENTS", default=False
+            ),
+            observability_event_sample_size=env.read_optional_int(
+                "OBSERVABILITY_EVENT_SAMPLE_SIZE", default=5
+            ),
+            ods_lookup_cache_directory=env.read_optional_str("ODS_LOOKUP_CACHE_DIRECTORY"),
+            ods_lookup_cache_max_size_mb=env.read_optional_int(
+                "ODS_LOOKUP_CACHE_MAX_SIZE_MB", default=1024
+            ),
+            parquet_dictionary_columns=env.read_optional_list(
+                "PARQUET_DICTIONARY_COLUMNS", default=DEFAULT_PARQUET_DICTIONARY_COLUMNS
+            ),
+            parquet_compression=env.read_optional_str("PARQUET_COMPRESSION") or "zstd",
+            parquet_compression_level=env.read_optional_int_or_none("PARQUET_COMPRESSION_LEVEL"),
+            parquet_row_group_size=env.read_optional_int("PARQUET_ROW_GROUP_SIZE", default=65_536),
+            parquet_write_statistics=env.read_optional_bool(
+                "PARQUET_WRITE_STATISTICS", default=True
+            ),
+            transfer_sort_keys=env.read_optional_list("TRANSFER_SORT_KEYS", default=[]),
+            output_upload_workers=env.read_optional_int("OUTPUT_UPLOAD_WORKERS", default=0),
+            skip_unchanged_outputs=env.read_optional_bool("SKIP_UNCHANGED_OUTPUTS", default=False),
         )
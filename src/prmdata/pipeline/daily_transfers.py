@@ -0,0 +1,59 @@
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, Tuple
+
+from pyarrow import Table
+
+from prmdata.domain.gp2gp.transfer_service import TransferService
+from prmdata.domain.ods_portal.organisation_lookup import OrganisationLookup
+from prmdata.domain.spine.gp2gp_conversation import Gp2gpConversation, assign_conversations_to_days
+from prmdata.pipeline.arrow import TransferTableBuilder
+
+# Spine files are exported in local time, so a day's conversations can still turn up while the
+# following day's file is being read.
+DAY_COMPLETION_GRACE = timedelta(days=1)
+
+
+class ConversationForCompletedDayError(Exception):
+    pass
+
+
+def _check_day_not_completed(
+    builders: Dict[datetime, TransferTableBuilder], daily_start_datetime: datetime
+):
+    if daily_start_datetime not in builders:
+        raise ConversationForCompletedDayError(
+            f"Conversation requested on {daily_start_datetime.date()} arrived after that day's"
+            " transfers were built, spine messages must be read in time order"
+        )
+
+
+# Conversations arrive in the order their first message was read and spine files are read a day
+# at a time, so once a conversation from two days after a day arrives, that day is complete. Its
+# table is yielded then and its builder freed, so only the days still open are held in memory.
+def build_daily_transfer_tables(
+    transfer_service: TransferService,
+    conversations: Iterable[Gp2gpConversation],
+    organisation_lookups: Dict[datetime, OrganisationLookup],
+    include_outcome_predicates: bool = False,
+) -> Iterator[Tuple[datetime, Table]]:
+    open_days = deque(sorted(organisation_lookups))
+    builders = {
+        daily_start_datetime: TransferTableBuilder(include_outcome_predicates)
+        for daily_start_datetime in open_days
+    }
+    for daily_start_datetime, conversation in assign_conversations_to_days(
+        conversations, list(open_days)
+    ):
+        while open_days and open_days[0] < daily_start_datetime - DAY_COMPLETION_GRACE:
+            completed_day = open_days.popleft()
+            yield completed_day, builders.pop(completed_day).build()
+        _check_day_not_completed(builders, daily_start_datetime)
+        builders[daily_start_datetime].add(
+            transfer_service.derive_transfer(
+                conversation, organisation_lookups[daily_start_datetime]
+            )
+        )
+    while open_days:
+        completed_day = open_days.popleft()
+        yield completed_day, builders.pop(completed_day).build()
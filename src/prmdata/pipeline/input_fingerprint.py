@@ -0,0 +1,49 @@
+import json
+from hashlib import sha256
+from typing import Any, Dict, Optional
+
+from prmdata.pipeline.config import TransferClassifierConfig
+
+INPUT_FINGERPRINT_METADATA_KEY = "input-fingerprint"
+
+
+def _classification_engine(config: TransferClassifierConfig) -> str:
+    if config.vectorised_classification:
+        return "vectorised"
+    if config.classification_workers > 0:
+        return "parallel"
+    return "serial"
+
+
+def _streaming_allowed_lateness_days(config: TransferClassifierConfig) -> Optional[int]:
+    if config.streaming_conversation_assembly:
+        return config.streaming_allowed_lateness.days
+    return None
+
+
+# Every setting that can change the transfers written, or the bytes they are written as. The
+# engines list transfers in different orders, so the engine counts as one too.
+def output_settings(config: TransferClassifierConfig) -> Dict[str, Any]:
+    return {
+        "cutoff-days": config.conversation_cutoff.days,
+        "build-tag": config.build_tag,
+        "classification-engine": _classification_engine(config),
+        "filter-irrelevant-spine-messages": config.filter_irrelevant_spine_messages,
+        "streaming-allowed-lateness-days": _streaming_allowed_lateness_days(config),
+        "include-outcome-predicates": config.include_outcome_predicates,
+        "normalise-transfer-order": config.normalise_transfer_order,
+        "transfer-sort-keys": config.transfer_sort_keys,
+        "parquet-dictionary-columns": config.parquet_dictionary_columns,
+        "parquet-compression": config.parquet_compression,
+        "parquet-compression-level": config.parquet_compression_level,
+        "parquet-row-group-size": config.parquet_row_group_size,
+        "parquet-write-statistics": config.parquet_write_statistics,
+    }
+
+
+# Identifies everything a day's transfers are derived from: the ETag of every input object read
+# for the run, and the settings that change what is written. Conversations are grouped across the
+# whole reporting window, so each day shares the run's fingerprint rather than having its own.
+def fingerprint_inputs(input_e_tags: Dict[str, str], settings: Dict[str, Any]) -> str:
+    document = json.dumps({"inputs": input_e_tags, "settings": settings}, sort_keys=True)
+    return sha256(document.encode("utf-8")).hexdigest()
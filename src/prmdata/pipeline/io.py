@@ -1,37 +1,209 @@
 import logging
-from typing import Dict, Iterable, Iterator, List
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
 
-from prmdata.domain.gp2gp.transfer import Transfer
-from prmdata.domain.ods_portal.organisation_metadata_monthly import OrganisationMetadataMonthly
-from prmdata.domain.spine.message import Message, construct_messages_from_splunk_items
-from prmdata.pipeline.arrow import convert_transfers_to_table
+import pyarrow as pa
+from pyarrow import Table
+
+from prmdata.domain.ods_portal.organisation_lookup import OrganisationLookup
+from prmdata.domain.ods_portal.organisation_metadata_monthly import (
+    OrganisationMetadataMonthly,
+    construct_organisation_lookup,
+)
+from prmdata.domain.spine.message import (
+    OPTIONAL_SPLUNK_COLUMNS,
+    REQUIRED_SPLUNK_COLUMNS,
+    Message,
+    construct_messages_from_splunk_columns,
+    construct_messages_from_splunk_items,
+)
+from prmdata.pipeline.arrow import (
+    MESSAGE_TABLE_SCHEMA,
+    SpineTable,
+    convert_messages_to_table,
+    convert_table_to_messages,
+    sort_transfers,
+    transfer_table_schema,
+)
+from prmdata.pipeline.ods_lookup_cache import CompiledOdsLookupCache
+from prmdata.pipeline.spine_message_cache import ParsedSpineMessageCache
 from prmdata.utils.input_output.s3 import S3DataManager
+from prmdata.utils.prefetch import prefetch
 
 logger = logging.getLogger(__name__)
 
 
+class _SpineFile(NamedTuple):
+    uri: str
+    e_tag: Optional[str]
+    contents: Any
+    is_parsed: bool
+
+
+# Checked up front so a bad key fails before the window is classified rather than when the
+# first day is written. Arrow cannot sort by list columns such as the error codes.
+def _check_transfer_sort_keys(sort_keys: List[str], include_outcome_predicates: bool):
+    schema = transfer_table_schema(include_outcome_predicates)
+    unknown_sort_keys = sorted(set(sort_keys) - set(schema.names))
+    if unknown_sort_keys:
+        raise ValueError(f"Unknown transfer sort keys: {', '.join(unknown_sort_keys)}")
+    unsortable_sort_keys = [key for key in sort_keys if pa.types.is_nested(schema.field(key).type)]
+    if unsortable_sort_keys:
+        raise ValueError(f"Cannot sort transfers by: {', '.join(unsortable_sort_keys)}")
+
+
 class TransferClassifierIO:
-    def __init__(self, s3_data_manager: S3DataManager):
+    def __init__(
+        self,
+        s3_data_manager: S3DataManager,
+        arrow_spine_ingestion: bool = False,
+        spine_prefetch_workers: int = 0,
+        spine_prefetch_depth: int = 0,
+        parsed_spine_cache: Optional[ParsedSpineMessageCache] = None,
+        include_outcome_predicates: bool = False,
+        normalise_transfer_order: bool = False,
+        ods_lookup_cache: Optional[CompiledOdsLookupCache] = None,
+        transfer_sort_keys: Optional[List[str]] = None,
+    ):
         self._s3_manager = s3_data_manager
+        self._arrow_spine_ingestion = arrow_spine_ingestion
+        self._spine_prefetch_workers = spine_prefetch_workers
+        self._spine_prefetch_depth = spine_prefetch_depth
+        self._parsed_spine_cache = parsed_spine_cache
+        self._normalise_transfer_order = normalise_transfer_order
+        self._ods_lookup_cache = ods_lookup_cache
+        self._transfer_sort_keys = transfer_sort_keys or []
+        _check_transfer_sort_keys(self._transfer_sort_keys, include_outcome_predicates)
+
+    def _sorts_transfers(self) -> bool:
+        return self._normalise_transfer_order or len(self._transfer_sort_keys) > 0
+
+    def _prefetches_spine_files(self) -> bool:
+        return self._spine_prefetch_workers > 0 and self._spine_prefetch_depth > 0
+
+    def _read_spine_csv_table(self, uri: str) -> Table:
+        return self._s3_manager.read_gzip_csv_table(
+            uri,
+            column_names=REQUIRED_SPLUNK_COLUMNS,
+            optional_column_names=OPTIONAL_SPLUNK_COLUMNS,
+        )
+
+    def _load_spine_file(self, uri: str) -> _SpineFile:
+        e_tag = None
+        if self._parsed_spine_cache is not None:
+            e_tag = self._s3_manager.read_e_tag(uri)
+            cached_table = self._parsed_spine_cache.read(uri, e_tag)
+            if cached_table is not None:
+                return _SpineFile(uri, e_tag, cached_table, is_parsed=True)
+
+        if self._arrow_spine_ingestion:
+            return _SpineFile(uri, e_tag, self._read_spine_csv_table(uri), is_parsed=False)
+        items = self._s3_manager.read_gzip_csv(uri)
+        contents = list(items) if self._prefetches_spine_files() else items
+        return _SpineFile(uri, e_tag, contents, is_parsed=False)
+
+    def _parse_spine_file(self, spine_file: _SpineFile) -> Iterator[Message]:
+        if self._arrow_spine_ingestion:
+            for record_batch in spine_file.contents.to_batches():
+                yield from construct_messages_from_splunk_columns(record_batch.to_pydict())
+        else:
+            yield from construct_messages_from_splunk_items(spine_file.contents)
+
+    def _parse_and_cache_spine_file(
+        self, spine_file: _SpineFile, cache: ParsedSpineMessageCache, e_tag: str
+    ) -> Iterator[Message]:
+        messages = []
+        for message in self._parse_spine_file(spine_file):
+            messages.append(message)
+            yield message
+        cache.write(spine_file.uri, e_tag, convert_messages_to_table(messages))
+
+    def _construct_spine_messages(self, spine_file: _SpineFile) -> Iterator[Message]:
+        if spine_file.is_parsed:
+            return convert_table_to_messages(spine_file.contents)
+        if self._parsed_spine_cache is not None and spine_file.e_tag is not None:
+            return self._parse_and_cache_spine_file(
+                spine_file, self._parsed_spine_cache, spine_file.e_tag
+            )
+        return self._parse_spine_file(spine_file)
 
     def read_spine_messages(self, s3_uris: List[str]) -> Iterator[Message]:
-        for uri in s3_uris:
-            data = self._s3_manager.read_gzip_csv(uri)
-            yield from construct_messages_from_splunk_items(data)
+        spine_files = prefetch(
+            self._load_spine_file,
+            s3_uris,
+            max_workers=self._spine_prefetch_workers,
+            depth=self._spine_prefetch_depth,
+        )
+        for spine_file in spine_files:
+            yield from self._construct_spine_messages(spine_file)
+
+    def _construct_spine_message_table(self, spine_file: _SpineFile) -> Table:
+        if spine_file.is_parsed:
+            return spine_file.contents
+        return convert_messages_to_table(self._construct_spine_messages(spine_file))
+
+    def read_spine_message_table(self, s3_uris: List[str]) -> Table:
+        spine_files = prefetch(
+            self._load_spine_file,
+            s3_uris,
+            max_workers=self._spine_prefetch_workers,
+            depth=self._spine_prefetch_depth,
+        )
+        tables = [self._construct_spine_message_table(spine_file) for spine_file in spine_files]
+        return pa.concat_tables([MESSAGE_TABLE_SCHEMA.empty_table(), *tables])
+
+    def _load_spine_table(self, uri: str) -> SpineTable:
+        if self._parsed_spine_cache is not None:
+            cached_table = self._parsed_spine_cache.read(uri, self._s3_manager.read_e_tag(uri))
+            if cached_table is not None:
+                return SpineTable(cached_table, is_parsed=True)
+        return SpineTable(self._read_spine_csv_table(uri), is_parsed=False)
 
-    def write_transfers(self, transfers: Iterable[Transfer], s3_uri: str, metadata: Dict[str, str]):
+    # Leaves building the messages to the caller, so that it can be spread across processes.
+    # Files read from the CSV are therefore not added to the parsed spine cache.
+    def read_spine_tables(self, s3_uris: List[str]) -> Iterator[SpineTable]:
+        return prefetch(
+            self._load_spine_table,
+            s3_uris,
+            max_workers=self._spine_prefetch_workers,
+            depth=self._spine_prefetch_depth,
+        )
+
+    def write_transfer_table(self, table: Table, s3_uri: str, metadata: Dict[str, str]):
+        if self._sorts_transfers():
+            table = sort_transfers(table, self._transfer_sort_keys)
         self._s3_manager.write_parquet(
-            table=convert_transfers_to_table(transfers),
+            table=table,
             object_uri=s3_uri,
             metadata=metadata,
         )
 
+    def read_transfers_metadata(self, s3_uri: str) -> Optional[Dict[str, str]]:
+        return self._s3_manager.read_metadata(s3_uri)
+
+    def read_e_tags(self, s3_uris: List[str]) -> Dict[str, str]:
+        return {uri: self._s3_manager.read_e_tag(uri) for uri in s3_uris}
+
     def _read_ods_metadata(self, s3_uris: List[str]) -> Iterator[Dict]:
         for uri in s3_uris:
             yield self._s3_manager.read_json(uri)
 
+    def _read_organisation_lookup(
+        self, uri: str, cache: CompiledOdsLookupCache
+    ) -> OrganisationLookup:
+        e_tag = self._s3_manager.read_json_e_tag(uri)
+        organisation_lookup = cache.read(uri, e_tag)
+        if organisation_lookup is None:
+            organisation_lookup = construct_organisation_lookup(self._s3_manager.read_json(uri))
+            cache.write(uri, e_tag, organisation_lookup)
+        return organisation_lookup
+
     def read_ods_metadata_files(self, s3_uris: List[str]) -> OrganisationMetadataMonthly:
-        return OrganisationMetadataMonthly.from_list(self._read_ods_metadata(s3_uris))
+        cache = self._ods_lookup_cache
+        if cache is None:
+            return OrganisationMetadataMonthly.from_list(self._read_ods_metadata(s3_uris))
+        return OrganisationMetadataMonthly.from_lookups(
+            self._read_organisation_lookup(uri, cache) for uri in s3_uris
+        )
 
     def read_json_files_from_paths(self, s3_paths: List[str]) -> List[dict]:
         return self._s3_manager.read_json_files_from_paths(s3_paths)
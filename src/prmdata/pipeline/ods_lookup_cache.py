@@ -0,0 +1,47 @@
+import logging
+from typing import Optional
+from urllib.parse import urlparse
+
+import pyarrow as pa
+
+from prmdata.domain.ods_portal.array_organisation_lookup import ArrayOrganisationLookup
+from prmdata.domain.ods_portal.organisation_lookup import OrganisationLookup
+from prmdata.utils.input_output.disk_cache import S3ObjectDiskCache
+
+logger = logging.getLogger(__name__)
+
+ODS_LOOKUP_FORMAT_VERSION = 2
+
+
+class CompiledOdsLookupCache:
+    def __init__(self, disk_cache: S3ObjectDiskCache):
+        self._disk_cache = disk_cache
+
+    @staticmethod
+    def _cache_key(object_uri: str, e_tag: str):
+        object_url = urlparse(object_uri)
+        return (
+            object_url.netloc,
+            object_url.path.lstrip("/"),
+            f"{e_tag}/ods-lookup-{ODS_LOOKUP_FORMAT_VERSION}",
+        )
+
+    def read(self, object_uri: str, e_tag: str) -> Optional[OrganisationLookup]:
+        cached_path = self._disk_cache.get(*self._cache_key(object_uri, e_tag))
+        if cached_path is None:
+            return None
+
+        logger.info(
+            f"Reading compiled ODS lookup from cache for: {object_uri}",
+            extra={"event": "READING_COMPILED_ODS_LOOKUP_FROM_CACHE", "object_uri": object_uri},
+        )
+        return ArrayOrganisationLookup.open(str(cached_path))
+
+    def write(self, object_uri: str, e_tag: str, organisation_lookup: OrganisationLookup):
+        if not isinstance(organisation_lookup, ArrayOrganisationLookup):
+            organisation_lookup = ArrayOrganisationLookup.from_organisation_lookup(
+                organisation_lookup
+            )
+        self._disk_cache.put(
+            *self._cache_key(object_uri, e_tag), pa.BufferReader(organisation_lookup.buffer)
+        )
@@ -0,0 +1,120 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from itertools import repeat
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import ChunkedArray, RecordBatch, Table
+
+from prmdata.domain.gp2gp.transfer_service import TransferService, build_observability_probes
+from prmdata.domain.ods_portal.organisation_lookup import OrganisationLookup
+from prmdata.pipeline.arrow import (
+    SpineTable,
+    convert_spine_tables_to_messages,
+    transfer_table_schema,
+)
+from prmdata.pipeline.daily_transfers import build_daily_transfer_tables
+from prmdata.utils.input_output.spill import partition_index
+
+
+class PartitionClassificationSettings(NamedTuple):
+    cutoff: timedelta
+    organisation_lookups: Dict[datetime, OrganisationLookup]
+    filter_irrelevant_messages: bool = False
+    include_outcome_predicates: bool = False
+    observability_event_sample_size: Optional[int] = None
+
+
+def _partition_rows(conversation_ids: ChunkedArray, partition_count: int) -> np.ndarray:
+    encoded = pc.dictionary_encode(conversation_ids.combine_chunks(), null_encoding="encode")
+    dictionary_partitions = np.array(
+        [
+            partition_index(conversation_id, partition_count)
+            for conversation_id in encoded.dictionary.to_pylist()
+        ],
+        dtype=np.int64,
+    )
+    return dictionary_partitions[encoded.indices.to_numpy(zero_copy_only=False)]
+
+
+def _partition_spine_table(spine_table: SpineTable, partition_count: int) -> List[SpineTable]:
+    if partition_count == 1:
+        return [spine_table]
+    partitions = _partition_rows(spine_table.conversation_ids(), partition_count)
+    return [
+        SpineTable(
+            spine_table.table.take(
+                pa.array(np.flatnonzero(partitions == partition), type=pa.int64())
+            ),
+            spine_table.is_parsed,
+        )
+        for partition in range(partition_count)
+    ]
+
+
+# Routes by crc32 of the conversation id, so every message of a conversation lands in the
+# same partition, in its original order. Only the Arrow tables are split; each worker builds
+# the messages of its own partition, so parsing is spread across the workers too.
+def partition_spine_tables(
+    spine_tables: Iterable[SpineTable], partition_count: int
+) -> List[List[SpineTable]]:
+    partitions: List[List[SpineTable]] = [[] for _ in range(partition_count)]
+    for spine_table in spine_tables:
+        for partition, table in zip(
+            partitions, _partition_spine_table(spine_table, partition_count)
+        ):
+            partition.append(table)
+    return partitions
+
+
+def _classify_partition(
+    spine_tables: List[SpineTable], settings: PartitionClassificationSettings
+) -> Dict[datetime, List[RecordBatch]]:
+    transfer_service_probe, gp2gp_conversation_probe = build_observability_probes(
+        settings.observability_event_sample_size
+    )
+    transfer_service = TransferService(
+        cutoff=settings.cutoff,
+        observability_probe=transfer_service_probe,
+        filter_irrelevant_messages=settings.filter_irrelevant_messages,
+        gp2gp_conversation_probe=gp2gp_conversation_probe,
+    )
+    conversations = transfer_service.group_into_conversations(
+        convert_spine_tables_to_messages(spine_tables)
+    )
+    gp2gp_conversations = transfer_service.parse_conversations_into_gp2gp_conversations(
+        conversations
+    )
+    transfer_batches = {
+        daily_start_datetime: transfer_table.to_batches()
+        for daily_start_datetime, transfer_table in build_daily_transfer_tables(
+            transfer_service,
+            gp2gp_conversations,
+            settings.organisation_lookups,
+            include_outcome_predicates=settings.include_outcome_predicates,
+        )
+    }
+    # Each worker summarises the events of its own partition.
+    transfer_service_probe.flush()
+    gp2gp_conversation_probe.flush()
+    return transfer_batches
+
+
+def classify_partitions_in_parallel(
+    partitions: List[List[SpineTable]], settings: PartitionClassificationSettings
+) -> Dict[datetime, Table]:
+    transfer_batches: Dict[datetime, List[RecordBatch]] = {
+        daily_start_datetime: [] for daily_start_datetime in settings.organisation_lookups
+    }
+    with ProcessPoolExecutor(max_workers=len(partitions)) as executor:
+        for partition_batches in executor.map(_classify_partition, partitions, repeat(settings)):
+            for daily_start_datetime, batches in partition_batches.items():
+                transfer_batches[daily_start_datetime].extend(batches)
+
+    schema = transfer_table_schema(settings.include_outcome_predicates)
+    return {
+        daily_start_datetime: Table.from_batches(batches, schema=schema)
+        for daily_start_datetime, batches in transfer_batches.items()
+    }
@@ -0,0 +1,39 @@
+import logging
+from typing import Optional
+from urllib.parse import urlparse
+
+import pyarrow as pa
+from pyarrow import Table
+
+from prmdata.domain.spine.message import PARSER_VERSION
+from prmdata.utils.input_output.disk_cache import S3ObjectDiskCache
+
+logger = logging.getLogger(__name__)
+
+
+class ParsedSpineMessageCache:
+    def __init__(self, disk_cache: S3ObjectDiskCache):
+        self._disk_cache = disk_cache
+
+    @staticmethod
+    def _cache_key(object_uri: str, e_tag: str):
+        object_url = urlparse(object_uri)
+        return object_url.netloc, object_url.path.lstrip("/"), f"{e_tag}/parser-{PARSER_VERSION}"
+
+    def read(self, object_uri: str, e_tag: str) -> Optional[Table]:
+        cached_path = self._disk_cache.get(*self._cache_key(object_uri, e_tag))
+        if cached_path is None:
+            return None
+
+        logger.info(
+            f"Reading parsed spine messages from cache for: {object_uri}",
+            extra={"event": "READING_PARSED_SPINE_MESSAGES_FROM_CACHE", "object_uri": object_uri},
+        )
+        with pa.memory_map(str(cached_path)) as source:
+            return pa.ipc.open_file(source).read_all()
+
+    def write(self, object_uri: str, e_tag: str, table: Table):
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        self._disk_cache.put(*self._cache_key(object_uri, e_tag), pa.BufferReader(sink.getvalue()))
@@ -1,9 +1,27 @@
-from datetime import timedelta
-from typing import Iterator
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Set
 
-from prmdata.domain.spine.gp2gp_conversation import filter_conversations_by_day
+from prmdata.domain.ods_portal.organisation_lookup import OrganisationLookup, YearMonth
+from prmdata.domain.ods_portal.organisation_metadata_monthly import OrganisationMetadataMonthly
 from prmdata.domain.spine.message import Message
+from prmdata.pipeline.daily_transfers import build_daily_transfer_tables
+from prmdata.pipeline.input_fingerprint import (
+    INPUT_FINGERPRINT_METADATA_KEY,
+    fingerprint_inputs,
+    output_settings,
+)
+from prmdata.pipeline.parallel_classification import (
+    PartitionClassificationSettings,
+    classify_partitions_in_parallel,
+    partition_spine_tables,
+)
 from prmdata.pipeline.transfer_classifier import TransferClassifier
+from prmdata.pipeline.vectorised_classification import (
+    add_practice_metadata,
+    classify_message_table,
+    filter_transfers_by_day,
+)
 from prmdata.utils.date_converter import convert_to_datetime_string
 
 
@@ -12,11 +30,61 @@ class SpineRunner(TransferClassifier):
         input_paths = self._uris.spine_messages(self._reporting_window)
         return self._io.read_spine_messages(input_paths)
 
-    def run(self):
-        self._runner_observability_probe.log_attempting_to_classify()
+    def _transfer_metadata(
+        self, daily_start_datetime: datetime, organisation_lookup: OrganisationLookup
+    ) -> Dict[str, str]:
+        return {
+            "cutoff-days": str(self._config.conversation_cutoff.days),
+            "build-tag": self._config.build_tag,
+            "start-datetime": convert_to_datetime_string(daily_start_datetime),
+            "end-datetime": convert_to_datetime_string(daily_start_datetime + timedelta(days=1)),
+            "ods-metadata-month": f"{organisation_lookup.year}-{organisation_lookup.month}",
+            INPUT_FINGERPRINT_METADATA_KEY: self._input_fingerprint,
+        }
+
+    def _fingerprint_inputs(self) -> str:
+        input_paths = (
+            self._uris.spine_messages(self._reporting_window) + self._ods_metadata_input_paths
+        )
+        return fingerprint_inputs(self._io.read_e_tags(input_paths), output_settings(self._config))
+
+    def _is_output_unchanged(self, daily_start_datetime: datetime) -> bool:
+        output_path = self._uris.gp2gp_transfers(
+            daily_start_datetime=daily_start_datetime, cutoff=self._config.conversation_cutoff
+        )
+        metadata = self._io.read_transfers_metadata(output_path)
+        if (
+            metadata is None
+            or metadata.get(INPUT_FINGERPRINT_METADATA_KEY) != self._input_fingerprint
+        ):
+            return False
+        self._runner_observability_probe.log_skipping_unchanged_transfers(
+            output_path, self._input_fingerprint
+        )
+        return True
+
+    def _days_to_classify(self) -> List[datetime]:
+        daily_start_datetimes = self._reporting_window.get_dates()
+        if not self._config.skip_unchanged_outputs:
+            return daily_start_datetimes
+        return [
+            daily_start_datetime
+            for daily_start_datetime in daily_start_datetimes
+            if not self._is_output_unchanged(daily_start_datetime)
+        ]
+
+    def _organisation_lookups(
+        self, ods_metadata_monthly: OrganisationMetadataMonthly
+    ) -> Dict[datetime, OrganisationLookup]:
+        return {
+            daily_start_datetime: ods_metadata_monthly.get_lookup(
+                (daily_start_datetime.year, daily_start_datetime.month)
+            )
+            for daily_start_datetime in self._daily_start_datetimes
+        }
 
+    def _classify_conversations(self, ods_metadata_monthly: OrganisationMetadataMonthly):
         spine_messages = self._read_spine_messages()
-        ods_metadata_monthly = self._read_most_recent_ods_metadata()
 
         conversations = self._transfer_service.group_into_conversations(
             message_stream=spine_messages
@@ -25,34 +93,102 @@ class SpineRunner(TransferClassifier):
             conversations
         )
 
-        for daily_start_datetime in self._reporting_window.get_dates():
-            conversations_started_in_reporting_window = filter_conversations_by_day(
-                gp2gp_conversations, daily_start_datetime
+        organisation_lookups = self._organisation_lookups(ods_metadata_monthly)
+        transfer_tables = build_daily_transfer_tables(
+            self._transfer_service,
+            gp2gp_conversations,
+            organisation_lookups,
+            include_outcome_predicates=self._config.include_outcome_predicates,
+        )
+
+        for daily_start_datetime, transfers in transfer_tables:
+            self._write_transfer_table(
+                transfers=transfers,
+                daily_start_datetime=daily_start_datetime,
+                cutoff=self._config.conversation_cutoff,
+                metadata=self._transfer_metadata(
+                    daily_start_datetime, organisation_lookups[daily_start_datetime]
+                ),
             )
-            organisation_lookup = ods_metadata_monthly.get_lookup(
-                (daily_start_datetime.year, daily_start_datetime.month)
+
+    def _classify_conversations_vectorised(self, ods_metadata_monthly: OrganisationMetadataMonthly):
+        input_paths = self._uris.spine_messages(self._reporting_window)
+        spine_messages = self._io.read_spine_message_table(input_paths)
+        classified_conversations = classify_message_table(
+            spine_messages, cutoff=self._config.conversation_cutoff
+        )
+        del spine_messages
+
+        organisation_lookups = self._organisation_lookups(ods_metadata_monthly)
+        recorded_unknown_asids: Dict[YearMonth, Set[str]] = defaultdict(set)
+        for daily_start_datetime, organisation_lookup in organisation_lookups.items():
+            transfers = add_practice_metadata(
+                filter_transfers_by_day(classified_conversations, daily_start_datetime),
+                organisation_lookup,
+                self._transfer_service_observability_probe,
+                include_outcome_predicates=self._config.include_outcome_predicates,
+                recorded_unknown_asids=recorded_unknown_asids[
+                    organisation_lookup.year, organisation_lookup.month
+                ],
             )
-            transfers = self._transfer_service.convert_to_transfers(
-                conversations_started_in_reporting_window, organisation_lookup=organisation_lookup
+
+            self._write_transfer_table(
+                transfers=transfers,
+                daily_start_datetime=daily_start_datetime,
+                cutoff=self._config.conversation_cutoff,
+                metadata=self._transfer_metadata(daily_start_datetime, organisation_lookup),
             )
 
-            metadata = {
-                "cutoff-days": str(self._config.conversation_cutoff.days),
-                "build-tag": self._config.build_tag,
-                "start-datetime": convert_to_datetime_string(daily_start_datetime),
-                "end-datetime": convert_to_datetime_string(
-                    daily_start_datetime + timedelta(days=1)
-                ),
-                "ods-metadata-month": f"{organisation_lookup.year}-{organisation_lookup.month}",
-            }
+    def _classify_conversations_in_parallel(
+        self, ods_metadata_monthly: OrganisationMetadataMonthly
+    ):
+        input_paths = self._uris.spine_messages(self._reporting_window)
+        partitions = partition_spine_tables(
+            self._io.read_spine_tables(input_paths),
+            partition_count=self._config.classification_workers,
+        )
+        organisation_lookups = self._organisation_lookups(ods_metadata_monthly)
+        transfers_by_day = classify_partitions_in_parallel(
+            partitions,
+            PartitionClassificationSettings(
+                cutoff=self._config.conversation_cutoff,
+                organisation_lookups=organisation_lookups,
+                filter_irrelevant_messages=self._config.filter_irrelevant_spine_messages,
+                include_outcome_predicates=self._config.include_outcome_predicates,
+                observability_event_sample_size=self._observability_event_sample_size(),
+            ),
+        )
+        del partitions
 
-            self._write_transfers(
-                transfers=transfers,
+        for daily_start_datetime, organisation_lookup in organisation_lookups.items():
+            self._write_transfer_table(
+                transfers=transfers_by_day.pop(daily_start_datetime),
                 daily_start_datetime=daily_start_datetime,
                 cutoff=self._config.conversation_cutoff,
-                metadata=metadata,
+                metadata=self._transfer_metadata(daily_start_datetime, organisation_lookup),
             )
 
+    def _classify_days(self, ods_metadata_monthly: OrganisationMetadataMonthly):
+        if not self._daily_start_datetimes:
+            return
+        if self._config.vectorised_classification:
+            self._classify_conversations_vectorised(ods_metadata_monthly)
+        elif self._config.classification_workers > 0:
+            self._classify_conversations_in_parallel(ods_metadata_monthly)
+        else:
+            self._classify_conversations(ods_metadata_monthly)
+
+    def run(self):
+        self._runner_observability_probe.log_attempting_to_classify()
+
+        ods_metadata_monthly = self._read_most_recent_ods_metadata()
+        self._input_fingerprint = self._fingerprint_inputs()
+        self._daily_start_datetimes = self._days_to_classify()
+        # Only finishes once every day's transfers have been uploaded
+        with self._output_uploads:
+            self._classify_days(ods_metadata_monthly)
+        self._flush_observability_probes()
+
         self._runner_observability_probe.log_successfully_classified(
             ods_metadata_input_paths=self._ods_metadata_input_paths
         )
@@ -1,20 +1,25 @@
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
 from logging import Logger, getLogger
-from typing import Dict, Iterator, List
+from typing import Dict, List, Optional
 
 import boto3
+from pyarrow import Table
 
-from prmdata.domain.gp2gp.transfer import Transfer
-from prmdata.domain.gp2gp.transfer_service import TransferService, TransferServiceObservabilityProbe
+from prmdata.domain.gp2gp.transfer_service import TransferService, build_observability_probes
 from prmdata.domain.mi.mi_message import MiMessage
 from prmdata.domain.mi.mi_transfer import MiTransfer
 from prmdata.domain.ods_portal.organisation_metadata_monthly import OrganisationMetadataMonthly
 from prmdata.domain.reporting_window import ReportingWindow
 from prmdata.pipeline.config import TransferClassifierConfig
 from prmdata.pipeline.io import TransferClassifierIO
+from prmdata.pipeline.ods_lookup_cache import CompiledOdsLookupCache
 from prmdata.pipeline.s3_uri_resolver import TransferClassifierS3UriResolver
+from prmdata.pipeline.spine_message_cache import ParsedSpineMessageCache
+from prmdata.utils.background_tasks import BackgroundTasks
 from prmdata.utils.date_converter import convert_to_datetime_string, convert_to_datetimes_string
+from prmdata.utils.input_output.disk_cache import S3ObjectDiskCache
+from prmdata.utils.input_output.parquet_options import ParquetWriteOptions
 from prmdata.utils.input_output.s3 import JsonFileNotFoundException, S3DataManager
 
 module_logger = getLogger(__name__)
@@ -76,6 +81,16 @@ class RunnerObservabilityProbe:
             },
         )
 
+    def log_skipping_unchanged_transfers(self, output_uri: str, input_fingerprint: str):
+        self._logger.info(
+            f"Skipping transfers unchanged since they were last written: {output_uri}",
+            extra={
+                "event": "SKIPPING_UNCHANGED_TRANSFERS",
+                "output_uri": output_uri,
+                "input_fingerprint": input_fingerprint,
+            },
+        )
+
     def log_previous_month_ods_metadata_not_found(self, missing_json_uri: str):
         self._logger.error(
             f"Previous month ODS metadata not found: {missing_json_uri}, exiting...",
@@ -140,7 +155,47 @@ class RunnerObservabilityProbe:
 class TransferClassifier(ABC):
     def __init__(self, config: TransferClassifierConfig):
         s3 = boto3.resource("s3", endpoint_url=config.s3_endpoint_url)
-        s3_manager = S3DataManager(s3)
+        disk_cache = (
+            S3ObjectDiskCache(
+                config.s3_cache_directory, max_size_bytes=config.s3_cache_max_size_mb * 1024 * 1024
+            )
+            if config.s3_cache_directory
+            else None
+        )
+        s3_manager = S3DataManager(
+            s3,
+            disk_cache=disk_cache,
+            parquet_options=ParquetWriteOptions(
+                dictionary_columns=config.parquet_dictionary_columns,
+                compression=config.parquet_compression,
+                compression_level=config.parquet_compression_level,
+                row_group_size=config.parquet_row_group_size,
+                write_statistics=config.parquet_write_statistics,
+            ),
+            client_factory=lambda: boto3.session.Session().resource(
+                "s3", endpoint_url=config.s3_endpoint_url
+            ),
+        )
+        parsed_spine_cache = (
+            ParsedSpineMessageCache(
+                S3ObjectDiskCache(
+                    config.parsed_spine_cache_directory,
+                    max_size_bytes=config.parsed_spine_cache_max_size_mb * 1024 * 1024,
+                )
+            )
+            if config.parsed_spine_cache_directory
+            else None
+        )
+        ods_lookup_cache = (
+            CompiledOdsLookupCache(
+                S3ObjectDiskCache(
+                    config.ods_lookup_cache_directory,
+                    max_size_bytes=config.ods_lookup_cache_max_size_mb * 1024 * 1024,
+                )
+            )
+            if config.ods_lookup_cache_directory
+            else None
+        )
 
         self._reporting_window = ReportingWindow(
             config.start_datetime, config.end_datetime, config.conversation_cutoff
@@ -155,19 +210,55 @@ class TransferClassifier(ABC):
             mi_bucket=config.input_mi_data_bucket,
         )
 
-        self._io = TransferClassifierIO(s3_manager)
+        self._io = TransferClassifierIO(
+            s3_manager,
+            arrow_spine_ingestion=config.arrow_spine_ingestion,
+            spine_prefetch_workers=config.spine_prefetch_workers,
+            spine_prefetch_depth=config.spine_prefetch_depth,
+            parsed_spine_cache=parsed_spine_cache,
+            ods_lookup_cache=ods_lookup_cache,
+            include_outcome_predicates=config.include_outcome_predicates,
+            normalise_transfer_order=config.normalise_transfer_order,
+            transfer_sort_keys=config.transfer_sort_keys,
+        )
+        self._output_uploads = BackgroundTasks(
+            config.output_upload_workers, thread_name_prefix="upload"
+        )
         self._runner_observability_probe = RunnerObservabilityProbe(
             self._config, self._reporting_window
         )
 
-        transfer_service_observability_probe = TransferServiceObservabilityProbe(
-            logger=module_logger
+        (
+            self._transfer_service_observability_probe,
+            self._gp2gp_conversation_observability_probe,
+        ) = build_observability_probes(
+            self._observability_event_sample_size(), logger=module_logger
         )
         self._transfer_service = TransferService(
             cutoff=self._config.conversation_cutoff,
-            observability_probe=transfer_service_observability_probe,
+            observability_probe=self._transfer_service_observability_probe,
+            filter_irrelevant_messages=self._config.filter_irrelevant_spine_messages,
+            spill_memory_budget_bytes=self._config.conversation_spill_memory_budget_mb
+            * 1024
+            * 1024,
+            spill_directory=self._config.conversation_spill_directory,
+            streaming_allowed_lateness=(
+                self._config.streaming_allowed_lateness
+                if self._config.streaming_conversation_assembly
+                else None
+            ),
+            gp2gp_conversation_probe=self._gp2gp_conversation_observability_probe,
         )
 
+    def _observability_event_sample_size(self) -> Optional[int]:
+        if self._config.aggregate_observability_events:
+            return self._config.observability_event_sample_size
+        return None
+
+    def _flush_observability_probes(self):
+        self._transfer_service_observability_probe.flush()
+        self._gp2gp_conversation_observability_probe.flush()
+
     def _read_previous_month_ods_metadata(
         self, missing_json_uri: str
     ) -> OrganisationMetadataMonthly:
@@ -192,9 +283,9 @@ class TransferClassifier(ABC):
         except JsonFileNotFoundException as e:
             return self._read_previous_month_ods_metadata(e.missing_json_uri)
 
-    def _write_transfers(
+    def _write_transfer_table(
         self,
-        transfers: Iterator[Transfer],
+        transfers: Table,
         daily_start_datetime: datetime,
         cutoff: timedelta,
         metadata: Dict[str, str],
@@ -202,7 +293,9 @@ class TransferClassifier(ABC):
         output_path = self._uris.gp2gp_transfers(
             daily_start_datetime=daily_start_datetime, cutoff=cutoff
         )
-        self._io.write_transfers(transfers, output_path, metadata)
+        self._output_uploads.submit(
+            lambda: self._io.write_transfer_table(transfers, output_path, metadata)
+        )
 
     @abstractmethod
     def run(self):
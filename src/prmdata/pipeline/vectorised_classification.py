@@ -0,0 +1,553 @@
+from datetime import datetime, timedelta
+from typing import Dict, NamedTuple, Optional, Set, Tuple, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from dateutil.tz import UTC
+from pyarrow import Array, ChunkedArray, Table
+
+from prmdata.domain.gp2gp.transfer_outcome import TransferOutcomePredicate, transfer_outcome_table
+from prmdata.domain.gp2gp.transfer_service import TransferServiceObservabilityProbe
+from prmdata.domain.ods_portal.organisation_lookup import OrganisationLookup
+from prmdata.domain.spine.message import (
+    DUPLICATE_ERROR,
+    ERROR_SUPPRESSED,
+    FATAL_SENDER_ERROR_CODES,
+    InteractionType,
+    interaction_type_of,
+)
+from prmdata.pipeline.arrow import transfer_table_schema
+
+_MICROSECONDS_PER_SECOND = 1_000_000
+_SLA_THRESHOLD_MICROSECONDS = timedelta(days=8) // timedelta(microseconds=1)
+_MAX_TIME = np.iinfo(np.int64).max
+
+
+class _Messages(NamedTuple):
+    row: np.ndarray
+    conversation: np.ndarray
+    time: np.ndarray
+    interaction_type: np.ndarray
+    guid: np.ndarray
+    message_ref: np.ndarray
+    error_code: np.ndarray
+    has_error_code: np.ndarray
+
+    def select(self, mask: np.ndarray) -> "_Messages":
+        return _Messages(*(column[mask] for column in self))
+
+
+class _Entries(NamedTuple):
+    first: np.ndarray
+    last: np.ndarray
+    conversation: np.ndarray
+
+
+class _Acknowledgements(NamedTuple):
+    position: np.ndarray
+    entry: np.ndarray
+    conversation: np.ndarray
+    error_code: np.ndarray
+    has_error_code: np.ndarray
+
+    def select(self, index: np.ndarray) -> "_Acknowledgements":
+        return _Acknowledgements(*(column[index] for column in self))
+
+
+def _to_numpy(array: Union[Array, ChunkedArray], dtype=np.int64) -> np.ndarray:
+    if isinstance(array, ChunkedArray):
+        array = array.combine_chunks()
+    return np.asarray(array.to_numpy(zero_copy_only=False), dtype=dtype)
+
+
+def _dictionary_codes(values: ChunkedArray) -> np.ndarray:
+    encoded = pc.dictionary_encode(values, null_encoding="encode")
+    return np.concatenate(
+        [np.empty(0, dtype=np.int64)] + [_to_numpy(chunk.indices) for chunk in encoded.chunks]
+    )
+
+
+def _interaction_types(interaction_ids: ChunkedArray) -> np.ndarray:
+    # The column is already dictionary encoded, so only each chunk's dictionary is looked up.
+    return np.concatenate(
+        [np.empty(0, dtype=np.int8)]
+        + [_chunk_interaction_types(chunk) for chunk in interaction_ids.chunks]
+    )
+
+
+def _chunk_interaction_types(interaction_ids: pa.DictionaryArray) -> np.ndarray:
+    dictionary = interaction_ids.dictionary.to_pylist()
+    types_by_index = np.array(
+        [interaction_type_of(interaction_id) for interaction_id in dictionary]
+        + [InteractionType.UNKNOWN],
+        dtype=np.int8,
+    )
+    return types_by_index[_to_numpy(pc.fill_null(interaction_ids.indices, len(dictionary)))]
+
+
+def _utc_times(messages: Table) -> np.ndarray:
+    wall_clock_times = _to_numpy(messages["time"].combine_chunks().cast(pa.int64()))
+    utc_offsets = _to_numpy(pc.fill_null(messages["time_utc_offset"], 0).combine_chunks())
+    return wall_clock_times - utc_offsets * _MICROSECONDS_PER_SECOND
+
+
+def _read_messages(messages: Table) -> _Messages:
+    row_count = messages.num_rows
+    conversation = _dictionary_codes(messages["conversation_id"])
+    time = _utc_times(messages)
+    guids_and_refs = _dictionary_codes(
+        pa.chunked_array(messages["guid"].chunks + messages["message_ref"].chunks, pa.string())
+    )
+    error_code = pc.fill_null(messages["error_code"], 0).combine_chunks()
+
+    unsorted_messages = _Messages(
+        row=np.arange(row_count),
+        conversation=conversation,
+        time=time,
+        interaction_type=_interaction_types(messages["interaction_id"]),
+        guid=guids_and_refs[:row_count],
+        message_ref=guids_and_refs[row_count:],
+        error_code=_to_numpy(error_code),
+        has_error_code=_to_numpy(pc.is_valid(messages["error_code"]).combine_chunks(), bool),
+    )
+    # Conversation codes follow first appearance, and lexsort is stable, so conversations
+    # keep the order they were first seen in and messages sent at the same time keep theirs.
+    return unsorted_messages.select(np.lexsort((time, conversation)))
+
+
+def _conversation_starts(conversation: np.ndarray) -> np.ndarray:
+    is_start = np.ones(len(conversation), dtype=bool)
+    is_start[1:] = conversation[1:] != conversation[:-1]
+    return is_start
+
+
+def _ignore_messages_sent_after(cutoff: timedelta, messages: _Messages) -> _Messages:
+    if cutoff.total_seconds() == 0:
+        return messages
+
+    is_start = _conversation_starts(messages.conversation)
+    start_of_conversation = messages.time[is_start][np.cumsum(is_start) - 1]
+    cutoff_microseconds = cutoff // timedelta(microseconds=1)
+    return messages.select(messages.time - start_of_conversation <= cutoff_microseconds)
+
+
+def _keep_conversations_starting_with_request(messages: _Messages) -> _Messages:
+    is_start = _conversation_starts(messages.conversation)
+    starts_with_request = messages.interaction_type[is_start] == InteractionType.EHR_REQUEST_STARTED
+    return messages.select(starts_with_request[np.cumsum(is_start) - 1])
+
+
+def _deduplicate_messages(
+    messages: _Messages, is_ack: np.ndarray, guid_width: int
+) -> Tuple[np.ndarray, _Entries]:
+    # Mirrors pairing messages with acks through a dict keyed by guid: a repeated guid
+    # replaces the earlier message but keeps its place in the conversation.
+    non_acks = np.flatnonzero(~is_ack)
+    keys = messages.conversation[non_acks] * guid_width + messages.guid[non_acks]
+    unique_keys, first = np.unique(keys, return_index=True)
+    _, last_reversed = np.unique(keys[::-1], return_index=True)
+    last = len(keys) - 1 - last_reversed
+
+    entries = _Entries(
+        first=non_acks[first],
+        last=non_acks[last],
+        conversation=messages.conversation[non_acks[first]],
+    )
+    return unique_keys, entries
+
+
+def _pair_messages_with_acks(
+    messages: _Messages,
+) -> Tuple[_Entries, _Acknowledgements]:
+    is_ack = messages.interaction_type == InteractionType.APPLICATION_ACK
+    guid_width = int(max(messages.guid.max(initial=0), messages.message_ref.max(initial=0))) + 1
+    unique_keys, entries = _deduplicate_messages(messages, is_ack, guid_width)
+
+    acks = np.flatnonzero(is_ack)
+    ack_keys = messages.conversation[acks] * guid_width + messages.message_ref[acks]
+    key_index = np.minimum(np.searchsorted(unique_keys, ack_keys), max(len(unique_keys) - 1, 0))
+    # An ack only pairs with the latest message for its guid, and only if sent after it.
+    is_paired = (unique_keys[key_index] == ack_keys) & (acks > entries.last[key_index])
+
+    entry_order = np.argsort(entries.first, kind="stable")
+    entry_rank = np.empty_like(entry_order)
+    entry_rank[entry_order] = np.arange(len(entry_order))
+
+    paired_acks = acks[is_paired]
+    acknowledgements = _Acknowledgements(
+        position=paired_acks,
+        entry=entry_rank[key_index[is_paired]],
+        conversation=messages.conversation[paired_acks],
+        error_code=messages.error_code[paired_acks],
+        has_error_code=messages.has_error_code[paired_acks],
+    )
+    return _Entries(*(column[entry_order] for column in entries)), acknowledgements
+
+
+def _count_by_conversation(conversation: np.ndarray, conversation_count: int) -> np.ndarray:
+    return np.bincount(conversation, minlength=conversation_count)
+
+
+def _first_by_conversation(
+    conversation: np.ndarray, candidates: np.ndarray, conversation_count: int
+) -> np.ndarray:
+    candidate_index = np.flatnonzero(candidates)
+    conversations, first = np.unique(conversation[candidate_index], return_index=True)
+    result = np.full(conversation_count, -1)
+    result[conversations] = candidate_index[first]
+    return result
+
+
+def _error_code_lists(acknowledgements: _Acknowledgements, conversation_count: int) -> pa.ListArray:
+    offsets = np.zeros(conversation_count + 1, dtype=np.int32)
+    offsets[1:] = np.cumsum(
+        _count_by_conversation(acknowledgements.conversation, conversation_count)
+    )
+    values = pa.array(
+        acknowledgements.error_code, type=pa.int64(), mask=~acknowledgements.has_error_code
+    )
+    return pa.ListArray.from_arrays(pa.array(offsets, type=pa.int32()), values)
+
+
+def _take_or_zero(values: np.ndarray, index: np.ndarray) -> np.ndarray:
+    # An index of -1 selects the appended zero.
+    return np.append(values, 0)[index]
+
+
+def _timestamps(times: np.ndarray, is_present: np.ndarray) -> Array:
+    return pa.array(times, type=pa.int64(), mask=~is_present).cast(pa.timestamp("us"))
+
+
+def _is_sent_by_practice(
+    table: Table, messages: _Messages, request_started: np.ndarray, practice_asid_column: str
+) -> np.ndarray:
+    sender_asids = table["from_party_asid"].take(pa.array(messages.row))
+    practice_asids = table[practice_asid_column].take(
+        pa.array(messages.row[request_started][messages.conversation])
+    )
+    is_same_asid = pc.or_kleene(
+        pc.equal(sender_asids, practice_asids),
+        pc.and_(pc.is_null(sender_asids), pc.is_null(practice_asids)),
+    )
+    return _to_numpy(pc.fill_null(is_same_asid, False), bool)
+
+
+class _ConversationFeatures:
+    def __init__(self, table: Table, messages: _Messages):
+        is_start = _conversation_starts(messages.conversation)
+        self.count = int(is_start.sum())
+        messages = messages._replace(conversation=np.cumsum(is_start) - 1)
+        self.messages = messages
+
+        entries, acks = _pair_messages_with_acks(messages)
+        is_request_started = entries.first == np.flatnonzero(is_start)[entries.conversation]
+        self.request_started = entries.last[is_request_started]
+        self.is_from_requesting_practice = _is_sent_by_practice(
+            table, messages, self.request_started, "from_party_asid"
+        )
+        self.is_from_sending_practice = _is_sent_by_practice(
+            table, messages, self.request_started, "to_party_asid"
+        )
+
+        self._classify_entries(entries, is_request_started)
+        self._accumulate_sender_acks(acks.select(np.flatnonzero(is_request_started[acks.entry])))
+        self._accumulate_request_completed(entries, acks)
+        self._accumulate_copc_fragments(entries, acks)
+        self._find_last_sender_message_times()
+
+    def _classify_entries(self, entries: _Entries, is_request_started: np.ndarray):
+        interaction_type = self.messages.interaction_type[entries.last]
+
+        self.is_request_completed = ~is_request_started & (
+            interaction_type == InteractionType.EHR_REQUEST_COMPLETED
+        )
+        is_copc = (
+            ~is_request_started
+            & ~self.is_request_completed
+            & (interaction_type == InteractionType.COMMON_POINT_TO_POINT)
+        )
+        is_copc_continue = is_copc & self.is_from_requesting_practice[entries.last]
+        self.is_copc_fragment = (
+            is_copc & ~is_copc_continue & self.is_from_sending_practice[entries.last]
+        )
+        self.copc_continue_count = _count_by_conversation(
+            entries.conversation[is_copc_continue], self.count
+        )
+
+    def _accumulate_sender_acks(self, sender_acks: _Acknowledgements):
+        self.sender_acks = sender_acks
+        is_fatal = sender_acks.has_error_code & np.isin(
+            sender_acks.error_code, FATAL_SENDER_ERROR_CODES
+        )
+        self.sender_ack_count = _count_by_conversation(sender_acks.conversation, self.count)
+        self.fatal_sender_error_count = _count_by_conversation(
+            sender_acks.conversation[is_fatal], self.count
+        )
+        self.sender_error_count = _count_by_conversation(
+            sender_acks.conversation[sender_acks.has_error_code], self.count
+        )
+
+    def _accumulate_request_completed(self, entries: _Entries, acks: _Acknowledgements):
+        final_ack_index = np.flatnonzero(self.is_request_completed[acks.entry])
+        final_ack_index = final_ack_index[
+            np.lexsort((acks.position[final_ack_index], acks.entry[final_ack_index]))
+        ]
+        final_acks = acks.select(final_ack_index)
+        self.final_acks = final_acks
+
+        is_acknowledged = np.bincount(acks.entry, minlength=len(entries.first)) > 0
+        is_duplicate = final_acks.has_error_code & (final_acks.error_code == DUPLICATE_ERROR)
+        self.request_completed_count = _count_by_conversation(
+            entries.conversation[self.is_request_completed], self.count
+        )
+        self.unacknowledged_request_completed_count = _count_by_conversation(
+            entries.conversation[self.is_request_completed & ~is_acknowledged], self.count
+        )
+        self.duplicate_error_count = _count_by_conversation(
+            final_acks.conversation[is_duplicate], self.count
+        )
+        self._find_effective_ehr(entries, final_acks, is_duplicate)
+
+    def _find_effective_ehr(
+        self, entries: _Entries, final_acks: _Acknowledgements, is_duplicate: np.ndarray
+    ):
+        is_integrated = ~final_acks.has_error_code | (final_acks.error_code == ERROR_SUPPRESSED)
+        successful = _first_by_conversation(final_acks.conversation, is_integrated, self.count)
+        unsuccessful = _first_by_conversation(final_acks.conversation, ~is_duplicate, self.count)
+        effective = np.where(successful >= 0, successful, unsuccessful)
+
+        self.is_integrated = successful >= 0
+        self.has_effective_ehr = effective >= 0
+        effective_ack = _take_or_zero(final_acks.position, effective)
+        effective_ehr = entries.last[_take_or_zero(final_acks.entry, effective)]
+        self.effective_ack_time = np.where(
+            self.has_effective_ehr, self.messages.time[effective_ack], 0
+        )
+        self.effective_ehr_time = np.where(
+            self.has_effective_ehr, self.messages.time[effective_ehr], 0
+        )
+
+    def _accumulate_copc_fragments(self, entries: _Entries, acks: _Acknowledgements):
+        copc_ack_index = np.flatnonzero(self.is_copc_fragment[acks.entry])
+        copc_ack_index = copc_ack_index[
+            np.lexsort((acks.position[copc_ack_index], acks.entry[copc_ack_index]))
+        ]
+        copc_acks = acks.select(copc_ack_index)
+        self.intermediate_acks = copc_acks.select(np.flatnonzero(copc_acks.has_error_code))
+
+        is_acknowledged = np.bincount(acks.entry, minlength=len(entries.first)) > 0
+        self.copc_fragment_count = _count_by_conversation(
+            entries.conversation[self.is_copc_fragment], self.count
+        )
+        self.unacknowledged_copc_fragment_count = _count_by_conversation(
+            entries.conversation[self.is_copc_fragment & ~is_acknowledged], self.count
+        )
+        self.copc_error_count = _count_by_conversation(
+            self.intermediate_acks.conversation, self.count
+        )
+
+    def _find_last_sender_message_times(self):
+        messages = self.messages
+        latest_time = np.where(self.is_integrated, self.effective_ack_time, _MAX_TIME)
+
+        is_sender_message = self.is_from_sending_practice & (
+            messages.time <= latest_time[messages.conversation]
+        )
+        # Messages are sorted by time within each conversation, so the latest sender
+        # message is the last one before the next conversation starts.
+        sender_messages = np.flatnonzero(is_sender_message)
+        conversation = messages.conversation[sender_messages]
+        is_last = np.append(conversation[1:] != conversation[:-1], True)[: len(conversation)]
+
+        self.last_sender_message_time = np.zeros(self.count, dtype=np.int64)
+        self.last_sender_message_time[conversation[is_last]] = messages.time[
+            sender_messages[is_last]
+        ]
+        self.has_last_sender_message = np.zeros(self.count, dtype=bool)
+        self.has_last_sender_message[conversation[is_last]] = True
+
+    def sla_duration_microseconds(self) -> np.ndarray:
+        return np.maximum(self.effective_ack_time - self.effective_ehr_time, 0)
+
+    def outcome_predicates(self) -> np.ndarray:
+        contains_copc_fragments = (self.copc_continue_count > 0) | (self.copc_fragment_count > 0)
+        is_missing_core_ehr = self.request_completed_count == 0
+        predicates = [
+            (TransferOutcomePredicate.IS_INTEGRATED, self.is_integrated),
+            (
+                TransferOutcomePredicate.HAS_CONCLUDED_WITH_FAILURE,
+                self.has_effective_ehr & ~self.is_integrated,
+            ),
+            (TransferOutcomePredicate.CONTAINS_COPC_FRAGMENTS, contains_copc_fragments),
+            (
+                TransferOutcomePredicate.CONTAINS_FATAL_SENDER_ERROR_CODE,
+                self.fatal_sender_error_count > 0,
+            ),
+            (TransferOutcomePredicate.IS_MISSING_REQUEST_ACKNOWLEDGED, self.sender_ack_count == 0),
+            (TransferOutcomePredicate.IS_MISSING_CORE_EHR, is_missing_core_ehr),
+            (
+                TransferOutcomePredicate.CONTAINS_CORE_EHR_WITH_SENDER_ERROR,
+                ~is_missing_core_ehr & (self.sender_error_count > 0),
+            ),
+            (
+                TransferOutcomePredicate.CONTAINS_UNACKNOWLEDGED_DUPLICATE_EHR_AND_COPC_FRAGMENTS,
+                contains_copc_fragments
+                & (self.duplicate_error_count > 0)
+                & (self.unacknowledged_request_completed_count > 0),
+            ),
+            (TransferOutcomePredicate.CONTAINS_COPC_ERROR, self.copc_error_count > 0),
+            (
+                TransferOutcomePredicate.IS_MISSING_COPC,
+                (self.copc_continue_count > 0) & (self.copc_fragment_count == 0),
+            ),
+            (
+                TransferOutcomePredicate.IS_MISSING_COPC_ACK,
+                self.unacknowledged_copc_fragment_count > 0,
+            ),
+            (
+                TransferOutcomePredicate.INTEGRATED_WITHIN_SLA,
+                self.has_effective_ehr
+                & (self.sla_duration_microseconds() <= _SLA_THRESHOLD_MICROSECONDS),
+            ),
+        ]
+        outcome_predicates = np.zeros(self.count, dtype=np.uint16)
+        for predicate, is_set in predicates:
+            outcome_predicates[is_set] |= np.uint16(predicate)
+        return outcome_predicates
+
+
+def _outcome_columns(outcome_predicates: np.ndarray) -> Tuple[Array, Array]:
+    indices = pa.array(outcome_predicates.astype(np.int64), type=pa.int64())
+    outcome_table = transfer_outcome_table()
+    statuses = pa.array([status.value for status, _ in outcome_table], type=pa.string())
+    failure_reasons = pa.array(
+        [None if reason is None else reason.value for _, reason in outcome_table],
+        type=pa.string(),
+    )
+    return statuses.take(indices), failure_reasons.take(indices)
+
+
+# Produces the transfer table columns of the object based classifier, apart from the practice
+# metadata, which depends on the day's organisation lookup and is added by add_practice_metadata.
+def classify_message_table(messages: Table, cutoff: timedelta) -> Table:
+    conversation_messages = _keep_conversations_starting_with_request(
+        _ignore_messages_sent_after(cutoff, _read_messages(messages))
+    )
+    features = _ConversationFeatures(messages, conversation_messages)
+    request_started_rows = pa.array(
+        conversation_messages.row[features.request_started], type=pa.int64()
+    )
+    outcome_predicates = features.outcome_predicates()
+    status, failure_reason = _outcome_columns(outcome_predicates)
+    sla_seconds = np.round(features.sla_duration_microseconds() / _MICROSECONDS_PER_SECOND)
+    request_started_times = conversation_messages.time[features.request_started]
+
+    return pa.table(
+        {
+            "conversation_id": messages["conversation_id"].take(request_started_rows),
+            "sla_duration": pa.array(
+                sla_seconds.astype(np.uint64), type=pa.uint64(), mask=~features.has_effective_ehr
+            ),
+            "requesting_practice_asid": messages["from_party_asid"].take(request_started_rows),
+            "sending_practice_asid": messages["to_party_asid"].take(request_started_rows),
+            "requesting_supplier": messages["from_system"]
+            .take(request_started_rows)
+            .cast(pa.string()),
+            "sending_supplier": messages["to_system"].take(request_started_rows).cast(pa.string()),
+            "sender_error_codes": _error_code_lists(features.sender_acks, features.count),
+            "final_error_codes": _error_code_lists(features.final_acks, features.count),
+            "intermediate_error_codes": _error_code_lists(
+                features.intermediate_acks, features.count
+            ),
+            "status": status,
+            "failure_reason": failure_reason,
+            "date_requested": _timestamps(
+                request_started_times, np.ones(features.count, dtype=bool)
+            ),
+            "date_completed": _timestamps(features.effective_ack_time, features.has_effective_ehr),
+            "last_sender_message_timestamp": _timestamps(
+                features.last_sender_message_time, features.has_last_sender_message
+            ),
+            "outcome_predicates": pa.array(outcome_predicates, type=pa.uint16()),
+        }
+    )
+
+
+def _to_utc_timestamp(time: datetime) -> pa.Scalar:
+    return pa.scalar(time.astimezone(UTC).replace(tzinfo=None), type=pa.timestamp("us"))
+
+
+def filter_transfers_by_day(transfers: Table, daily_start_datetime: datetime) -> Table:
+    daily_end_datetime = daily_start_datetime + timedelta(days=1)
+    date_requested = transfers["date_requested"]
+    return transfers.filter(
+        pc.and_(
+            pc.greater_equal(date_requested, _to_utc_timestamp(daily_start_datetime)),
+            pc.less(date_requested, _to_utc_timestamp(daily_end_datetime)),
+        )
+    )
+
+
+def _index_in(values: ChunkedArray, value_set: ChunkedArray) -> ChunkedArray:
+    # pyarrow 11 can crash looking up an empty filtered array, which has a zero-length validity
+    # bitmap, so there is nothing to look up
+    if len(values) == 0:
+        return pa.chunked_array([pa.array([], type=pa.int32())])
+    return pc.index_in(values, value_set=value_set)
+
+
+# Joins each transfer's ASID to its practice, and that practice to its SICBL, by hashing the
+# ASIDs against the lookup tables rather than looking up practices one at a time.
+def _practice_metadata_columns(
+    transfers: Table,
+    practice: str,
+    organisation_lookup: OrganisationLookup,
+    probe: TransferServiceObservabilityProbe,
+    recorded_unknown_asids: Set[str],
+) -> Dict[str, ChunkedArray]:
+    asids = transfers[f"{practice}_practice_asid"]
+    practices = organisation_lookup.asid_to_practice_table()
+    sicbls = organisation_lookup.practice_to_sicbl_table()
+
+    practice_rows = _index_in(asids, practices["asid"])
+    unknown_rows = pa.array(np.flatnonzero(_to_numpy(pc.is_null(practice_rows), bool)))
+    for conversation_id, asid in zip(
+        transfers["conversation_id"].take(unknown_rows).to_pylist(),
+        asids.take(unknown_rows).to_pylist(),
+    ):
+        if asid not in recorded_unknown_asids:
+            recorded_unknown_asids.add(asid)
+            probe.record_no_ods_code_for_asid(conversation_id, asid)
+
+    ods_codes = practices["ods_code"].take(practice_rows)
+    sicbl_rows = _index_in(ods_codes, sicbls["practice_ods_code"])
+    return {
+        f"{practice}_practice_ods_code": ods_codes,
+        f"{practice}_practice_name": practices["name"].take(practice_rows),
+        f"{practice}_practice_sicbl_ods_code": sicbls["sicbl_ods_code"].take(sicbl_rows),
+        f"{practice}_practice_sicbl_name": sicbls["sicbl_name"].take(sicbl_rows),
+    }
+
+
+# As with TransferService, an unknown ASID is only recorded for the first conversation it is in.
+# Pass the same recorded_unknown_asids for every day of a month to record it once per month.
+def add_practice_metadata(
+    transfers: Table,
+    organisation_lookup: OrganisationLookup,
+    probe: TransferServiceObservabilityProbe,
+    include_outcome_predicates: bool = False,
+    recorded_unknown_asids: Optional[Set[str]] = None,
+) -> Table:
+    if recorded_unknown_asids is None:
+        recorded_unknown_asids = set()
+    columns = {name: transfers[name] for name in transfers.column_names}
+    for practice in ["requesting", "sending"]:
+        columns.update(
+            _practice_metadata_columns(
+                transfers, practice, organisation_lookup, probe, recorded_unknown_asids
+            )
+        )
+
+    schema = transfer_table_schema(include_outcome_predicates)
+    return pa.table([columns[name] for name in schema.names], schema=schema)
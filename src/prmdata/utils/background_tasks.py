@@ -0,0 +1,50 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Optional
+
+
+# Runs tasks on a pool of threads while the caller carries on, holding at most max_workers of
+# them at once: submitting another waits for the oldest to finish. Tasks start in the order they
+# were submitted, each runs wholly on one thread so its own log events stay in order, and their
+# failures are raised in submission order, from submit or at the latest when the block exits.
+class BackgroundTasks:
+    def __init__(self, max_workers: int, thread_name_prefix: str = "background"):
+        self._max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = (
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+            if max_workers > 0
+            else None
+        )
+        self._pending: Deque[Future] = deque()
+
+    def submit(self, task: Callable[[], None]):
+        if self._executor is None:
+            task()
+            return
+
+        while self._pending and (
+            self._pending[0].done() or len(self._pending) >= self._max_workers
+        ):
+            self._pending.popleft().result()
+        self._pending.append(self._executor.submit(task))
+
+    def wait(self):
+        while self._pending:
+            self._pending.popleft().result()
+
+    def _cancel(self):
+        for future in self._pending:
+            future.cancel()
+        self._pending.clear()
+
+    def __enter__(self) -> "BackgroundTasks":
+        return self
+
+    def __exit__(self, exception_type: Optional[type], exception, traceback):
+        try:
+            if exception_type is None:
+                self.wait()
+        finally:
+            self._cancel()
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
@@ -1,5 +1,25 @@
-from datetime import datetime, timedelta
-from typing import List, Optional
+import re
+from datetime import datetime, timedelta, tzinfo
+from typing import Dict, List, Optional
+
+from dateutil import parser
+from dateutil.tz import tzoffset
+
+_ONE_HOUR_IN_SECONDS = 3600
+_DATEUTIL_TIMEZONE_INFO = {"BST": _ONE_HOUR_IN_SECONDS, "UTC": 0}
+
+_UTC = tzoffset("UTC", 0)
+_NAMED_TIMEZONES: Dict[str, tzinfo] = {
+    "Z": _UTC,
+    "UTC": _UTC,
+    "BST": tzoffset("BST", _ONE_HOUR_IN_SECONDS),
+}
+_NUMERIC_TIMEZONES: Dict[str, tzinfo] = {}
+
+_TIMESTAMP_PATTERN = re.compile(
+    r"(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,6}))?"
+    r" ?(Z|UTC|BST|[+-]\d{2}:?\d{2})?"
+)
 
 
 def convert_date_range_to_dates(start_datetime: datetime, end_datetime: datetime) -> List[datetime]:
@@ -16,3 +36,38 @@ def convert_to_datetime_string(a_datetime: Optional[datetime]) -> str:
 
 def convert_to_datetimes_string(datetimes: List[datetime]) -> List[str]:
     return [convert_to_datetime_string(a_datetime) for a_datetime in datetimes]
+
+
+def _numeric_timezone(offset: str) -> tzinfo:
+    try:
+        return _NUMERIC_TIMEZONES[offset]
+    except KeyError:
+        sign = -1 if offset[0] == "-" else 1
+        seconds = sign * (int(offset[1:3]) * 3600 + int(offset[-2:]) * 60)
+        timezone = _UTC if seconds == 0 else tzoffset(None, seconds)
+        _NUMERIC_TIMEZONES[offset] = timezone
+        return timezone
+
+
+def _parse_timezone(timezone: Optional[str]) -> Optional[tzinfo]:
+    if timezone is None:
+        return None
+    return _NAMED_TIMEZONES.get(timezone) or _numeric_timezone(timezone)
+
+
+def parse_timestamp(timestamp: str) -> datetime:
+    match = _TIMESTAMP_PATTERN.fullmatch(timestamp)
+    if match is None:
+        return parser.parse(timestamp, tzinfos=_DATEUTIL_TIMEZONE_INFO)
+
+    year, month, day, hour, minute, second, fraction, timezone = match.groups()
+    return datetime(
+        int(year),
+        int(month),
+        int(day),
+        int(hour),
+        int(minute),
+        int(second),
+        int(fraction.ljust(6, "0")) if fraction else 0,
+        tzinfo=_parse_timezone(timezone),
+    )
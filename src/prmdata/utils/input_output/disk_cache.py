@@ -0,0 +1,65 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from contextlib import suppress
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Tuple
+
+_TEMPORARY_FILE_PREFIX = ".partial-"
+
+
+class S3ObjectDiskCache:
+    def __init__(self, directory: str, max_size_bytes: int):
+        self._directory = Path(directory)
+        self._max_size_bytes = max_size_bytes
+        self._directory.mkdir(parents=True, exist_ok=True)
+
+    def _path_for(self, bucket: str, key: str, e_tag: str) -> Path:
+        cache_key = f"{bucket}\0{key}\0{e_tag}".encode("utf8")
+        return self._directory / hashlib.sha256(cache_key).hexdigest()
+
+    def get(self, bucket: str, key: str, e_tag: str) -> Optional[Path]:
+        path = self._path_for(bucket, key, e_tag)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, bucket: str, key: str, e_tag: str, body: BinaryIO) -> Path:
+        path = self._path_for(bucket, key, e_tag)
+        with tempfile.NamedTemporaryFile(
+            dir=self._directory, prefix=_TEMPORARY_FILE_PREFIX, delete=False
+        ) as f:
+            try:
+                shutil.copyfileobj(body, f)
+            except BaseException:
+                f.close()
+                os.unlink(f.name)
+                raise
+        os.replace(f.name, path)
+        self._evict_least_recently_used(keep=path)
+        return path
+
+    def _cached_entries(self) -> List[Tuple[float, int, Path]]:
+        entries = []
+        for entry in os.scandir(self._directory):
+            if entry.name.startswith(_TEMPORARY_FILE_PREFIX):
+                continue
+            with suppress(FileNotFoundError):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+        return entries
+
+    def _evict_least_recently_used(self, keep: Path):
+        entries = self._cached_entries()
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self._max_size_bytes:
+                break
+            if path == keep:
+                continue
+            with suppress(FileNotFoundError):
+                path.unlink()
+            total_size -= size
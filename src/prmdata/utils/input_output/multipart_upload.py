@@ -0,0 +1,78 @@
+from io import BytesIO
+from typing import Dict, List, Optional
+
+# S3 rejects multipart uploads whose parts, other than the last, are smaller than this
+MINIMUM_PART_SIZE_BYTES = 5 * 1024 * 1024
+
+
+# A write-only file that uploads to S3 as it is written, holding at most one part in memory.
+# Objects smaller than a part are uploaded with a single put, as before.
+class S3MultipartUploadStream:
+    def __init__(self, s3_object, metadata: Dict[str, str], part_size_bytes: int):
+        if part_size_bytes < MINIMUM_PART_SIZE_BYTES:
+            raise ValueError(
+                f"Multipart upload parts must be at least {MINIMUM_PART_SIZE_BYTES} bytes"
+            )
+        self._s3_object = s3_object
+        self._metadata = metadata
+        self._part_size_bytes = part_size_bytes
+        self._buffer = bytearray()
+        self._position = 0
+        self._upload = None
+        self._parts: List[dict] = []
+        self.closed = False
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+        part_size = self._part_size_bytes
+        while len(self._buffer) >= part_size:
+            self._upload_part(bytes(self._buffer[:part_size]))
+            del self._buffer[:part_size]
+        return len(data)
+
+    def _upload_part(self, body: bytes):
+        upload = self._upload
+        if upload is None:
+            upload = self._upload = self._s3_object.initiate_multipart_upload(
+                Metadata=self._metadata
+            )
+        part_number = len(self._parts) + 1
+        response = upload.Part(part_number).upload(Body=body)
+        self._parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self._upload is None:
+            self._s3_object.put(Body=BytesIO(self._buffer), Metadata=self._metadata)
+        else:
+            if self._buffer:
+                self._upload_part(bytes(self._buffer))
+            self._upload.complete(MultipartUpload={"Parts": self._parts})
+        self._buffer = bytearray()
+
+    def abort(self):
+        self.closed = True
+        self._buffer = bytearray()
+        if self._upload is not None:
+            self._upload.abort()
+
+    def __enter__(self) -> "S3MultipartUploadStream":
+        return self
+
+    def __exit__(self, exception_type: Optional[type], exception, traceback):
+        if exception_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -0,0 +1,43 @@
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Union
+
+from pyarrow import RecordBatch, Table
+
+DEFAULT_ROW_GROUP_SIZE = 16_384
+
+
+# The defaults are pyarrow's own, apart from the row group size: every column is dictionary
+# encoded, compressed with snappy and written with statistics.
+class ParquetWriteOptions(NamedTuple):
+    dictionary_columns: Optional[List[str]] = None
+    compression: str = "snappy"
+    compression_level: Optional[int] = None
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE
+    write_statistics: bool = True
+
+    def use_dictionary(self) -> Union[bool, List[str]]:
+        return True if self.dictionary_columns is None else self.dictionary_columns
+
+    def writer_arguments(self) -> dict:
+        return {
+            "use_dictionary": self.use_dictionary(),
+            "compression": self.compression,
+            "compression_level": self.compression_level,
+            "write_statistics": self.write_statistics,
+        }
+
+
+# Regroups batches of any size into tables of exactly row_group_size rows, apart from the last,
+# so that each is written as one row group.
+def group_rows(batches: Iterable[RecordBatch], row_group_size: int) -> Iterator[Table]:
+    pending: List[RecordBatch] = []
+    pending_rows = 0
+    for batch in batches:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        while pending_rows >= row_group_size:
+            table = Table.from_batches(pending)
+            yield table.slice(0, row_group_size)
+            pending = table.slice(row_group_size).to_batches()
+            pending_rows -= row_group_size
+    if pending_rows > 0:
+        yield Table.from_batches(pending)
@@ -2,11 +2,22 @@ import csv
 import gzip
 import json
 import logging
-from io import BytesIO
-from typing import List
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
 from urllib.parse import urlparse
 
-from pyarrow import PythonFile, Table, parquet
+import pyarrow as pa
+from botocore.exceptions import ClientError
+from pyarrow import PythonFile, RecordBatch, Schema, Table
+from pyarrow import csv as pa_csv
+from pyarrow import parquet
+
+from prmdata.utils.input_output.disk_cache import S3ObjectDiskCache
+from prmdata.utils.input_output.multipart_upload import (
+    MINIMUM_PART_SIZE_BYTES,
+    S3MultipartUploadStream,
+)
+from prmdata.utils.input_output.parquet_options import ParquetWriteOptions, group_rows
 
 logger = logging.getLogger(__name__)
 
@@ -21,9 +32,52 @@ class JsonFileNotFoundException(Exception):
         return self._object_uri
 
 
+class CsvColumnsNotFoundException(Exception):
+    def __init__(self, object_uri: str, column_names: List[str]):
+        self._column_names = column_names
+        super().__init__(
+            f"Unable to find columns {column_names} in CSV file in S3 uri: {object_uri}"
+        )
+
+    @property
+    def missing_column_names(self) -> List[str]:
+        return self._column_names
+
+
+# Read from the stream itself, so missing columns are found before the body is parsed. The rest of
+# the stream is then parsed with these names, as the header has already been consumed.
+def _read_csv_header(f) -> List[str]:
+    return next(csv.reader([f.readline().decode("utf-8")]), [])
+
+
+UPLOAD_PART_SIZE_BYTES = 2 * MINIMUM_PART_SIZE_BYTES
+
+
 class S3DataManager:
-    def __init__(self, client):
-        self._client = client
+    def __init__(
+        self,
+        client,
+        disk_cache: Optional[S3ObjectDiskCache] = None,
+        upload_part_size_bytes: int = UPLOAD_PART_SIZE_BYTES,
+        parquet_options: ParquetWriteOptions = ParquetWriteOptions(),
+        client_factory: Optional[Callable[[], Any]] = None,
+    ):
+        # boto3 resources are not thread safe, so each thread other than this one builds its own
+        # with client_factory. Without one, every thread shares client.
+        self._client_factory = client_factory or (lambda: client)
+        self._thread_clients = threading.local()
+        self._thread_clients.client = client
+        self._disk_cache = disk_cache
+        self._upload_part_size_bytes = upload_part_size_bytes
+        self._parquet_options = parquet_options
+
+    @property
+    def _client(self):
+        client = getattr(self._thread_clients, "client", None)
+        if client is None:
+            client = self._client_factory()
+            self._thread_clients.client = client
+        return client
 
     def _object_from_uri(self, uri: str):
         object_url = urlparse(uri)
@@ -31,6 +85,58 @@ class S3DataManager:
         s3_key = object_url.path.lstrip("/")
         return self._client.Object(s3_bucket, s3_key)
 
+    @staticmethod
+    def _is_not_found(error: ClientError) -> bool:
+        return error.response["Error"]["Code"] in ("404", "NoSuchKey")
+
+    def _head_e_tag(self, s3_object) -> str:
+        try:
+            s3_object.load()
+        except ClientError as e:
+            if self._is_not_found(e):
+                raise self._client.meta.client.exceptions.NoSuchKey(e.response, "HeadObject")
+            raise
+        return s3_object.e_tag
+
+    def read_e_tag(self, object_uri: str) -> str:
+        try:
+            return self._head_e_tag(self._object_from_uri(object_uri))
+        except self._client.meta.client.exceptions.NoSuchKey as e:
+            logger.error(
+                f"File not found: {object_uri}, exiting...",
+                extra={"event": "FILE_NOT_FOUND_IN_S3", "object_uri": object_uri},
+            )
+            raise e
+
+    def read_metadata(self, object_uri: str) -> Optional[Dict[str, str]]:
+        s3_object = self._object_from_uri(object_uri)
+        try:
+            s3_object.load()
+        except ClientError as e:
+            if self._is_not_found(e):
+                return None
+            raise
+        return s3_object.metadata
+
+    def _open_body(self, s3_object, e_tag: Optional[str] = None):
+        if self._disk_cache is None:
+            return s3_object.get()["Body"]
+
+        bucket, key = s3_object.bucket_name, s3_object.key
+        cached_path = self._disk_cache.get(bucket, key, e_tag or self._head_e_tag(s3_object))
+        if cached_path is None:
+            response = s3_object.get()
+            cached_path = self._disk_cache.put(bucket, key, response["ETag"], response["Body"])
+        else:
+            logger.info(
+                f"Reading file from disk cache: s3://{bucket}/{key}",
+                extra={
+                    "event": "READING_FILE_FROM_DISK_CACHE",
+                    "object_uri": f"s3://{bucket}/{key}",
+                },
+            )
+        return open(cached_path, "rb")
+
     def read_gzip_csv(self, object_uri: str):
         logger.info(
             "Reading file from: " + object_uri,
@@ -39,12 +145,32 @@ class S3DataManager:
         s3_object = self._object_from_uri(object_uri)
 
         try:
-            response = s3_object.get()
-            body = response["Body"]
-            with gzip.open(body, mode="rt") as f:
-                input_csv = csv.DictReader(f)
-                yield from input_csv
+            body = self._open_body(s3_object)
+        except self._client.meta.client.exceptions.NoSuchKey as e:
+            logger.error(
+                f"CSV file not found: {object_uri}, exiting...",
+                extra={"event": "FILE_NOT_FOUND_IN_S3", "object_uri": object_uri},
+            )
+            raise e
 
+        with body, gzip.open(body, mode="rt") as f:
+            input_csv = csv.DictReader(f)
+            yield from input_csv
+
+    def read_gzip_csv_table(
+        self,
+        object_uri: str,
+        column_names: List[str],
+        optional_column_names: Optional[List[str]] = None,
+    ) -> Table:
+        logger.info(
+            "Reading file from: " + object_uri,
+            extra={"event": "READING_FILE_FROM_S3", "object_uri": object_uri},
+        )
+        s3_object = self._object_from_uri(object_uri)
+
+        try:
+            body = self._open_body(s3_object)
         except self._client.meta.client.exceptions.NoSuchKey as e:
             logger.error(
                 f"CSV file not found: {object_uri}, exiting...",
@@ -52,6 +178,45 @@ class S3DataManager:
             )
             raise e
 
+        all_column_names = column_names + (optional_column_names or [])
+        with body, gzip.open(body) as f:
+            header = _read_csv_header(f)
+            missing_column_names = [name for name in column_names if name not in header]
+            if missing_column_names:
+                logger.error(
+                    f"CSV file is missing columns: {object_uri}, exiting...",
+                    extra={
+                        "event": "COLUMNS_NOT_FOUND_IN_CSV",
+                        "object_uri": object_uri,
+                        "missing_column_names": missing_column_names,
+                    },
+                )
+                raise CsvColumnsNotFoundException(object_uri, missing_column_names)
+
+            if not f.peek(1):
+                return pa.table({name: pa.array([], type=pa.string()) for name in all_column_names})
+            return pa_csv.read_csv(
+                f,
+                read_options=pa_csv.ReadOptions(use_threads=True, column_names=header),
+                parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+                convert_options=pa_csv.ConvertOptions(
+                    include_columns=all_column_names,
+                    include_missing_columns=True,
+                    column_types={column_name: pa.string() for column_name in all_column_names},
+                    strings_can_be_null=False,
+                ),
+            )
+
+    def read_json_e_tag(self, object_uri: str) -> str:
+        try:
+            return self._head_e_tag(self._object_from_uri(object_uri))
+        except self._client.meta.client.exceptions.NoSuchKey:
+            logger.error(
+                f"JSON file not found: {object_uri}, exiting...",
+                extra={"event": "FILE_NOT_FOUND_IN_S3", "object_uri": object_uri},
+            )
+            raise JsonFileNotFoundException(object_uri)
+
     def read_json(self, object_uri: str):
         logger.info(
             "Reading file from: " + object_uri,
@@ -60,7 +225,7 @@ class S3DataManager:
         s3_object = self._object_from_uri(object_uri)
 
         try:
-            response = s3_object.get()
+            body = self._open_body(s3_object)
         except self._client.meta.client.exceptions.NoSuchKey:
             logger.error(
                 f"JSON file not found: {object_uri}, exiting...",
@@ -68,10 +233,26 @@ class S3DataManager:
             )
             raise JsonFileNotFoundException(object_uri)
 
-        body = response["Body"].read()
-        return json.loads(body.decode("utf8"))
+        with body:
+            return json.loads(body.read().decode("utf8"))
 
     def write_parquet(self, table: Table, object_uri: str, metadata: dict[str, str]):
+        self.write_parquet_batches(
+            table.to_batches(),
+            table.schema,
+            object_uri,
+            metadata,
+        )
+
+    # Streams each row group through the Parquet writer into a multipart upload, so only one row
+    # group and one part are held in memory rather than the whole serialised file.
+    def write_parquet_batches(
+        self,
+        batches: Iterable[RecordBatch],
+        schema: Schema,
+        object_uri: str,
+        metadata: dict[str, str],
+    ):
         logger.info(
             f"Attempting to upload: {object_uri}",
             extra={
@@ -82,12 +263,17 @@ class S3DataManager:
         )
 
         s3_object = self._object_from_uri(object_uri)
-        buffer = BytesIO()
-        buffer_file = PythonFile(buffer)
-        parquet.write_table(table, buffer_file)
-        buffer.seek(0)
-
-        s3_object.put(Body=buffer, Metadata=metadata)
+        options = self._parquet_options
+        row_count = 0
+        with S3MultipartUploadStream(
+            s3_object, metadata, self._upload_part_size_bytes
+        ) as upload_stream:
+            with parquet.ParquetWriter(
+                PythonFile(upload_stream, mode="w"), schema, **options.writer_arguments()
+            ) as writer:
+                for row_group in group_rows(batches, options.row_group_size):
+                    writer.write_table(row_group, row_group_size=options.row_group_size)
+                    row_count += row_group.num_rows
 
         logger.info(
             f"Successfully uploaded to: {object_uri}",
@@ -103,7 +289,7 @@ class S3DataManager:
             extra={
                 "event": "TRANSFER_CLASSIFIER_ROW_COUNT",
                 "object_uri": object_uri,
-                "row_count": table.num_rows,
+                "row_count": row_count,
                 "metadata": metadata,
             },
         )
@@ -116,7 +302,11 @@ class S3DataManager:
         s3_bucket = self._client.Bucket(bucket_name)
         s3_files = s3_bucket.objects.filter(Prefix=s3_key).all()
 
-        return [json.load(s3_file.get()["Body"]) for s3_file in s3_files]
+        return [self._read_listed_json_file(s3_file) for s3_file in s3_files]
+
+    def _read_listed_json_file(self, s3_file) -> dict:
+        with self._open_body(s3_file.Object(), e_tag=s3_file.e_tag) as body:
+            return json.load(body)
 
     def read_json_files_from_paths(self, s3_paths: List[str]) -> List[dict]:
         mi_events = []
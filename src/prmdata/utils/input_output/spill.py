@@ -0,0 +1,108 @@
+import os
+import pickle
+import tempfile
+import zlib
+from math import ceil
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, TypeVar
+
+Item = TypeVar("Item")
+
+_SPILL_BUFFER_SIZE = 10_000
+
+# Messages grouped in memory take roughly this many times their pickled size.
+_IN_MEMORY_BYTES_PER_SPILLED_BYTE = 4
+
+
+def partition_index(key: Optional[str], partition_count: int) -> int:
+    # crc32 rather than hash() so partitioning does not depend on PYTHONHASHSEED
+    return zlib.crc32(str(key).encode("utf8")) % partition_count
+
+
+def _read_spilled(path: str) -> Iterator[list]:
+    with open(path, "rb") as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def _read_partition(path: str) -> list:
+    items: list = []
+    for chunk in _read_spilled(path):
+        items.extend(chunk)
+    return items
+
+
+def _spill_in_order(
+    items: Iterable[Item], key: Callable[[Item], Optional[str]], f: BinaryIO
+) -> Dict[Optional[str], int]:
+    first_seen: Dict[Optional[str], int] = {}
+    buffer: List[Item] = []
+    for item in items:
+        first_seen.setdefault(key(item), len(first_seen))
+        buffer.append(item)
+        if len(buffer) >= _SPILL_BUFFER_SIZE:
+            pickle.dump(buffer, f, protocol=pickle.HIGHEST_PROTOCOL)
+            buffer.clear()
+    pickle.dump(buffer, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return first_seen
+
+
+def _write_partitions(
+    chunks: Iterable[List[Item]],
+    partition_of: Callable[[Item], int],
+    files: Sequence[BinaryIO],
+):
+    buffers: List[List[Item]] = [[] for _ in files]
+    for chunk in chunks:
+        for item in chunk:
+            index = partition_of(item)
+            buffer = buffers[index]
+            buffer.append(item)
+            if len(buffer) >= _SPILL_BUFFER_SIZE:
+                pickle.dump(buffer, files[index], protocol=pickle.HIGHEST_PROTOCOL)
+                buffer.clear()
+
+    for buffer, f in zip(buffers, files):
+        pickle.dump(buffer, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _partition_count(spilled_bytes: int, memory_budget_bytes: int) -> int:
+    return max(1, ceil(spilled_bytes * _IN_MEMORY_BYTES_PER_SPILLED_BYTE / memory_budget_bytes))
+
+
+# Spills every item to disk once to learn how much there is, then splits the keys into as many
+# partitions as the memory budget needs. Each partition holds a contiguous run of keys in the
+# order they were first seen, so reading the partitions in turn and grouping each by key gives the
+# same groups, in the same order, as grouping every item in memory.
+def spill_into_partitions(
+    items: Iterable[Item],
+    key: Callable[[Item], Optional[str]],
+    memory_budget_bytes: int,
+    directory: Optional[str] = None,
+) -> Iterator[List[Item]]:
+    with tempfile.TemporaryDirectory(prefix="spill-", dir=directory) as spill_directory:
+        spilled_path = os.path.join(spill_directory, "spilled")
+        with open(spilled_path, "wb") as f:
+            first_seen = _spill_in_order(items, key, f)
+        partition_count = _partition_count(os.path.getsize(spilled_path), memory_budget_bytes)
+        key_count = max(len(first_seen), 1)
+
+        def partition_of(item: Item) -> int:
+            return first_seen[key(item)] * partition_count // key_count
+
+        paths = [os.path.join(spill_directory, f"partition-{i}") for i in range(partition_count)]
+        files = [open(path, "wb") for path in paths]
+        try:
+            _write_partitions(_read_spilled(spilled_path), partition_of, files)
+        finally:
+            for f in files:
+                f.close()
+        os.remove(spilled_path)
+        first_seen.clear()
+
+        for path in paths:
+            partition: List[Item] = _read_partition(path)
+            os.remove(path)
+            yield partition
@@ -0,0 +1,36 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Iterable, Iterator, TypeVar
+
+Item = TypeVar("Item")
+Result = TypeVar("Result")
+
+
+def _drain_in_order(
+    executor: ThreadPoolExecutor,
+    load: Callable[[Item], Result],
+    items: Iterable[Item],
+    depth: int,
+) -> Iterator[Result]:
+    pending: Deque[Future] = deque()
+    for item in items:
+        pending.append(executor.submit(load, item))
+        if len(pending) > depth:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def prefetch(
+    load: Callable[[Item], Result], items: Iterable[Item], max_workers: int, depth: int
+) -> Iterator[Result]:
+    # Holds at most depth + 1 loaded results: the one being consumed and those after it.
+    if max_workers <= 0 or depth <= 0:
+        yield from map(load, items)
+        return
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+    try:
+        yield from _drain_in_order(executor, load, items, depth)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
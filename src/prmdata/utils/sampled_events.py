@@ -0,0 +1,51 @@
+from collections import defaultdict
+from logging import Logger
+from typing import DefaultDict, Dict, List, NamedTuple, Tuple
+
+
+class EventSummary(NamedTuple):
+    event: str
+    counts: Dict[str, int]
+    samples: Dict[str, List[dict]]
+
+    def total_count(self) -> int:
+        return sum(self.counts.values())
+
+
+class SampledEventCounter:
+    def __init__(self, sample_size: int):
+        self._sample_size = sample_size
+        self._counts: DefaultDict[Tuple[str, str], int] = defaultdict(int)
+        self._samples: DefaultDict[Tuple[str, str], List[dict]] = defaultdict(list)
+
+    # Returns whether the occurrence is among the first sample_size for its key, so that
+    # callers only build an example when it is going to be kept.
+    def count(self, event: str, key: str) -> bool:
+        self._counts[event, key] += 1
+        return self._counts[event, key] <= self._sample_size
+
+    def sample(self, event: str, key: str, example: dict):
+        self._samples[event, key].append(example)
+
+    def drain(self) -> List[EventSummary]:
+        summaries: Dict[str, EventSummary] = {}
+        for (event, key), count in self._counts.items():
+            summary = summaries.setdefault(event, EventSummary(event, counts={}, samples={}))
+            summary.counts[key] = count
+            summary.samples[key] = self._samples.get((event, key), [])
+        self._counts.clear()
+        self._samples.clear()
+        return list(summaries.values())
+
+
+def log_event_summaries(logger: Logger, events: SampledEventCounter):
+    for summary in events.drain():
+        logger.warning(
+            f":Summary of {summary.event} events",
+            extra={
+                "event": f"{summary.event}_SUMMARY",
+                "total_count": summary.total_count(),
+                "counts": summary.counts,
+                "samples": summary.samples,
+            },
+        )
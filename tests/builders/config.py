@@ -1,6 +1,6 @@
 from datetime import timedelta
 
-from prmdata.pipeline.config import TransferClassifierConfig
+from prmdata.pipeline.config import DEFAULT_PARQUET_DICTIONARY_COLUMNS, TransferClassifierConfig
 from tests.builders.common import a_datetime, a_string
 
 
@@ -20,4 +20,34 @@ def build_config(**kwargs) -> TransferClassifierConfig:
         conversation_cutoff=kwargs.get("conversation_cutoff", timedelta(0)),
         build_tag=kwargs.get("build_tag", a_string()),
         classify_mi_events=kwargs.get("classify_mi_events", True),
+        arrow_spine_ingestion=kwargs.get("arrow_spine_ingestion", True),
+        spine_prefetch_workers=kwargs.get("spine_prefetch_workers", 2),
+        spine_prefetch_depth=kwargs.get("spine_prefetch_depth", 2),
+        s3_cache_directory=kwargs.get("s3_cache_directory", None),
+        s3_cache_max_size_mb=kwargs.get("s3_cache_max_size_mb", 10240),
+        parsed_spine_cache_directory=kwargs.get("parsed_spine_cache_directory", None),
+        parsed_spine_cache_max_size_mb=kwargs.get("parsed_spine_cache_max_size_mb", 10240),
+        filter_irrelevant_spine_messages=kwargs.get("filter_irrelevant_spine_messages", False),
+        conversation_spill_memory_budget_mb=kwargs.get("conversation_spill_memory_budget_mb", 0),
+        conversation_spill_directory=kwargs.get("conversation_spill_directory", None),
+        streaming_conversation_assembly=kwargs.get("streaming_conversation_assembly", False),
+        streaming_allowed_lateness=kwargs.get("streaming_allowed_lateness", timedelta(days=1)),
+        vectorised_classification=kwargs.get("vectorised_classification", False),
+        include_outcome_predicates=kwargs.get("include_outcome_predicates", False),
+        classification_workers=kwargs.get("classification_workers", 0),
+        normalise_transfer_order=kwargs.get("normalise_transfer_order", False),
+        aggregate_observability_events=kwargs.get("aggregate_observability_events", False),
+        observability_event_sample_size=kwargs.get("observability_event_sample_size", 5),
+        ods_lookup_cache_directory=kwargs.get("ods_lookup_cache_directory", None),
+        ods_lookup_cache_max_size_mb=kwargs.get("ods_lookup_cache_max_size_mb", 1024),
+        parquet_dictionary_columns=kwargs.get(
+            "parquet_dictionary_columns", DEFAULT_PARQUET_DICTIONARY_COLUMNS
+        ),
+        parquet_compression=kwargs.get("parquet_compression", "zstd"),
+        parquet_compression_level=kwargs.get("parquet_compression_level", None),
+        parquet_row_group_size=kwargs.get("parquet_row_group_size", 65_536),
+        parquet_write_statistics=kwargs.get("parquet_write_statistics", True),
+        transfer_sort_keys=kwargs.get("transfer_sort_keys", []),
+        output_upload_workers=kwargs.get("output_upload_workers", 0),
+        skip_unchanged_outputs=kwargs.get("skip_unchanged_outputs", False),
     )
@@ -8,6 +8,7 @@ from unittest import mock
 from unittest.mock import ANY
 
 import boto3
+import pytest
 from botocore.config import Config
 from coverage.annotate import os
 from dateutil.tz import UTC
@@ -217,7 +218,26 @@ def _delete_bucket_with_objects(s3_bucket):
     s3_bucket.delete()
 
 
-def test_uploads_classified_transfers_given_start_and_end_datetime_and_cutoff(datadir):
+def _sort_columns_by_conversation_id(columns: dict) -> dict:
+    order = sorted(
+        range(len(columns["conversation_id"])), key=columns["conversation_id"].__getitem__
+    )
+    return {name: [values[index] for index in order] for name, values in columns.items()}
+
+
+@pytest.mark.parametrize(
+    "classification_environ",
+    [
+        {"VECTORISED_CLASSIFICATION": "False"},
+        {"VECTORISED_CLASSIFICATION": "True"},
+        {"CLASSIFICATION_WORKERS": "2", "NORMALISE_TRANSFER_ORDER": "True"},
+        {"AGGREGATE_OBSERVABILITY_EVENTS": "True"},
+        {"OUTPUT_UPLOAD_WORKERS": "2"},
+    ],
+)
+def test_uploads_classified_transfers_given_start_and_end_datetime_and_cutoff(
+    datadir, classification_environ
+):
     fake_s3, s3_client = _setup()
     fake_s3.start()
 
@@ -234,6 +254,7 @@ def test_uploads_classified_transfers_given_start_and_end_datetime_and_cutoff(da
         environ["START_DATETIME"] = "2019-12-02T00:00:00Z"
         environ["END_DATETIME"] = "2020-01-04T00:00:00Z"
         environ["CONVERSATION_CUTOFF_DAYS"] = "14"
+        environ.update(classification_environ)
 
         main()
 
@@ -246,6 +267,8 @@ def test_uploads_classified_transfers_given_start_and_end_datetime_and_cutoff(da
             day = add_leading_zero(data_day)
 
             expected_transfers = _get_expected_transfers(datadir, (year, data_month, data_day))
+            if "NORMALISE_TRANSFER_ORDER" in classification_environ:
+                expected_transfers = _sort_columns_by_conversation_id(expected_transfers)
 
             s3_filename = f"{year}-{month}-{day}-transfers.parquet"
             s3_output_path = f"v11/cutoff-14/{year}/{month}/{day}/{s3_filename}"
@@ -262,6 +285,7 @@ def test_uploads_classified_transfers_given_start_and_end_datetime_and_cutoff(da
                 "start-datetime": f"{year}-{month}-{day}T00:00:00+00:00",
                 "end-datetime": _end_datetime_metadata(year, data_month, data_day),
                 "ods-metadata-month": f"{year}-{data_month}",
+                "input-fingerprint": ANY,
             }
 
             assert actual_metadata == expected_metadata
@@ -274,6 +298,56 @@ def test_uploads_classified_transfers_given_start_and_end_datetime_and_cutoff(da
         environ.clear()
 
 
+def test_skips_days_whose_transfers_were_written_from_the_same_inputs(datadir):
+    fake_s3, s3_client = _setup()
+    fake_s3.start()
+
+    output_transfer_data_bucket = _build_fake_s3_bucket(
+        S3_OUTPUT_TRANSFER_DATA_BUCKET_NAME, s3_client
+    )
+    input_spine_data_bucket = _build_fake_s3_bucket(S3_INPUT_SPINE_DATA_BUCKET_NAME, s3_client)
+    input_ods_metadata_bucket = _build_fake_s3_bucket(S3_INPUT_ODS_METADATA_BUCKET_NAME, s3_client)
+
+    _upload_files_to_spine_data_bucket(input_spine_data_bucket, datadir)
+    _upload_files_to_ods_metadata_bucket(input_ods_metadata_bucket, datadir)
+
+    try:
+        environ["START_DATETIME"] = "2019-12-02T00:00:00Z"
+        environ["END_DATETIME"] = "2019-12-04T00:00:00Z"
+        environ["CONVERSATION_CUTOFF_DAYS"] = "14"
+        environ["SKIP_UNCHANGED_OUTPUTS"] = "True"
+
+        main()
+
+        unchanged_output_path = "v11/cutoff-14/2019/12/02/2019-12-02-transfers.parquet"
+        stale_output_path = "v11/cutoff-14/2019/12/03/2019-12-03-transfers.parquet"
+        unchanged_metadata = _read_s3_metadata(output_transfer_data_bucket, unchanged_output_path)
+        stale_metadata = _read_s3_metadata(output_transfer_data_bucket, stale_output_path)
+
+        output_transfer_data_bucket.Object(unchanged_output_path).put(
+            Body=b"unchanged", Metadata=unchanged_metadata
+        )
+        output_transfer_data_bucket.Object(stale_output_path).put(
+            Body=b"stale", Metadata={**stale_metadata, "input-fingerprint": "stale"}
+        )
+
+        main()
+
+        unchanged_body = output_transfer_data_bucket.Object(unchanged_output_path).get()["Body"]
+        assert unchanged_body.read() == b"unchanged"
+
+        actual_transfers = read_s3_parquet(output_transfer_data_bucket, stale_output_path)
+        assert actual_transfers == _get_expected_transfers(datadir, (2019, 12, 3))
+        assert _read_s3_metadata(output_transfer_data_bucket, stale_output_path) == stale_metadata
+
+    finally:
+        _delete_bucket_with_objects(output_transfer_data_bucket)
+        _delete_bucket_with_objects(input_spine_data_bucket)
+        _delete_bucket_with_objects(input_ods_metadata_bucket)
+        fake_s3.stop()
+        environ.clear()
+
+
 # def test_mi_events(datadir):
 #     fake_s3, s3_client = _setup()
 #     fake_s3.start()
@@ -446,6 +520,7 @@ def test_uploads_classified_transfers_given__no__start_and_end_datetimes_and_no_
             "start-datetime": "2019-12-31T00:00:00+00:00",
             "end-datetime": "2020-01-01T00:00:00+00:00",
             "ods-metadata-month": "2019-12",
+            "input-fingerprint": ANY,
         }
         year = 2019
         month = 12
@@ -517,6 +592,7 @@ def test_uploads_classified_transfers_using_previous_month_ods_metadata(datadir)
             "start-datetime": "2020-02-04T00:00:00+00:00",
             "end-datetime": "2020-02-05T00:00:00+00:00",
             "ods-metadata-month": "2020-1",
+            "input-fingerprint": ANY,
         }
 
         expected_transfers = _read_parquet_columns_json(
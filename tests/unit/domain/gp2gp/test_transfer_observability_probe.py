@@ -1,6 +1,9 @@
 from unittest.mock import Mock
 
-from prmdata.domain.gp2gp.transfer_service import TransferServiceObservabilityProbe
+from prmdata.domain.gp2gp.transfer_service import (
+    AggregatingTransferServiceObservabilityProbe,
+    TransferServiceObservabilityProbe,
+)
 from tests.builders.common import a_datetime, a_string
 from tests.builders.spine import build_mock_gp2gp_conversation
 
@@ -28,3 +31,70 @@ def test_probe_should_log_warning_given_negative_sla():
             "request_completed_time": request_completed_time,
         },
     )
+
+
+def test_probe_should_log_counts_of_filtered_spine_data():
+    mock_logger = Mock()
+
+    probe = TransferServiceObservabilityProbe(logger=mock_logger)
+    probe.record_irrelevant_spine_data_filtered(
+        dropped_message_count=10, evicted_conversation_count=3
+    )
+
+    mock_logger.info.assert_called_once_with(
+        "Filtered irrelevant spine messages and conversations before classification",
+        extra={
+            "event": "IRRELEVANT_SPINE_DATA_FILTERED",
+            "dropped_message_count": 10,
+            "evicted_conversation_count": 3,
+        },
+    )
+
+
+def test_probe_should_log_warning_given_late_spine_messages():
+    mock_logger = Mock()
+
+    probe = TransferServiceObservabilityProbe(logger=mock_logger)
+    probe.record_late_spine_messages_dropped(4)
+
+    mock_logger.warning.assert_called_once_with(
+        "Dropped spine messages that arrived after their conversation was finalised",
+        extra={"event": "LATE_SPINE_MESSAGES_DROPPED", "late_message_count": 4},
+    )
+
+
+def test_aggregating_probe_counts_conversations_by_unknown_asid():
+    mock_logger = Mock()
+
+    probe = AggregatingTransferServiceObservabilityProbe(sample_size=2, logger=mock_logger)
+    for conversation_id in ["a", "b", "c"]:
+        probe.record_no_ods_code_for_asid(conversation_id, "123456789012")
+    probe.record_no_ods_code_for_asid("d", "210987654321")
+
+    mock_logger.warning.assert_not_called()
+
+    probe.flush()
+
+    mock_logger.warning.assert_called_once_with(
+        ":Summary of UNKNOWN_ODS_CODE_FOR_CONVERSATION events",
+        extra={
+            "event": "UNKNOWN_ODS_CODE_FOR_CONVERSATION_SUMMARY",
+            "total_count": 4,
+            "counts": {"123456789012": 3, "210987654321": 1},
+            "samples": {
+                "123456789012": [{"conversation_id": "a"}, {"conversation_id": "b"}],
+                "210987654321": [{"conversation_id": "d"}],
+            },
+        },
+    )
+
+
+def test_aggregating_probe_logs_each_summary_once():
+    mock_logger = Mock()
+
+    probe = AggregatingTransferServiceObservabilityProbe(sample_size=2, logger=mock_logger)
+    probe.record_no_ods_code_for_asid("a", "123456789012")
+    probe.flush()
+    probe.flush()
+
+    mock_logger.warning.assert_called_once()
@@ -7,7 +7,9 @@ import pytest
 from prmdata.domain.gp2gp.transfer_outcome import (
     TransferFailureReason,
     TransferOutcome,
+    TransferOutcomePredicate,
     TransferStatus,
+    _assign_transfer_outcome,
 )
 from prmdata.domain.spine.gp2gp_conversation import Gp2gpConversation
 from prmdata.domain.spine.message import FATAL_SENDER_ERROR_CODES, Message
@@ -202,3 +204,55 @@ def test_returns_correct_transfer_outcome_given_multiple_conflicting_sender_acks
 
     assert actual.status == TransferStatus.TECHNICAL_FAILURE
     assert actual.failure_reason == TransferFailureReason.FATAL_SENDER_ERROR
+
+
+@pytest.mark.parametrize(
+    "test_case",
+    [
+        test_cases.request_made,
+        test_cases.request_acknowledged_with_error,
+        test_cases.core_ehr_sent_with_sender_error,
+        test_cases.unacknowledged_duplicate_with_copcs_and_waiting_for_integration,
+        test_cases.ehr_integrated_successfully,
+        test_cases.ehr_integrated_late,
+        test_cases.ehr_integration_failed,
+        test_cases.copc_continue_sent,
+        test_cases.copc_fragment_failure,
+        test_cases.pending_integration_with_copc_fragments,
+        test_cases.successful_integration_with_copc_fragments,
+    ],
+)
+def test_outcome_looked_up_from_predicates_matches_rule_chain(test_case):
+    conversation = Gp2gpConversation(test_case(), mock_gp2gp_conversation_observability_probe)
+    sla_duration = a_duration()
+
+    actual = TransferOutcome.from_gp2gp_conversation(conversation, sla_duration)
+
+    assert (actual.status, actual.failure_reason) == _assign_transfer_outcome(
+        conversation, sla_duration
+    )
+
+
+def test_records_predicates_of_the_conversation():
+    conversation = Gp2gpConversation(
+        test_cases.ehr_integrated_successfully(), mock_gp2gp_conversation_observability_probe
+    )
+
+    actual = TransferOutcome.from_gp2gp_conversation(conversation, timedelta(days=1))
+
+    assert actual.predicates == (
+        TransferOutcomePredicate.IS_INTEGRATED | TransferOutcomePredicate.INTEGRATED_WITHIN_SLA
+    )
+
+
+def test_records_missing_request_acknowledgement_predicates():
+    conversation = Gp2gpConversation(
+        test_cases.request_made(), mock_gp2gp_conversation_observability_probe
+    )
+
+    actual = TransferOutcome.from_gp2gp_conversation(conversation, None)
+
+    assert actual.predicates == (
+        TransferOutcomePredicate.IS_MISSING_REQUEST_ACKNOWLEDGED
+        | TransferOutcomePredicate.IS_MISSING_CORE_EHR
+    )
@@ -2,9 +2,11 @@ from datetime import timedelta
 from unittest.mock import Mock
 
 from prmdata.domain.gp2gp.transfer_service import TransferService
+from prmdata.domain.ods_portal.organisation_lookup import OrganisationLookup
 from prmdata.domain.spine.gp2gp_conversation import Gp2gpConversation
 from tests.builders import test_cases
 from tests.builders.common import a_datetime, a_string
+from tests.builders.ods_portal import build_practice_metadata
 from tests.builders.spine import build_mock_gp2gp_conversation
 
 mock_transfer_observability_probe = Mock()
@@ -535,3 +537,64 @@ def test_produces_sending_practice_sicbl_ods_code_using_organisation_lookup():
     assert actual.sending_practice.sicbl_ods_code == expected_sending_practice_sicbl_ods_code
     mock_lookup.practice_ods_code_from_asid.assert_any_call("100")
     mock_lookup.sicbl_ods_code_from_practice_ods_code.assert_any_call("AB123")
+
+
+def test_shares_practices_between_transfers_from_the_same_asid_and_supplier():
+    practice_metadata = build_practice_metadata(asids=["123456789012"])
+    organisation_lookup = OrganisationLookup(
+        practices=[practice_metadata], sicbls=[], year_month=(2021, 3)
+    )
+    conversations = [
+        build_mock_gp2gp_conversation(requesting_practice_asid="123456789012") for _ in range(2)
+    ]
+    for conversation in conversations:
+        conversation.requesting_supplier.return_value = "EMIS"
+
+    transfer_service = TransferService(cutoff=timedelta(days=14), observability_probe=Mock())
+    first, second = [
+        transfer_service.derive_transfer(conversation, organisation_lookup)
+        for conversation in conversations
+    ]
+
+    assert first.requesting_practice is second.requesting_practice
+    assert first.requesting_practice.ods_code == practice_metadata.ods_code
+
+
+def test_logs_unknown_asid_once_for_its_first_conversation():
+    conversation_ids = [a_string(), a_string()]
+    conversations = [
+        build_mock_gp2gp_conversation(
+            conversation_id=conversation_id, sending_practice_asid="314135442432"
+        )
+        for conversation_id in conversation_ids
+    ]
+    conversations[1].sending_supplier.return_value = "another supplier"
+    mock_probe = Mock()
+    organisation_lookup = OrganisationLookup(practices=[], sicbls=[], year_month=(2021, 3))
+
+    transfer_service = TransferService(cutoff=timedelta(days=14), observability_probe=mock_probe)
+    for conversation in conversations:
+        transfer_service.derive_transfer(conversation, organisation_lookup)
+
+    sending_asid_calls = [
+        call
+        for call in mock_probe.record_no_ods_code_for_asid.call_args_list
+        if call.args[1] == "314135442432"
+    ]
+    assert sending_asid_calls == [((conversation_ids[0], "314135442432"),)]
+
+
+def test_looks_up_practices_again_given_a_different_lookup_for_the_same_month():
+    conversation = build_mock_gp2gp_conversation(requesting_practice_asid="123456789012")
+    practice_metadata = build_practice_metadata(asids=["123456789012"])
+    unknown_lookup = OrganisationLookup(practices=[], sicbls=[], year_month=(2021, 3))
+    known_lookup = OrganisationLookup(
+        practices=[practice_metadata], sicbls=[], year_month=(2021, 3)
+    )
+
+    transfer_service = TransferService(cutoff=timedelta(days=14), observability_probe=Mock())
+    unknown = transfer_service.derive_transfer(conversation, unknown_lookup)
+    known = transfer_service.derive_transfer(conversation, known_lookup)
+
+    assert unknown.requesting_practice.ods_code is None
+    assert known.requesting_practice.ods_code == practice_metadata.ods_code
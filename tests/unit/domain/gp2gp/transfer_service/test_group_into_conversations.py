@@ -5,6 +5,7 @@ import pytest
 
 from prmdata.domain.gp2gp.transfer_service import TransferService
 from prmdata.domain.spine.conversation import Conversation
+from prmdata.domain.spine.message import APPLICATION_ACK, EHR_REQUEST_COMPLETED, EHR_REQUEST_STARTED
 from tests.builders.spine import build_message
 
 mock_transfer_observability_probe = Mock()
@@ -83,3 +84,284 @@ def test_rejects_messages_after_cutoff(cutoff_interval, expected_message_ids):
     actual_message_ids = [m.guid for m in next(conversations).messages]
 
     assert actual_message_ids == expected_message_ids
+
+
+def test_filter_drops_messages_with_non_gp2gp_interactions():
+    request_started = build_message(
+        conversation_id="abc", interaction_id=EHR_REQUEST_STARTED, time=datetime(2020, 6, 5)
+    )
+    unknown = build_message(
+        conversation_id="abc", interaction_id="an-unknown-interaction", time=datetime(2020, 6, 6)
+    )
+    ack = build_message(
+        conversation_id="abc", interaction_id=APPLICATION_ACK, time=datetime(2020, 6, 7)
+    )
+
+    transfer_service = TransferService(
+        cutoff=timedelta(days=14),
+        observability_probe=Mock(),
+        filter_irrelevant_messages=True,
+    )
+    actual = transfer_service.group_into_conversations(
+        message_stream=[request_started, unknown, ack]
+    )
+
+    assert list(actual) == [Conversation("abc", [request_started, ack])]
+
+
+def test_filter_evicts_conversations_that_do_not_start_with_request_started():
+    started = build_message(conversation_id="started", interaction_id=EHR_REQUEST_STARTED)
+    never_started = build_message(conversation_id="never", interaction_id=APPLICATION_ACK)
+    started_late = build_message(
+        conversation_id="late", interaction_id=EHR_REQUEST_STARTED, time=datetime(2020, 6, 6)
+    )
+    before_start = build_message(
+        conversation_id="late", interaction_id=EHR_REQUEST_COMPLETED, time=datetime(2020, 6, 5)
+    )
+
+    transfer_service = TransferService(
+        cutoff=timedelta(days=14),
+        observability_probe=Mock(),
+        filter_irrelevant_messages=True,
+    )
+    actual = transfer_service.group_into_conversations(
+        message_stream=[started, never_started, started_late, before_start]
+    )
+
+    assert list(actual) == [Conversation("started", [started])]
+
+
+def test_filter_reports_what_it_removed():
+    messages = [
+        build_message(
+            conversation_id="a", interaction_id=EHR_REQUEST_STARTED, time=datetime(2020, 6, 5)
+        ),
+        build_message(
+            conversation_id="a", interaction_id="an-unknown-interaction", time=datetime(2020, 6, 6)
+        ),
+        build_message(conversation_id="b", interaction_id=APPLICATION_ACK),
+        build_message(
+            conversation_id="c", interaction_id="an-unknown-interaction", time=datetime(2020, 6, 5)
+        ),
+        build_message(
+            conversation_id="c", interaction_id="an-unknown-interaction", time=datetime(2020, 6, 6)
+        ),
+    ]
+    probe = Mock()
+
+    transfer_service = TransferService(
+        cutoff=timedelta(days=14),
+        observability_probe=probe,
+        filter_irrelevant_messages=True,
+    )
+    list(transfer_service.group_into_conversations(message_stream=messages))
+
+    probe.record_irrelevant_spine_data_filtered.assert_called_once_with(
+        dropped_message_count=2, evicted_conversation_count=2
+    )
+
+
+def test_filter_keeps_the_conversations_that_would_be_classified():
+    messages = [
+        build_message(conversation_id="a", interaction_id=EHR_REQUEST_STARTED),
+        build_message(conversation_id="b", interaction_id=APPLICATION_ACK),
+        build_message(
+            conversation_id="c", interaction_id=EHR_REQUEST_STARTED, time=datetime(2020, 6, 5)
+        ),
+        build_message(
+            conversation_id="c", interaction_id=EHR_REQUEST_COMPLETED, time=datetime(2020, 6, 6)
+        ),
+    ]
+
+    unfiltered = TransferService(cutoff=timedelta(days=14), observability_probe=Mock())
+    filtered = TransferService(
+        cutoff=timedelta(days=14), observability_probe=Mock(), filter_irrelevant_messages=True
+    )
+
+    expected = [
+        conversation.conversation_id()
+        for conversation in unfiltered.parse_conversations_into_gp2gp_conversations(
+            unfiltered.group_into_conversations(messages)
+        )
+    ]
+    actual = [
+        conversation.conversation_id()
+        for conversation in filtered.parse_conversations_into_gp2gp_conversations(
+            filtered.group_into_conversations(messages)
+        )
+    ]
+
+    assert actual == expected == ["a", "c"]
+
+
+def test_filter_evicts_conversations_whose_earliest_message_is_not_gp2gp():
+    request_started = build_message(
+        conversation_id="abc", interaction_id=EHR_REQUEST_STARTED, time=datetime(2020, 6, 6)
+    )
+    earlier_unknown = build_message(
+        conversation_id="abc", interaction_id="an-unknown-interaction", time=datetime(2020, 6, 5)
+    )
+    messages = [request_started, earlier_unknown]
+
+    unfiltered = TransferService(cutoff=timedelta(days=14), observability_probe=Mock())
+    filtered = TransferService(
+        cutoff=timedelta(days=14), observability_probe=Mock(), filter_irrelevant_messages=True
+    )
+
+    expected = list(
+        unfiltered.parse_conversations_into_gp2gp_conversations(
+            unfiltered.group_into_conversations(messages)
+        )
+    )
+    actual = list(
+        filtered.parse_conversations_into_gp2gp_conversations(
+            filtered.group_into_conversations(messages)
+        )
+    )
+
+    assert actual == expected == []
+
+
+def test_filter_keeps_a_non_gp2gp_message_only_while_it_is_the_earliest_in_its_conversation():
+    first_unknown = build_message(
+        conversation_id="abc", interaction_id="an-unknown-interaction", time=datetime(2020, 6, 6)
+    )
+    request_started = build_message(
+        conversation_id="abc", interaction_id=EHR_REQUEST_STARTED, time=datetime(2020, 6, 5)
+    )
+    unknown_at_start = build_message(
+        conversation_id="abc", interaction_id="an-unknown-interaction", time=datetime(2020, 6, 5)
+    )
+
+    transfer_service = TransferService(
+        cutoff=timedelta(days=14),
+        observability_probe=Mock(),
+        filter_irrelevant_messages=True,
+    )
+    actual = transfer_service.group_into_conversations(
+        message_stream=[first_unknown, request_started, unknown_at_start]
+    )
+
+    assert list(actual) == [Conversation("abc", [request_started, first_unknown])]
+
+
+def test_parses_conversations_lazily_skipping_those_without_a_request_started():
+    started = build_message(conversation_id="a", interaction_id=EHR_REQUEST_STARTED)
+    not_started = build_message(conversation_id="b", interaction_id=APPLICATION_ACK)
+    conversations = iter([Conversation("a", [started]), Conversation("b", [not_started])])
+
+    transfer_service = TransferService(cutoff=timedelta(days=14), observability_probe=Mock())
+    actual = transfer_service.parse_conversations_into_gp2gp_conversations(conversations)
+
+    assert next(actual).conversation_id() == "a"
+    assert list(actual) == []
+
+
+def _conversations_by_id(conversations):
+    return {conversation.id: conversation for conversation in conversations}
+
+
+@pytest.mark.parametrize("filter_irrelevant_messages", [False, True])
+def test_spilling_to_disk_produces_the_same_conversations_as_grouping_in_memory(
+    filter_irrelevant_messages,
+):
+    interaction_ids = [EHR_REQUEST_STARTED, EHR_REQUEST_COMPLETED, APPLICATION_ACK, "unknown"]
+    messages = [
+        build_message(
+            conversation_id=f"conversation-{i % 23}",
+            guid=str(i),
+            interaction_id=interaction_ids[i % 4],
+            time=datetime(2020, 6, 1) + timedelta(hours=(i * 37) % 100),
+        )
+        for i in range(200)
+    ]
+
+    in_memory = TransferService(
+        cutoff=timedelta(days=2),
+        observability_probe=Mock(),
+        filter_irrelevant_messages=filter_irrelevant_messages,
+    )
+    spilled = TransferService(
+        cutoff=timedelta(days=2),
+        observability_probe=Mock(),
+        filter_irrelevant_messages=filter_irrelevant_messages,
+        spill_memory_budget_bytes=10_000,
+    )
+
+    expected = list(in_memory.group_into_conversations(messages))
+    actual = list(spilled.group_into_conversations(messages))
+
+    assert len(expected) > 0
+    assert actual == expected
+
+
+@pytest.mark.parametrize("filter_irrelevant_messages", [False, True])
+def test_streaming_assembly_produces_the_same_conversations_as_grouping_in_memory(
+    filter_irrelevant_messages,
+):
+    interaction_ids = [EHR_REQUEST_STARTED, EHR_REQUEST_COMPLETED, APPLICATION_ACK, "unknown"]
+    messages = [
+        build_message(
+            conversation_id=f"conversation-{i // 10}",
+            guid=str(i),
+            interaction_id=interaction_ids[i % 4],
+            time=datetime(2020, 6, 1) + timedelta(hours=i * 3 + (i % 5)),
+        )
+        for i in range(200)
+    ]
+
+    in_memory = TransferService(
+        cutoff=timedelta(days=2),
+        observability_probe=Mock(),
+        filter_irrelevant_messages=filter_irrelevant_messages,
+    )
+    streaming = TransferService(
+        cutoff=timedelta(days=2),
+        observability_probe=Mock(),
+        filter_irrelevant_messages=filter_irrelevant_messages,
+        streaming_allowed_lateness=timedelta(hours=12),
+    )
+
+    expected = _conversations_by_id(in_memory.group_into_conversations(messages))
+    actual = _conversations_by_id(streaming.group_into_conversations(messages))
+
+    assert len(expected) > 0
+    assert actual == expected
+
+
+def test_streaming_assembly_yields_conversations_before_the_stream_ends():
+    consumed = []
+
+    def message_stream():
+        for day in range(1, 6):
+            message = build_message(conversation_id=str(day), time=datetime(2020, 6, day))
+            consumed.append(message)
+            yield message
+
+    transfer_service = TransferService(
+        cutoff=timedelta(days=1),
+        observability_probe=Mock(),
+        streaming_allowed_lateness=timedelta(0),
+    )
+    conversations = transfer_service.group_into_conversations(message_stream())
+
+    assert next(conversations).id == "1"
+    assert len(consumed) == 3
+
+
+def test_streaming_assembly_reports_late_messages():
+    probe = Mock()
+    messages = [
+        build_message(conversation_id="a", time=datetime(2020, 6, 1)),
+        build_message(conversation_id="b", time=datetime(2020, 6, 5)),
+        build_message(conversation_id="a", time=datetime(2020, 6, 2)),
+    ]
+
+    transfer_service = TransferService(
+        cutoff=timedelta(days=2),
+        observability_probe=probe,
+        streaming_allowed_lateness=timedelta(days=1),
+    )
+    list(transfer_service.group_into_conversations(messages))
+
+    probe.record_late_spine_messages_dropped.assert_called_once_with(1)
@@ -0,0 +1,123 @@
+import pickle
+
+from prmdata.domain.ods_portal.array_organisation_lookup import ArrayOrganisationLookup
+from prmdata.domain.ods_portal.organisation_lookup import OrganisationLookup
+from tests.builders.ods_portal import build_practice_metadata, build_sicbl_metadata
+
+
+def _an_organisation_lookup() -> OrganisationLookup:
+    practices = [
+        build_practice_metadata(ods_code="B12345", name="A practice", asids=["456", "123"]),
+        build_practice_metadata(ods_code="A12345", name="Another practice", asids=["789"]),
+        build_practice_metadata(ods_code="C12345", name="Third practice", asids=["012"]),
+    ]
+    sicbls = [
+        build_sicbl_metadata(ods_code="20D", name="A SICBL", practices=["B12345", "Z12345"]),
+        build_sicbl_metadata(ods_code="10D", name="Another SICBL", practices=["A12345"]),
+    ]
+    return OrganisationLookup(practices, sicbls, year_month=(2021, 3))
+
+
+def _assert_same_lookups(actual: OrganisationLookup, expected: OrganisationLookup):
+    assert (actual.year, actual.month) == (expected.year, expected.month)
+    for asid in ["012", "123", "456", "789", "000", ""]:
+        assert actual.has_asid_code(asid) == expected.has_asid_code(asid)
+        assert actual.practice_ods_code_from_asid(asid) == expected.practice_ods_code_from_asid(
+            asid
+        )
+        assert actual.practice_name_from_asid(asid) == expected.practice_name_from_asid(asid)
+    for ods_code in ["A12345", "B12345", "C12345", "Z12345", "Y12345"]:
+        assert actual.sicbl_ods_code_from_practice_ods_code(
+            ods_code
+        ) == expected.sicbl_ods_code_from_practice_ods_code(ods_code)
+        assert actual.sicbl_name_from_practice_ods_code(
+            ods_code
+        ) == expected.sicbl_name_from_practice_ods_code(ods_code)
+
+
+def test_answers_the_same_lookups_as_the_lookup_it_was_built_from():
+    organisation_lookup = _an_organisation_lookup()
+
+    actual = ArrayOrganisationLookup.from_organisation_lookup(organisation_lookup)
+
+    _assert_same_lookups(actual, organisation_lookup)
+
+
+def test_keeps_the_last_mapping_of_a_repeated_asid_or_practice():
+    practices = [
+        build_practice_metadata(ods_code="A12345", name="A practice", asids=["123"]),
+        build_practice_metadata(ods_code="B12345", name="Another practice", asids=["123"]),
+    ]
+    sicbls = [
+        build_sicbl_metadata(ods_code="10D", name="A SICBL", practices=["A12345"]),
+        build_sicbl_metadata(ods_code="20D", name="Another SICBL", practices=["A12345"]),
+    ]
+    organisation_lookup = OrganisationLookup(practices, sicbls, year_month=(2021, 3))
+
+    actual = ArrayOrganisationLookup.from_organisation_lookup(organisation_lookup)
+
+    _assert_same_lookups(actual, organisation_lookup)
+    assert actual.practice_ods_code_from_asid("123") == "B12345"
+    assert actual.sicbl_ods_code_from_practice_ods_code("A12345") == "20D"
+
+
+def test_answers_no_lookups_given_no_organisations():
+    organisation_lookup = OrganisationLookup(practices=[], sicbls=[], year_month=(2021, 3))
+
+    actual = ArrayOrganisationLookup.from_organisation_lookup(organisation_lookup)
+
+    _assert_same_lookups(actual, organisation_lookup)
+    assert actual.asid_to_practice_table().num_rows == 0
+    assert actual.practice_to_sicbl_table().num_rows == 0
+
+
+def test_lookup_tables_are_sorted_by_key():
+    actual = ArrayOrganisationLookup.from_organisation_lookup(_an_organisation_lookup())
+
+    assert actual.asid_to_practice_table().to_pydict() == {
+        "asid": ["012", "123", "456", "789"],
+        "ods_code": ["C12345", "B12345", "B12345", "A12345"],
+        "name": ["Third practice", "A practice", "A practice", "Another practice"],
+    }
+    assert actual.practice_to_sicbl_table().to_pydict() == {
+        "practice_ods_code": ["A12345", "B12345", "Z12345"],
+        "sicbl_ods_code": ["10D", "20D", "20D"],
+        "sicbl_name": ["Another SICBL", "A SICBL", "A SICBL"],
+    }
+
+
+def test_opens_a_memory_mapped_lookup_from_its_buffer(tmp_path):
+    organisation_lookup = _an_organisation_lookup()
+    path = tmp_path / "lookup.arrow"
+    path.write_bytes(
+        ArrayOrganisationLookup.from_organisation_lookup(organisation_lookup).buffer.to_pybytes()
+    )
+
+    actual = ArrayOrganisationLookup.open(str(path))
+
+    _assert_same_lookups(actual, organisation_lookup)
+
+
+def test_pickles_a_memory_mapped_lookup_as_its_path(tmp_path):
+    organisation_lookup = _an_organisation_lookup()
+    path = tmp_path / "lookup.arrow"
+    path.write_bytes(
+        ArrayOrganisationLookup.from_organisation_lookup(organisation_lookup).buffer.to_pybytes()
+    )
+    array_organisation_lookup = ArrayOrganisationLookup.open(str(path))
+
+    pickled = pickle.dumps(array_organisation_lookup)
+    actual = pickle.loads(pickled)
+
+    assert len(pickled) < array_organisation_lookup.buffer.size
+    _assert_same_lookups(actual, organisation_lookup)
+
+
+def test_pickles_an_in_memory_lookup_as_its_buffer():
+    organisation_lookup = _an_organisation_lookup()
+
+    actual = pickle.loads(
+        pickle.dumps(ArrayOrganisationLookup.from_organisation_lookup(organisation_lookup))
+    )
+
+    _assert_same_lookups(actual, organisation_lookup)
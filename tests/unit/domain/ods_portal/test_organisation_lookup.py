@@ -194,3 +194,47 @@ def test_sicbl_ods_code_from_practice_ods_code_returns_matching_sicbl_given_mult
     actual = organisation_lookup.sicbl_ods_code_from_practice_ods_code("A2431")
 
     assert actual == expected
+
+
+def test_asid_to_practice_table_has_a_row_per_asid():
+    practices = [
+        build_practice_metadata(ods_code="A12345", name="A practice", asids=["123", "456"]),
+        build_practice_metadata(ods_code="B12345", name="Another practice", asids=["789"]),
+    ]
+
+    organisation_lookup = OrganisationLookup(practices, sicbls=[], year_month=(2020, 1))
+
+    expected = {
+        "asid": ["123", "456", "789"],
+        "ods_code": ["A12345", "A12345", "B12345"],
+        "name": ["A practice", "A practice", "Another practice"],
+    }
+
+    actual = organisation_lookup.asid_to_practice_table().to_pydict()
+
+    assert actual == expected
+
+
+def test_practice_to_sicbl_table_has_a_row_per_practice_ods_code():
+    sicbls = [
+        build_sicbl_metadata(ods_code="10D", name="A SICBL", practices=["A12345", "B12345"]),
+    ]
+
+    organisation_lookup = OrganisationLookup(practices=[], sicbls=sicbls, year_month=(2020, 1))
+
+    expected = {
+        "practice_ods_code": ["A12345", "B12345"],
+        "sicbl_ods_code": ["10D", "10D"],
+        "sicbl_name": ["A SICBL", "A SICBL"],
+    }
+
+    actual = organisation_lookup.practice_to_sicbl_table().to_pydict()
+
+    assert actual == expected
+
+
+def test_lookup_tables_are_empty_given_no_organisations():
+    organisation_lookup = OrganisationLookup(practices=[], sicbls=[], year_month=(2020, 1))
+
+    assert organisation_lookup.asid_to_practice_table().num_rows == 0
+    assert organisation_lookup.practice_to_sicbl_table().num_rows == 0
@@ -1,6 +1,7 @@
 from unittest.mock import Mock
 
 from prmdata.domain.spine.gp2gp_conversation import (
+    AggregatingGp2gpConversationObservabilityProbe,
     Gp2gpConversation,
     Gp2gpConversationObservabilityProbe,
 )
@@ -56,3 +57,61 @@ def test_warning_when_unable_to_determine_purpose_of_message():
             "interaction_id": unknown_message_purpose_message.interaction_id,
         },
     )
+
+
+def test_aggregating_probe_summarises_unknown_message_purposes_when_flushed():
+    mock_logger = Mock()
+    probe = AggregatingGp2gpConversationObservabilityProbe(sample_size=1, logger=mock_logger)
+    interaction_id = "urn:nhs:names:services:gp2gp/RCMR_IN010000UK08"
+
+    for conversation_id in ["ASD", "QWE"]:
+        messages = [
+            build_message(conversation_id=conversation_id, interaction_id=EHR_REQUEST_STARTED),
+            build_message(
+                conversation_id=conversation_id, guid="abc", interaction_id=interaction_id
+            ),
+        ]
+        Gp2gpConversation(messages=messages, probe=probe)
+
+    mock_logger.warning.assert_not_called()
+
+    probe.flush()
+
+    mock_logger.warning.assert_called_once_with(
+        ":Summary of UNKNOWN_MESSAGE_PURPOSE events",
+        extra={
+            "event": "UNKNOWN_MESSAGE_PURPOSE_SUMMARY",
+            "total_count": 2,
+            "counts": {interaction_id: 2},
+            "samples": {interaction_id: [{"conversation_id": "ASD", "guid": "abc"}]},
+        },
+    )
+
+
+def test_aggregating_probe_summarises_acknowledgements_missing_their_message_by_sender():
+    mock_logger = Mock()
+    probe = AggregatingGp2gpConversationObservabilityProbe(sample_size=5, logger=mock_logger)
+
+    messages = ehr_missing_message_for_an_acknowledgement()
+    acknowledgement_for_missing_message = messages[1]
+
+    Gp2gpConversation(messages=messages, probe=probe)
+    probe.flush()
+
+    sender = acknowledgement_for_missing_message.from_party_asid
+    mock_logger.warning.assert_called_once_with(
+        ":Summary of MISSING_MESSAGE_FOR_ACKNOWLEDGEMENT events",
+        extra={
+            "event": "MISSING_MESSAGE_FOR_ACKNOWLEDGEMENT_SUMMARY",
+            "total_count": 1,
+            "counts": {sender: 1},
+            "samples": {
+                sender: [
+                    {
+                        "conversation_id": acknowledgement_for_missing_message.conversation_id,
+                        "message_ref": acknowledgement_for_missing_message.message_ref,
+                    }
+                ]
+            },
+        },
+    )
@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+from dateutil.tz import UTC, tzoffset
+
+from prmdata.domain.spine.gp2gp_conversation import Gp2gpConversation, assign_conversations_to_days
+from tests.builders import test_cases
+
+mock_gp2gp_conversation_observability_probe = Mock()
+
+
+def _a_conversation_requested_at(request_sent_date: datetime) -> Gp2gpConversation:
+    return Gp2gpConversation(
+        messages=test_cases.request_made(request_sent_date=request_sent_date),
+        probe=mock_gp2gp_conversation_observability_probe,
+    )
+
+
+def _daily_start_datetimes(first: datetime, days: int):
+    return [first + timedelta(days=day) for day in range(days)]
+
+
+def test_assigns_conversations_to_the_day_they_were_requested():
+    first_day = _a_conversation_requested_at(datetime(2020, 6, 1, tzinfo=UTC))
+    second_day = _a_conversation_requested_at(datetime(2020, 6, 2, 23, 59, 59, tzinfo=UTC))
+    also_first_day = _a_conversation_requested_at(datetime(2020, 6, 1, 12, tzinfo=UTC))
+    daily_start_datetimes = _daily_start_datetimes(datetime(2020, 6, 1, tzinfo=UTC), 3)
+
+    actual = assign_conversations_to_days(
+        [first_day, second_day, also_first_day], daily_start_datetimes
+    )
+
+    assert list(actual) == [
+        (datetime(2020, 6, 1, tzinfo=UTC), first_day),
+        (datetime(2020, 6, 2, tzinfo=UTC), second_day),
+        (datetime(2020, 6, 1, tzinfo=UTC), also_first_day),
+    ]
+
+
+def test_leaves_out_conversations_requested_outside_the_days():
+    before = _a_conversation_requested_at(datetime(2020, 5, 31, 23, 59, 59, tzinfo=UTC))
+    on_day_end = _a_conversation_requested_at(datetime(2020, 6, 3, tzinfo=UTC))
+    after = _a_conversation_requested_at(datetime(2020, 6, 5, tzinfo=UTC))
+    daily_start_datetimes = _daily_start_datetimes(datetime(2020, 6, 1, tzinfo=UTC), 2)
+
+    actual = assign_conversations_to_days([before, on_day_end, after], daily_start_datetimes)
+
+    assert list(actual) == []
+
+
+def test_assigns_conversations_requested_in_bst_by_their_utc_time():
+    day_before_in_utc = _a_conversation_requested_at(
+        datetime(2020, 3, 29, 0, 30, tzinfo=tzoffset("BST", 3600))
+    )
+    same_day_in_utc = _a_conversation_requested_at(
+        datetime(2020, 3, 29, 1, 30, tzinfo=tzoffset("BST", 3600))
+    )
+    daily_start_datetimes = _daily_start_datetimes(datetime(2020, 3, 28, tzinfo=UTC), 2)
+
+    actual = assign_conversations_to_days(
+        [day_before_in_utc, same_day_in_utc], daily_start_datetimes
+    )
+
+    assert list(actual) == [
+        (datetime(2020, 3, 28, tzinfo=UTC), day_before_in_utc),
+        (datetime(2020, 3, 29, tzinfo=UTC), same_day_in_utc),
+    ]
+
+
+def test_assigns_no_conversations_given_no_days():
+    conversation = _a_conversation_requested_at(datetime(2020, 6, 1, tzinfo=UTC))
+
+    assert list(assign_conversations_to_days([conversation], [])) == []
+
+
+def test_assigns_conversations_to_days_lazily_in_conversation_order():
+    second_day = _a_conversation_requested_at(datetime(2020, 6, 2, tzinfo=UTC))
+    outside = _a_conversation_requested_at(datetime(2020, 6, 5, tzinfo=UTC))
+    first_day = _a_conversation_requested_at(datetime(2020, 6, 1, 8, tzinfo=UTC))
+    daily_start_datetimes = _daily_start_datetimes(datetime(2020, 6, 1, tzinfo=UTC), 2)
+
+    actual = assign_conversations_to_days(
+        iter([second_day, outside, first_day]), daily_start_datetimes
+    )
+
+    assert next(actual) == (datetime(2020, 6, 2, tzinfo=UTC), second_day)
+    assert list(actual) == [(datetime(2020, 6, 1, tzinfo=UTC), first_day)]
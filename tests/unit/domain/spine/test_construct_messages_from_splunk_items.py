@@ -6,6 +6,7 @@ from dateutil.tz import tzutc
 from prmdata.domain.spine.message import (
     FailedToConstructMessagesFromSplunkItemsError,
     Message,
+    construct_messages_from_splunk_columns,
     construct_messages_from_splunk_items,
 )
 from tests.builders.spine import build_spine_item
@@ -219,3 +220,34 @@ def test_handles_invalid_data():
             ValueError("invalid literal for int() with base 10: 'INVALID'"),
         )
     )
+
+
+def test_returns_same_messages_from_columns_as_from_items():
+    items = [
+        build_spine_item(
+            time="2019-12-31T23:37:55.334+0000",
+            message_ref="convo_xyz",
+            jdi_event="23",
+            from_system="SupplierA",
+            to_system="SupplierB",
+        ),
+        build_spine_item(time="2019-07-01 10:10:00.334 BST"),
+    ]
+    columns = {
+        "_time": [item["_time"] for item in items],
+        "conversationID": [item["conversationID"] for item in items],
+        "GUID": [item["GUID"] for item in items],
+        "interactionID": [item["interactionID"] for item in items],
+        "messageSender": [item["messageSender"] for item in items],
+        "messageRecipient": [item["messageRecipient"] for item in items],
+        "messageRef": [item["messageRef"] for item in items],
+        "jdiEvent": [item["jdiEvent"] for item in items],
+        "fromSystem": [item.get("fromSystem") for item in items],
+        "toSystem": [item.get("toSystem") for item in items],
+    }
+
+    expected = list(construct_messages_from_splunk_items(items))
+
+    actual = construct_messages_from_splunk_columns(columns)
+
+    assert list(actual) == expected
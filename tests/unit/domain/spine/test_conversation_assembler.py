@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+
+from prmdata.domain.spine.conversation_assembler import WatermarkConversationAssembler
+from prmdata.domain.spine.message import EHR_REQUEST_STARTED
+from tests.builders.spine import build_message
+
+
+def _a_time(day, hour=0):
+    return datetime(2021, 3, day, hour)
+
+
+def test_releases_conversation_once_watermark_passes_start_plus_cutoff():
+    first = build_message(conversation_id="a", time=_a_time(1))
+    second = build_message(conversation_id="a", time=_a_time(2))
+    other = build_message(conversation_id="b", time=_a_time(3))
+    passing = build_message(conversation_id="c", time=_a_time(4, 1))
+
+    assembler = WatermarkConversationAssembler(
+        cutoff=timedelta(days=2), allowed_lateness=timedelta(days=1)
+    )
+    batches = list(assembler.assemble([first, second, other, passing]))
+
+    assert batches == [{"a": [first, second]}, {"b": [other], "c": [passing]}]
+
+
+def test_holds_every_conversation_until_the_end_without_a_cutoff():
+    messages = [build_message(conversation_id=str(day), time=_a_time(day)) for day in range(1, 9)]
+
+    assembler = WatermarkConversationAssembler(
+        cutoff=timedelta(0), allowed_lateness=timedelta(days=1)
+    )
+    batches = list(assembler.assemble(messages))
+
+    assert batches == [{str(day): [messages[day - 1]] for day in range(1, 9)}]
+
+
+def test_uses_earliest_message_as_conversation_start_when_messages_arrive_out_of_order():
+    later = build_message(conversation_id="a", time=_a_time(2))
+    earlier = build_message(conversation_id="a", time=_a_time(1))
+    passing = build_message(conversation_id="b", time=_a_time(4, 1))
+
+    assembler = WatermarkConversationAssembler(
+        cutoff=timedelta(days=2), allowed_lateness=timedelta(0)
+    )
+    batches = list(assembler.assemble([later, earlier, passing]))
+
+    assert batches[0] == {"a": [later, earlier]}
+
+
+def test_counts_messages_within_cutoff_that_arrive_after_conversation_is_released():
+    start = build_message(conversation_id="a", time=_a_time(1))
+    passing = build_message(conversation_id="b", time=_a_time(5))
+    late = build_message(conversation_id="a", time=_a_time(2))
+    after_cutoff = build_message(conversation_id="a", time=_a_time(5))
+
+    assembler = WatermarkConversationAssembler(
+        cutoff=timedelta(days=2), allowed_lateness=timedelta(days=1)
+    )
+    batches = list(assembler.assemble([start, passing, late, after_cutoff]))
+
+    assert batches == [{"a": [start]}, {"b": [passing]}]
+    assert assembler.late_message_count == 1
+
+
+def test_forgets_released_conversations_once_watermark_passes_deadline_by_allowed_lateness():
+    messages = [build_message(conversation_id=str(day), time=_a_time(day)) for day in range(1, 9)]
+
+    assembler = WatermarkConversationAssembler(
+        cutoff=timedelta(days=1), allowed_lateness=timedelta(hours=12)
+    )
+    remembered = [sorted(assembler._finalised_deadlines) for _ in assembler.assemble(messages)]
+
+    assert remembered == [["1"], ["2"], ["3"], ["4"], ["5"], ["6"], []]
+
+
+def test_drops_request_started_straggler_for_a_conversation_released_long_ago():
+    start = build_message(conversation_id="a", interaction_id=EHR_REQUEST_STARTED, time=_a_time(1))
+    passing = [build_message(conversation_id=str(day), time=_a_time(day)) for day in range(2, 9)]
+    straggler = build_message(
+        conversation_id="a", interaction_id=EHR_REQUEST_STARTED, time=_a_time(8)
+    )
+    late_straggler = build_message(conversation_id="a", time=_a_time(1, 1))
+
+    assembler = WatermarkConversationAssembler(
+        cutoff=timedelta(days=1), allowed_lateness=timedelta(hours=12)
+    )
+    batches = list(assembler.assemble([start, *passing, straggler, late_straggler]))
+
+    assembled_ids = [conversation_id for batch in batches for conversation_id in batch]
+    assert assembled_ids.count("a") == 1
+    assert batches[0] == {"a": [start]}
+    assert assembler.late_message_count == 1
@@ -1,8 +1,13 @@
+import pickle
+
+import pytest
+
 from prmdata.domain.spine.message import (
     APPLICATION_ACK,
     COMMON_POINT_TO_POINT,
     EHR_REQUEST_COMPLETED,
     EHR_REQUEST_STARTED,
+    InteractionType,
 )
 from tests.builders.spine import build_message
 
@@ -98,3 +103,52 @@ def test_is_copc_returns_false_when_interaction_is__not_copc():
     actual = message.is_copc()
 
     assert actual == expected
+
+
+def test_known_interaction_id_is_stored_as_interaction_type():
+    message = build_message(interaction_id=EHR_REQUEST_STARTED)
+
+    assert message.interaction_type == InteractionType.EHR_REQUEST_STARTED
+    assert message.interaction_id == EHR_REQUEST_STARTED
+
+
+def test_unknown_interaction_id_is_preserved():
+    message = build_message(interaction_id="urn:nhs:names:services:gp2gp/UNKNOWN")
+
+    assert message.interaction_type == InteractionType.UNKNOWN
+    assert message.interaction_id == "urn:nhs:names:services:gp2gp/UNKNOWN"
+
+
+def test_asids_and_systems_are_shared_between_messages():
+    first = build_message(
+        from_party_asid="".join(["1234", "5678"]), to_system="".join(["Sup", "A"])
+    )
+    second = build_message(
+        from_party_asid="".join(["1234", "5678"]), to_system="".join(["Sup", "A"])
+    )
+
+    assert first.from_party_asid is second.from_party_asid
+    assert first.to_system is second.to_system
+
+
+def test_messages_with_the_same_fields_are_equal():
+    message = build_message(interaction_id=APPLICATION_ACK, message_ref="a-ref", error_code=30)
+    copy = pickle.loads(pickle.dumps(message))
+
+    assert copy == message
+    assert copy != build_message(interaction_id=APPLICATION_ACK)
+
+
+def test_message_repr_lists_its_fields():
+    message = build_message(guid="a-guid", interaction_id=COMMON_POINT_TO_POINT)
+
+    assert repr(message).startswith("Message(time=")
+    assert f"interaction_id={COMMON_POINT_TO_POINT!r}" in repr(message)
+    assert "guid='a-guid'" in repr(message)
+
+
+def test_message_is_unhashable_as_its_fields_can_be_reassigned():
+    message = build_message(interaction_id=EHR_REQUEST_STARTED)
+
+    with pytest.raises(TypeError):
+        hash(message)
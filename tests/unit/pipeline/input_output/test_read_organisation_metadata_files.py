@@ -1,7 +1,12 @@
 from unittest.mock import Mock, call
 
+import pytest
+
 from prmdata.domain.ods_portal.organisation_lookup import OrganisationLookup
 from prmdata.pipeline.io import TransferClassifierIO
+from prmdata.pipeline.ods_lookup_cache import CompiledOdsLookupCache
+from prmdata.utils.input_output.disk_cache import S3ObjectDiskCache
+from prmdata.utils.input_output.s3 import JsonFileNotFoundException
 from tests.builders.common import a_string
 
 _DATE_ANCHOR_YEAR = 2021
@@ -101,3 +106,52 @@ def test_convert_two_organisation_metadata_files_to_organisation_lookup_mapping(
 
     expected_s3_manager_read_json_calls = [call(_S3_URI), call(_S3_URI_ADDITIONAL_MONTH)]
     s3_manager.read_json.assert_has_calls(expected_s3_manager_read_json_calls)
+
+
+def _an_io_with_ods_lookup_cache(s3_manager, tmp_path):
+    return TransferClassifierIO(
+        s3_data_manager=s3_manager,
+        ods_lookup_cache=CompiledOdsLookupCache(S3ObjectDiskCache(str(tmp_path), 1024 * 1024)),
+    )
+
+
+def test_reads_compiled_organisation_lookup_from_cache_on_second_read(tmp_path):
+    s3_manager = Mock()
+    s3_manager.read_json_e_tag.return_value = "an-e-tag"
+    s3_manager.read_json.return_value = _ORGANISATION_METADATA_DICT_FIRST_MONTH
+
+    _an_io_with_ods_lookup_cache(s3_manager, tmp_path).read_ods_metadata_files([_S3_URI])
+    actual_metadatas = _an_io_with_ods_lookup_cache(s3_manager, tmp_path).read_ods_metadata_files(
+        [_S3_URI]
+    )
+    actual_organisation_lookup = actual_metadatas.get_lookup(_DATE_ANCHOR_YEAR_MONTH)
+
+    assert actual_organisation_lookup.practice_ods_code_from_asid("123") == "ABC"
+    assert actual_organisation_lookup.sicbl_name_from_practice_ods_code("ABC") == "A SICBL"
+    s3_manager.read_json.assert_called_once_with(_S3_URI)
+
+
+def test_compiles_organisation_lookup_again_when_source_file_changes(tmp_path):
+    s3_manager = Mock()
+    s3_manager.read_json_e_tag.side_effect = ["an-e-tag", "another-e-tag"]
+    s3_manager.read_json.side_effect = [
+        _ORGANISATION_METADATA_DICT_FIRST_MONTH,
+        _ORGANISATION_METADATA_DICT_ADDITIONAL_MONTH,
+    ]
+
+    transfer_classifier_io = _an_io_with_ods_lookup_cache(s3_manager, tmp_path)
+    transfer_classifier_io.read_ods_metadata_files([_S3_URI])
+    actual_metadatas = transfer_classifier_io.read_ods_metadata_files([_S3_URI])
+
+    assert actual_metadatas.get_lookup(_DATE_ANCHOR_ADDITIONAL_YEAR_MONTH).month == 2
+    assert s3_manager.read_json.call_count == 2
+
+
+def test_raises_json_file_not_found_given_missing_metadata_with_ods_lookup_cache(tmp_path):
+    s3_manager = Mock()
+    s3_manager.read_json_e_tag.side_effect = JsonFileNotFoundException(_S3_URI)
+
+    transfer_classifier_io = _an_io_with_ods_lookup_cache(s3_manager, tmp_path)
+
+    with pytest.raises(JsonFileNotFoundException):
+        transfer_classifier_io.read_ods_metadata_files([_S3_URI])
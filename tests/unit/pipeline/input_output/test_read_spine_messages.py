@@ -1,14 +1,23 @@
 from datetime import datetime
+from unittest import mock
 
+import boto3
+import pytest
 from dateutil.tz import tzutc
+from moto import mock_s3
 
 from prmdata.domain.spine.message import Message
+from prmdata.pipeline import spine_message_cache
+from prmdata.pipeline.arrow import convert_spine_tables_to_messages
 from prmdata.pipeline.io import TransferClassifierIO
+from prmdata.pipeline.spine_message_cache import ParsedSpineMessageCache
+from prmdata.utils.input_output.disk_cache import S3ObjectDiskCache
 from prmdata.utils.input_output.s3 import S3DataManager
 from tests.builders.common import a_string
 from tests.builders.file import build_gzip_csv
 from tests.builders.s3 import MockS3, MockS3Object
 from tests.builders.spine import build_spine_item
+from tests.unit.utils.io.s3 import MOTO_MOCK_REGION
 
 _SPINE_CSV_COLUMNS = [
     "_time",
@@ -31,7 +40,8 @@ def _spine_csv_gz(rows):
     )
 
 
-def test_read_spine_messages_reads_single_message_correctly():
+@pytest.mark.parametrize("arrow_spine_ingestion", [False, True])
+def test_read_spine_messages_reads_single_message_correctly(arrow_spine_ingestion):
     csv_row = build_spine_item(
         time="2019-12-31T23:37:55.334+0000",
         conversation_id="abc",
@@ -54,7 +64,9 @@ def test_read_spine_messages_reads_single_message_correctly():
         ]
     )
 
-    io = TransferClassifierIO(s3_data_manager=S3DataManager(mock_s3_conn))
+    io = TransferClassifierIO(
+        s3_data_manager=S3DataManager(mock_s3_conn), arrow_spine_ingestion=arrow_spine_ingestion
+    )
 
     expected_spine_message = Message(
         time=datetime(2019, 12, 31, 23, 37, 55, 334000, tzutc()),
@@ -74,7 +86,9 @@ def test_read_spine_messages_reads_single_message_correctly():
     assert list(actual) == [expected_spine_message]
 
 
-def test_read_spine_messages_reads_multiple_messages():
+@pytest.mark.parametrize("arrow_spine_ingestion", [False, True])
+@pytest.mark.parametrize("spine_prefetch_workers", [0, 2])
+def test_read_spine_messages_reads_multiple_messages(arrow_spine_ingestion, spine_prefetch_workers):
     csv_rows = [build_spine_item(guid=f"guid{i}") for i in range(10)]
 
     mock_s3_conn = MockS3(
@@ -92,7 +106,12 @@ def test_read_spine_messages_reads_multiple_messages():
         ]
     )
 
-    io = TransferClassifierIO(s3_data_manager=S3DataManager(mock_s3_conn))
+    io = TransferClassifierIO(
+        s3_data_manager=S3DataManager(mock_s3_conn),
+        arrow_spine_ingestion=arrow_spine_ingestion,
+        spine_prefetch_workers=spine_prefetch_workers,
+        spine_prefetch_depth=1,
+    )
 
     expected_guids = [f"guid{i}" for i in range(10)]
 
@@ -103,3 +122,102 @@ def test_read_spine_messages_reads_multiple_messages():
     actual_guids = [message.guid for message in actual_messages]
 
     assert actual_guids == expected_guids
+
+
+def _a_spine_bucket_with_one_file(csv_rows):
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    bucket.Object("data/1.csv.gz").put(Body=_spine_csv_gz(csv_rows))
+    return conn, bucket
+
+
+@mock_s3
+@pytest.mark.parametrize("arrow_spine_ingestion", [False, True])
+def test_read_spine_messages_reads_parsed_messages_from_cache_on_second_read(
+    tmp_path, arrow_spine_ingestion
+):
+    csv_rows = [build_spine_item(guid=f"guid{i}", jdi_event=str(i)) for i in range(3)]
+    conn, _ = _a_spine_bucket_with_one_file(csv_rows)
+    io = TransferClassifierIO(
+        s3_data_manager=S3DataManager(conn),
+        arrow_spine_ingestion=arrow_spine_ingestion,
+        parsed_spine_cache=ParsedSpineMessageCache(S3ObjectDiskCache(str(tmp_path), 1024 * 1024)),
+    )
+    s3_uris = ["s3://test_bucket/data/1.csv.gz"]
+
+    expected_messages = list(io.read_spine_messages(s3_uris))
+
+    with mock.patch.object(S3DataManager, "read_gzip_csv") as read_gzip_csv, mock.patch.object(
+        S3DataManager, "read_gzip_csv_table"
+    ) as read_gzip_csv_table:
+        actual_messages = list(io.read_spine_messages(s3_uris))
+
+    assert actual_messages == expected_messages
+    read_gzip_csv.assert_not_called()
+    read_gzip_csv_table.assert_not_called()
+
+
+@mock_s3
+def test_read_spine_messages_parses_again_when_source_file_changes(tmp_path):
+    conn, bucket = _a_spine_bucket_with_one_file([build_spine_item(guid="old")])
+    io = TransferClassifierIO(
+        s3_data_manager=S3DataManager(conn),
+        parsed_spine_cache=ParsedSpineMessageCache(S3ObjectDiskCache(str(tmp_path), 1024 * 1024)),
+    )
+    s3_uris = ["s3://test_bucket/data/1.csv.gz"]
+    list(io.read_spine_messages(s3_uris))
+
+    bucket.Object("data/1.csv.gz").put(Body=_spine_csv_gz([build_spine_item(guid="new")]))
+
+    assert [message.guid for message in io.read_spine_messages(s3_uris)] == ["new"]
+
+
+@mock_s3
+def test_read_spine_messages_parses_again_when_parser_version_changes(tmp_path):
+    conn, _ = _a_spine_bucket_with_one_file([build_spine_item(guid="a_guid")])
+    s3_manager = S3DataManager(conn)
+    io = TransferClassifierIO(
+        s3_data_manager=s3_manager,
+        parsed_spine_cache=ParsedSpineMessageCache(S3ObjectDiskCache(str(tmp_path), 1024 * 1024)),
+    )
+    s3_uris = ["s3://test_bucket/data/1.csv.gz"]
+    list(io.read_spine_messages(s3_uris))
+
+    with mock.patch.object(spine_message_cache, "PARSER_VERSION", "a-new-version"):
+        with mock.patch.object(
+            S3DataManager, "read_gzip_csv", wraps=s3_manager.read_gzip_csv
+        ) as read_gzip_csv:
+            list(io.read_spine_messages(s3_uris))
+
+    read_gzip_csv.assert_called_once()
+
+
+@mock_s3
+def test_read_spine_tables_leaves_csv_files_unparsed():
+    csv_rows = [build_spine_item(guid=f"guid{i}", jdi_event=str(i)) for i in range(3)]
+    conn, _ = _a_spine_bucket_with_one_file(csv_rows)
+    io = TransferClassifierIO(s3_data_manager=S3DataManager(conn))
+
+    [spine_table] = io.read_spine_tables(["s3://test_bucket/data/1.csv.gz"])
+
+    assert not spine_table.is_parsed
+    assert spine_table.table["GUID"].to_pylist() == ["guid0", "guid1", "guid2"]
+
+
+@mock_s3
+def test_read_spine_tables_reads_parsed_table_from_cache(tmp_path):
+    csv_rows = [build_spine_item(guid=f"guid{i}", jdi_event=str(i)) for i in range(3)]
+    conn, _ = _a_spine_bucket_with_one_file(csv_rows)
+    io = TransferClassifierIO(
+        s3_data_manager=S3DataManager(conn),
+        parsed_spine_cache=ParsedSpineMessageCache(S3ObjectDiskCache(str(tmp_path), 1024 * 1024)),
+    )
+    s3_uris = ["s3://test_bucket/data/1.csv.gz"]
+    expected_messages = list(io.read_spine_messages(s3_uris))
+
+    with mock.patch.object(S3DataManager, "read_gzip_csv_table") as read_gzip_csv_table:
+        spine_tables = list(io.read_spine_tables(s3_uris))
+
+    assert [spine_table.is_parsed for spine_table in spine_tables] == [True]
+    assert list(convert_spine_tables_to_messages(spine_tables)) == expected_messages
+    read_gzip_csv_table.assert_not_called()
@@ -1,21 +1,24 @@
 from datetime import datetime, timedelta
 
+import pytest
+
 from prmdata.domain.gp2gp.transfer import Practice, Transfer
 from prmdata.domain.gp2gp.transfer_outcome import (
     TransferFailureReason,
     TransferOutcome,
     TransferStatus,
 )
+from prmdata.pipeline.arrow import convert_transfers_to_table
 from prmdata.pipeline.io import TransferClassifierIO
 from prmdata.utils.input_output.s3 import S3DataManager
 from tests.builders.common import a_string
-from tests.builders.gp2gp import build_transfer
+from tests.builders.gp2gp import build_practice, build_transfer
 from tests.builders.s3 import MockS3
 
 _SOME_METADATA: dict[str, str] = {}
 
 
-def test_write_transfers_correctly_writes_all_fields():
+def test_write_transfer_table_correctly_writes_all_fields():
     mock_s3 = MockS3()
     s3_data_manager = S3DataManager(mock_s3)
     io = TransferClassifierIO(s3_data_manager)
@@ -50,8 +53,10 @@ def test_write_transfers_correctly_writes_all_fields():
         last_sender_message_timestamp=None,
     )
 
-    io.write_transfers(
-        transfers=[transfer], s3_uri="s3://a_bucket/some_data.parquet", metadata=_SOME_METADATA
+    io.write_transfer_table(
+        convert_transfers_to_table([transfer]),
+        s3_uri="s3://a_bucket/some_data.parquet",
+        metadata=_SOME_METADATA,
     )
 
     expected_table = {
@@ -84,7 +89,7 @@ def test_write_transfers_correctly_writes_all_fields():
     assert actual_table == expected_table
 
 
-def test_write_transfers_correctly_writes_multiple_rows():
+def test_write_transfer_table_correctly_writes_multiple_rows():
     mock_s3 = MockS3()
     s3_data_manager = S3DataManager(mock_s3)
     io = TransferClassifierIO(s3_data_manager)
@@ -95,8 +100,10 @@ def test_write_transfers_correctly_writes_multiple_rows():
         build_transfer(conversation_id="c"),
     ]
 
-    io.write_transfers(
-        transfers=transfers, s3_uri="s3://a_bucket/multi_row.parquet", metadata=_SOME_METADATA
+    io.write_transfer_table(
+        convert_transfers_to_table(transfers),
+        s3_uri="s3://a_bucket/multi_row.parquet",
+        metadata=_SOME_METADATA,
     )
 
     expected_conversation_ids = ["a", "b", "c"]
@@ -111,7 +118,31 @@ def test_write_transfers_correctly_writes_multiple_rows():
     assert actual_conversation_ids == expected_conversation_ids
 
 
-def test_write_transfers_writes_metadata():
+def test_write_transfer_table_sorts_rows_by_conversation_id_when_normalising_order():
+    mock_s3 = MockS3()
+    s3_data_manager = S3DataManager(mock_s3)
+    io = TransferClassifierIO(s3_data_manager, normalise_transfer_order=True)
+
+    transfers = [
+        build_transfer(conversation_id="b"),
+        build_transfer(conversation_id="c"),
+        build_transfer(conversation_id="a"),
+    ]
+
+    io.write_transfer_table(
+        convert_transfers_to_table(transfers),
+        s3_uri="s3://a_bucket/sorted.parquet",
+        metadata=_SOME_METADATA,
+    )
+
+    actual_conversation_ids = (
+        mock_s3.object("a_bucket", "sorted.parquet").read_parquet()["conversation_id"].to_pylist()
+    )
+
+    assert actual_conversation_ids == ["a", "b", "c"]
+
+
+def test_write_transfer_table_writes_metadata():
     mock_s3 = MockS3()
     s3_data_manager = S3DataManager(mock_s3)
 
@@ -119,10 +150,70 @@ def test_write_transfers_writes_metadata():
 
     io = TransferClassifierIO(s3_data_manager)
 
-    io.write_transfers(
-        transfers=[build_transfer()], s3_uri="s3://a_bucket/some_data.parquet", metadata=metadata
+    io.write_transfer_table(
+        convert_transfers_to_table([build_transfer()]),
+        s3_uri="s3://a_bucket/some_data.parquet",
+        metadata=metadata,
     )
 
     actual_meta_data = mock_s3.object("a_bucket", "some_data.parquet").get_metadata()
 
     assert actual_meta_data == metadata
+
+
+def test_write_transfer_table_sorts_rows_by_the_sort_keys_then_conversation_id():
+    mock_s3 = MockS3()
+    s3_data_manager = S3DataManager(mock_s3)
+    io = TransferClassifierIO(
+        s3_data_manager,
+        transfer_sort_keys=["requesting_practice_sicbl_ods_code", "date_requested"],
+    )
+
+    transfers = [
+        build_transfer(
+            conversation_id="d",
+            requesting_practice=build_practice(sicbl_ods_code="20D"),
+            date_requested=datetime(2021, 12, 1),
+        ),
+        build_transfer(
+            conversation_id="c",
+            requesting_practice=build_practice(sicbl_ods_code="10D"),
+            date_requested=datetime(2021, 12, 2),
+        ),
+        build_transfer(
+            conversation_id="b",
+            requesting_practice=build_practice(sicbl_ods_code="10D"),
+            date_requested=datetime(2021, 12, 2),
+        ),
+        build_transfer(
+            conversation_id="a",
+            requesting_practice=build_practice(sicbl_ods_code="10D"),
+            date_requested=datetime(2021, 12, 3),
+        ),
+    ]
+
+    io.write_transfer_table(
+        convert_transfers_to_table(transfers),
+        s3_uri="s3://a_bucket/sorted.parquet",
+        metadata=_SOME_METADATA,
+    )
+
+    actual_conversation_ids = (
+        mock_s3.object("a_bucket", "sorted.parquet").read_parquet()["conversation_id"].to_pylist()
+    )
+
+    assert actual_conversation_ids == ["b", "c", "a", "d"]
+
+
+def test_rejects_sort_keys_that_are_not_transfer_columns():
+    with pytest.raises(ValueError, match="Unknown transfer sort keys: not_a_column"):
+        TransferClassifierIO(
+            S3DataManager(MockS3()), transfer_sort_keys=["date_requested", "not_a_column"]
+        )
+
+
+def test_rejects_sort_keys_that_are_list_columns():
+    with pytest.raises(ValueError, match="Cannot sort transfers by: sender_error_codes"):
+        TransferClassifierIO(
+            S3DataManager(MockS3()), transfer_sort_keys=["sender_error_codes", "date_requested"]
+        )
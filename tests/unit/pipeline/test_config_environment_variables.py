@@ -3,7 +3,12 @@ from datetime import datetime, timedelta
 import pytest
 from dateutil.tz import tzutc
 
-from prmdata.pipeline.config import MissingEnvironmentVariable, TransferClassifierConfig
+from prmdata.pipeline.config import (
+    DEFAULT_PARQUET_DICTIONARY_COLUMNS,
+    IncompatibleConfiguration,
+    MissingEnvironmentVariable,
+    TransferClassifierConfig,
+)
 
 
 def test_reads_from_environment_variables_and_converts_to_required_format():
@@ -18,6 +23,34 @@ def test_reads_from_environment_variables_and_converts_to_required_format():
         "S3_ENDPOINT_URL": "a_url",
         "BUILD_TAG": "12345",
         "CLASSIFY_MI_EVENTS": "True",
+        "ARROW_SPINE_INGESTION": "False",
+        "SPINE_PREFETCH_WORKERS": "4",
+        "SPINE_PREFETCH_DEPTH": "3",
+        "S3_CACHE_DIRECTORY": "/tmp/s3-cache",
+        "S3_CACHE_MAX_SIZE_MB": "512",
+        "PARSED_SPINE_CACHE_DIRECTORY": "/tmp/parsed-spine-cache",
+        "PARSED_SPINE_CACHE_MAX_SIZE_MB": "256",
+        "FILTER_IRRELEVANT_SPINE_MESSAGES": "True",
+        "CONVERSATION_SPILL_MEMORY_BUDGET_MB": "64",
+        "CONVERSATION_SPILL_DIRECTORY": "/tmp/spill",
+        "STREAMING_CONVERSATION_ASSEMBLY": "True",
+        "STREAMING_ALLOWED_LATENESS_DAYS": "2",
+        "VECTORISED_CLASSIFICATION": "False",
+        "INCLUDE_OUTCOME_PREDICATES": "True",
+        "CLASSIFICATION_WORKERS": "0",
+        "NORMALISE_TRANSFER_ORDER": "True",
+        "AGGREGATE_OBSERVABILITY_EVENTS": "True",
+        "OBSERVABILITY_EVENT_SAMPLE_SIZE": "10",
+        "ODS_LOOKUP_CACHE_DIRECTORY": "/tmp/ods-lookup-cache",
+        "ODS_LOOKUP_CACHE_MAX_SIZE_MB": "512",
+        "PARQUET_DICTIONARY_COLUMNS": "status, failure_reason",
+        "PARQUET_COMPRESSION": "snappy",
+        "PARQUET_COMPRESSION_LEVEL": "9",
+        "PARQUET_ROW_GROUP_SIZE": "1000",
+        "PARQUET_WRITE_STATISTICS": "False",
+        "TRANSFER_SORT_KEYS": "requesting_practice_sicbl_ods_code, requesting_practice_ods_code, date_requested",
+        "OUTPUT_UPLOAD_WORKERS": "2",
+        "SKIP_UNCHANGED_OUTPUTS": "True",
     }
 
     expected_config = TransferClassifierConfig(
@@ -35,6 +68,38 @@ def test_reads_from_environment_variables_and_converts_to_required_format():
         s3_endpoint_url="a_url",
         build_tag="12345",
         classify_mi_events=True,
+        arrow_spine_ingestion=False,
+        spine_prefetch_workers=4,
+        spine_prefetch_depth=3,
+        s3_cache_directory="/tmp/s3-cache",
+        s3_cache_max_size_mb=512,
+        parsed_spine_cache_directory="/tmp/parsed-spine-cache",
+        parsed_spine_cache_max_size_mb=256,
+        filter_irrelevant_spine_messages=True,
+        conversation_spill_memory_budget_mb=64,
+        conversation_spill_directory="/tmp/spill",
+        streaming_conversation_assembly=True,
+        streaming_allowed_lateness=timedelta(days=2),
+        vectorised_classification=False,
+        include_outcome_predicates=True,
+        classification_workers=0,
+        normalise_transfer_order=True,
+        aggregate_observability_events=True,
+        observability_event_sample_size=10,
+        ods_lookup_cache_directory="/tmp/ods-lookup-cache",
+        ods_lookup_cache_max_size_mb=512,
+        parquet_dictionary_columns=["status", "failure_reason"],
+        parquet_compression="snappy",
+        parquet_compression_level=9,
+        parquet_row_group_size=1000,
+        parquet_write_statistics=False,
+        transfer_sort_keys=[
+            "requesting_practice_sicbl_ods_code",
+            "requesting_practice_ods_code",
+            "date_requested",
+        ],
+        output_upload_workers=2,
+        skip_unchanged_outputs=True,
     )
 
     actual_config = TransferClassifierConfig.from_environment_variables(environment)
@@ -61,6 +126,34 @@ def test_read_config_from_environment_when_optional_parameters_are_not_set():
         conversation_cutoff=timedelta(days=0),
         build_tag="12345",
         classify_mi_events=False,
+        arrow_spine_ingestion=True,
+        spine_prefetch_workers=2,
+        spine_prefetch_depth=2,
+        s3_cache_directory=None,
+        s3_cache_max_size_mb=10240,
+        parsed_spine_cache_directory=None,
+        parsed_spine_cache_max_size_mb=10240,
+        filter_irrelevant_spine_messages=False,
+        conversation_spill_memory_budget_mb=0,
+        conversation_spill_directory=None,
+        streaming_conversation_assembly=False,
+        streaming_allowed_lateness=timedelta(days=1),
+        vectorised_classification=False,
+        include_outcome_predicates=False,
+        classification_workers=0,
+        normalise_transfer_order=False,
+        aggregate_observability_events=False,
+        observability_event_sample_size=5,
+        ods_lookup_cache_directory=None,
+        ods_lookup_cache_max_size_mb=1024,
+        parquet_dictionary_columns=DEFAULT_PARQUET_DICTIONARY_COLUMNS,
+        parquet_compression="zstd",
+        parquet_compression_level=None,
+        parquet_row_group_size=65_536,
+        parquet_write_statistics=True,
+        transfer_sort_keys=[],
+        output_upload_workers=0,
+        skip_unchanged_outputs=False,
     )
 
     actual_config = TransferClassifierConfig.from_environment_variables(environment)
@@ -102,8 +195,111 @@ def test_returns_valid_config_given_environment_variable_cutoff_is_0():
         conversation_cutoff=timedelta(days=0),
         build_tag="12345",
         classify_mi_events=False,
+        arrow_spine_ingestion=True,
+        spine_prefetch_workers=2,
+        spine_prefetch_depth=2,
+        s3_cache_directory=None,
+        s3_cache_max_size_mb=10240,
+        parsed_spine_cache_directory=None,
+        parsed_spine_cache_max_size_mb=10240,
+        filter_irrelevant_spine_messages=False,
+        conversation_spill_memory_budget_mb=0,
+        conversation_spill_directory=None,
+        streaming_conversation_assembly=False,
+        streaming_allowed_lateness=timedelta(days=1),
+        vectorised_classification=False,
+        include_outcome_predicates=False,
+        classification_workers=0,
+        normalise_transfer_order=False,
+        aggregate_observability_events=False,
+        observability_event_sample_size=5,
+        ods_lookup_cache_directory=None,
+        ods_lookup_cache_max_size_mb=1024,
+        parquet_dictionary_columns=DEFAULT_PARQUET_DICTIONARY_COLUMNS,
+        parquet_compression="zstd",
+        parquet_compression_level=None,
+        parquet_row_group_size=65_536,
+        parquet_write_statistics=True,
+        transfer_sort_keys=[],
+        output_upload_workers=0,
+        skip_unchanged_outputs=False,
     )
 
     actual_config = TransferClassifierConfig.from_environment_variables(environment)
 
     assert actual_config == expected_config
+
+
+_REQUIRED_ENVIRONMENT = {
+    "OUTPUT_TRANSFER_DATA_BUCKET": "output-transfer-data-bucket",
+    "INPUT_SPINE_DATA_BUCKET": "input-spine-data-bucket",
+    "INPUT_ODS_METADATA_BUCKET": "input-ods-metadata-bucket",
+    "BUILD_TAG": "12345",
+}
+
+
+@pytest.mark.parametrize(
+    "vectorised_classification, classification_workers", [(True, 0), (False, 16)]
+)
+def test_reads_classification_engine_from_environment_variables(
+    vectorised_classification, classification_workers
+):
+    environment = {
+        **_REQUIRED_ENVIRONMENT,
+        "VECTORISED_CLASSIFICATION": str(vectorised_classification),
+        "CLASSIFICATION_WORKERS": str(classification_workers),
+        "FILTER_IRRELEVANT_SPINE_MESSAGES": "False",
+    }
+
+    actual_config = TransferClassifierConfig.from_environment_variables(environment)
+
+    assert actual_config.vectorised_classification is vectorised_classification
+    assert actual_config.classification_workers == classification_workers
+
+
+def test_error_when_vectorised_classification_is_set_with_settings_it_ignores():
+    environment = {
+        **_REQUIRED_ENVIRONMENT,
+        "VECTORISED_CLASSIFICATION": "True",
+        "FILTER_IRRELEVANT_SPINE_MESSAGES": "True",
+        "STREAMING_CONVERSATION_ASSEMBLY": "True",
+    }
+
+    with pytest.raises(IncompatibleConfiguration) as e:
+        TransferClassifierConfig.from_environment_variables(environment)
+
+    assert str(e.value) == (
+        "FILTER_IRRELEVANT_SPINE_MESSAGES, STREAMING_CONVERSATION_ASSEMBLY cannot be used with "
+        "VECTORISED_CLASSIFICATION, exiting..."
+    )
+
+
+def test_error_when_classification_workers_are_set_with_settings_they_ignore():
+    environment = {
+        **_REQUIRED_ENVIRONMENT,
+        "CLASSIFICATION_WORKERS": "4",
+        "FILTER_IRRELEVANT_SPINE_MESSAGES": "True",
+        "CONVERSATION_SPILL_MEMORY_BUDGET_MB": "64",
+    }
+
+    with pytest.raises(IncompatibleConfiguration) as e:
+        TransferClassifierConfig.from_environment_variables(environment)
+
+    assert str(e.value) == (
+        "CONVERSATION_SPILL_MEMORY_BUDGET_MB cannot be used with CLASSIFICATION_WORKERS, exiting..."
+    )
+
+
+def test_error_when_vectorised_classification_is_set_with_classification_workers():
+    environment = {
+        **_REQUIRED_ENVIRONMENT,
+        "VECTORISED_CLASSIFICATION": "True",
+        "CLASSIFICATION_WORKERS": "4",
+    }
+
+    with pytest.raises(IncompatibleConfiguration) as e:
+        TransferClassifierConfig.from_environment_variables(environment)
+
+    assert str(e.value) == (
+        "CLASSIFICATION_WORKERS cannot be used with VECTORISED_CLASSIFICATION, exiting..."
+    )
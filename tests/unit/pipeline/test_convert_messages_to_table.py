@@ -0,0 +1,42 @@
+from datetime import datetime
+
+from dateutil.tz import tzoffset, tzutc
+
+from prmdata.pipeline.arrow import (
+    MESSAGE_TABLE_SCHEMA,
+    convert_messages_to_table,
+    convert_table_to_messages,
+)
+from tests.builders.spine import build_message
+
+
+def test_messages_are_converted_to_table_with_message_schema():
+    messages = [build_message(), build_message(error_code=10, message_ref="abc")]
+
+    table = convert_messages_to_table(messages)
+
+    assert table.schema == MESSAGE_TABLE_SCHEMA
+    assert table.num_rows == 2
+
+
+def test_messages_survive_round_trip_through_table():
+    messages = [
+        build_message(time=datetime(2021, 6, 1, 10, 0, 0, 123000, tzinfo=tzutc())),
+        build_message(
+            time=datetime(2021, 6, 1, 11, 0, tzinfo=tzoffset("BST", 3600)),
+            message_ref="a-guid",
+            error_code=30,
+            from_system=None,
+            to_system=None,
+        ),
+        build_message(time=datetime(2021, 6, 1, 12, 0, tzinfo=tzoffset(None, -18000))),
+        build_message(time=datetime(2021, 6, 1, 13, 0)),
+    ]
+
+    actual = list(convert_table_to_messages(convert_messages_to_table(messages)))
+
+    assert actual == messages
+    assert [message.time.tzname() for message in actual] == ["UTC", "BST", None, None]
+    assert [message.time.utcoffset() for message in actual] == [
+        message.time.utcoffset() for message in messages
+    ]
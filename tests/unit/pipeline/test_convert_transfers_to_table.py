@@ -3,7 +3,7 @@ from datetime import datetime, timedelta
 import pyarrow as pa
 
 from prmdata.domain.gp2gp.transfer_outcome import TransferOutcome, TransferStatus
-from prmdata.pipeline.arrow import convert_transfers_to_table
+from prmdata.pipeline.arrow import TransferTableBuilder, convert_transfers_to_table
 from tests.builders.gp2gp import build_practice, build_transfer
 
 
@@ -321,3 +321,47 @@ def test_table_has_correct_schema():
     actual_schema = table.schema
 
     assert actual_schema == expected_schema
+
+
+def test_outcome_predicates_column_is_omitted_by_default():
+    table = convert_transfers_to_table([build_transfer()])
+
+    assert "outcome_predicates" not in table.column_names
+
+
+def test_outcome_predicates_are_converted_to_column():
+    transfer_outcome = TransferOutcome(
+        status=TransferStatus.INTEGRATED_ON_TIME, failure_reason=None, predicates=2049
+    )
+    transfer = build_transfer(outcome=transfer_outcome)
+
+    table = convert_transfers_to_table([transfer], include_outcome_predicates=True)
+
+    assert table.select(["outcome_predicates"]).to_pydict() == {"outcome_predicates": [2049]}
+    assert table.schema.field("outcome_predicates").type == pa.uint16()
+
+
+def test_table_builder_matches_converting_all_transfers_at_once():
+    transfers = [build_transfer(conversation_id="123"), build_transfer(conversation_id="456")]
+
+    builder = TransferTableBuilder(include_outcome_predicates=True)
+    for transfer in transfers:
+        builder.add(transfer)
+
+    assert builder.build() == convert_transfers_to_table(transfers, include_outcome_predicates=True)
+
+
+def test_table_builder_builds_an_empty_table_with_the_transfer_schema():
+    assert TransferTableBuilder().build() == convert_transfers_to_table([])
+
+
+def test_table_builder_converts_transfers_into_batches_of_the_given_size():
+    transfers = [build_transfer(conversation_id=str(index)) for index in range(5)]
+
+    builder = TransferTableBuilder(batch_size=2)
+    for transfer in transfers:
+        builder.add(transfer)
+    table = builder.build()
+
+    assert [batch.num_rows for batch in table.to_batches()] == [2, 2, 1]
+    assert table == convert_transfers_to_table(transfers)
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+import pytest
+from dateutil.tz import UTC
+
+from prmdata.domain.gp2gp.transfer_service import TransferService
+from prmdata.domain.ods_portal.organisation_lookup import OrganisationLookup
+from prmdata.domain.spine.gp2gp_conversation import Gp2gpConversation
+from prmdata.pipeline.daily_transfers import (
+    ConversationForCompletedDayError,
+    build_daily_transfer_tables,
+)
+from tests.builders import test_cases
+
+A_FIRST_DAY = datetime(2020, 6, 1, tzinfo=UTC)
+
+mock_gp2gp_conversation_observability_probe = Mock()
+
+
+def _a_conversation(conversation_id: str, days_after_first: int) -> Gp2gpConversation:
+    return Gp2gpConversation(
+        messages=test_cases.request_made(
+            conversation_id=conversation_id,
+            request_sent_date=A_FIRST_DAY + timedelta(days=days_after_first, hours=12),
+        ),
+        probe=mock_gp2gp_conversation_observability_probe,
+    )
+
+
+def _organisation_lookups(days: int):
+    organisation_lookup = OrganisationLookup(practices=[], sicbls=[], year_month=(2020, 6))
+    return {A_FIRST_DAY + timedelta(days=day): organisation_lookup for day in range(days)}
+
+
+def _build_daily_transfer_tables(conversations, days: int):
+    transfer_service = TransferService(cutoff=timedelta(days=14), observability_probe=Mock())
+    return build_daily_transfer_tables(
+        transfer_service, iter(conversations), _organisation_lookups(days)
+    )
+
+
+def _conversation_ids_by_day(daily_transfer_tables):
+    return [
+        (daily_start_datetime, transfers.column("conversation_id").to_pylist())
+        for daily_start_datetime, transfers in daily_transfer_tables
+    ]
+
+
+def test_builds_a_table_for_every_day_including_days_without_conversations():
+    conversations = [_a_conversation("a", 0), _a_conversation("b", 1), _a_conversation("c", 0)]
+
+    actual = _conversation_ids_by_day(_build_daily_transfer_tables(conversations, days=3))
+
+    assert actual == [
+        (A_FIRST_DAY, ["a", "c"]),
+        (A_FIRST_DAY + timedelta(days=1), ["b"]),
+        (A_FIRST_DAY + timedelta(days=2), []),
+    ]
+
+
+def test_yields_a_day_once_a_conversation_from_two_days_later_arrives():
+    conversations = iter(
+        [
+            _a_conversation("a", 0),
+            _a_conversation("b", 1),
+            _a_conversation("c", 0),
+            _a_conversation("d", 2),
+            _a_conversation("e", 3),
+        ]
+    )
+    transfer_service = TransferService(cutoff=timedelta(days=14), observability_probe=Mock())
+
+    daily_transfer_tables = build_daily_transfer_tables(
+        transfer_service, conversations, _organisation_lookups(days=4)
+    )
+
+    first_day, first_day_transfers = next(daily_transfer_tables)
+    assert first_day == A_FIRST_DAY
+    assert first_day_transfers.column("conversation_id").to_pylist() == ["a", "c"]
+    assert next(conversations).conversation_id() == "e"
+    assert _conversation_ids_by_day(daily_transfer_tables) == [
+        (A_FIRST_DAY + timedelta(days=1), ["b"]),
+        (A_FIRST_DAY + timedelta(days=2), ["d"]),
+        (A_FIRST_DAY + timedelta(days=3), []),
+    ]
+
+
+def test_raises_given_a_conversation_for_a_day_already_yielded():
+    conversations = [_a_conversation("a", 2), _a_conversation("b", 0)]
+
+    with pytest.raises(ConversationForCompletedDayError):
+        list(_build_daily_transfer_tables(conversations, days=3))
@@ -0,0 +1,73 @@
+from typing import Any, Dict
+
+from prmdata.pipeline.input_fingerprint import fingerprint_inputs, output_settings
+from tests.builders.config import build_config
+
+_INPUT_E_TAGS = {
+    "s3://spine/2019/12/01/spine_messages.csv.gz": '"a1"',
+    "s3://ods/2019/12/organisationMetadata.json": '"b2"',
+}
+_SETTINGS: Dict[str, Any] = {"cutoff-days": 14, "build-tag": "abc456", "transfer-sort-keys": []}
+
+
+def _output_settings(**kwargs) -> Dict[str, Any]:
+    return output_settings(build_config(build_tag="abc456", **kwargs))
+
+
+def test_fingerprint_is_the_same_given_the_same_inputs_and_settings():
+    reordered_input_e_tags = dict(reversed(list(_INPUT_E_TAGS.items())))
+
+    assert fingerprint_inputs(_INPUT_E_TAGS, _SETTINGS) == fingerprint_inputs(
+        reordered_input_e_tags, dict(_SETTINGS)
+    )
+
+
+def test_fingerprint_changes_when_an_input_changes():
+    changed_input_e_tags = {**_INPUT_E_TAGS, "s3://ods/2019/12/organisationMetadata.json": '"c3"'}
+
+    assert fingerprint_inputs(_INPUT_E_TAGS, _SETTINGS) != fingerprint_inputs(
+        changed_input_e_tags, _SETTINGS
+    )
+
+
+def test_fingerprint_changes_when_an_input_is_added():
+    added_input_e_tags = {**_INPUT_E_TAGS, "s3://spine/2019/12/02/spine_messages.csv.gz": '"d4"'}
+
+    assert fingerprint_inputs(_INPUT_E_TAGS, _SETTINGS) != fingerprint_inputs(
+        added_input_e_tags, _SETTINGS
+    )
+
+
+def test_fingerprint_changes_when_a_setting_changes():
+    changed_settings = {**_SETTINGS, "build-tag": "def789"}
+
+    assert fingerprint_inputs(_INPUT_E_TAGS, _SETTINGS) != fingerprint_inputs(
+        _INPUT_E_TAGS, changed_settings
+    )
+
+
+def test_fingerprint_changes_when_irrelevant_spine_messages_are_filtered():
+    unfiltered_settings = _output_settings(filter_irrelevant_spine_messages=False)
+    filtered_settings = _output_settings(filter_irrelevant_spine_messages=True)
+
+    assert fingerprint_inputs(_INPUT_E_TAGS, unfiltered_settings) != fingerprint_inputs(
+        _INPUT_E_TAGS, filtered_settings
+    )
+
+
+def test_fingerprint_changes_when_conversations_are_assembled_while_streaming():
+    settings = _output_settings(streaming_conversation_assembly=False)
+    streaming_settings = _output_settings(streaming_conversation_assembly=True)
+
+    assert fingerprint_inputs(_INPUT_E_TAGS, settings) != fingerprint_inputs(
+        _INPUT_E_TAGS, streaming_settings
+    )
+
+
+def test_fingerprint_ignores_settings_that_do_not_change_the_output():
+    settings = _output_settings(spine_prefetch_workers=2, output_upload_workers=0)
+    other_settings = _output_settings(spine_prefetch_workers=8, output_upload_workers=4)
+
+    assert fingerprint_inputs(_INPUT_E_TAGS, settings) == fingerprint_inputs(
+        _INPUT_E_TAGS, other_settings
+    )
@@ -0,0 +1,62 @@
+from prmdata.domain.ods_portal.organisation_lookup import OrganisationLookup
+from prmdata.pipeline.ods_lookup_cache import CompiledOdsLookupCache
+from prmdata.utils.input_output.disk_cache import S3ObjectDiskCache
+from tests.builders.ods_portal import build_practice_metadata, build_sicbl_metadata
+
+_OBJECT_URI = "s3://ods-bucket/v2/2021/3/organisationMetadata.json"
+
+
+def _a_cache(tmp_path) -> CompiledOdsLookupCache:
+    return CompiledOdsLookupCache(S3ObjectDiskCache(str(tmp_path), max_size_bytes=1024 * 1024))
+
+
+def _an_organisation_lookup() -> OrganisationLookup:
+    practices = [
+        build_practice_metadata(ods_code="A12345", name="A practice", asids=["123", "456"]),
+        build_practice_metadata(ods_code="B12345", name="Another practice", asids=["789"]),
+    ]
+    sicbls = [build_sicbl_metadata(ods_code="10D", name="A SICBL", practices=["A12345"])]
+    return OrganisationLookup(practices, sicbls, year_month=(2021, 3))
+
+
+def test_reads_back_the_lookup_it_wrote(tmp_path):
+    organisation_lookup = _an_organisation_lookup()
+    cache = _a_cache(tmp_path)
+
+    cache.write(_OBJECT_URI, "an-e-tag", organisation_lookup)
+    actual = cache.read(_OBJECT_URI, "an-e-tag")
+
+    assert actual is not None
+    assert (actual.year, actual.month) == (2021, 3)
+    assert actual.has_asid_code("456")
+    assert not actual.has_asid_code("000")
+    assert actual.practice_ods_code_from_asid("456") == "A12345"
+    assert actual.practice_name_from_asid("789") == "Another practice"
+    assert actual.sicbl_ods_code_from_practice_ods_code("A12345") == "10D"
+    assert actual.sicbl_name_from_practice_ods_code("A12345") == "A SICBL"
+    assert actual.sicbl_ods_code_from_practice_ods_code("B12345") is None
+    assert actual.asid_to_practice_table() == organisation_lookup.asid_to_practice_table().sort_by(
+        "asid"
+    )
+    assert actual.practice_to_sicbl_table() == organisation_lookup.practice_to_sicbl_table()
+
+
+def test_reads_back_an_empty_lookup(tmp_path):
+    cache = _a_cache(tmp_path)
+
+    cache.write(
+        _OBJECT_URI, "an-e-tag", OrganisationLookup(practices=[], sicbls=[], year_month=(2021, 3))
+    )
+    actual = cache.read(_OBJECT_URI, "an-e-tag")
+
+    assert actual is not None
+    assert actual.asid_to_practice_table().num_rows == 0
+    assert actual.practice_to_sicbl_table().num_rows == 0
+
+
+def test_misses_given_a_different_e_tag(tmp_path):
+    cache = _a_cache(tmp_path)
+
+    cache.write(_OBJECT_URI, "an-e-tag", _an_organisation_lookup())
+
+    assert cache.read(_OBJECT_URI, "another-e-tag") is None
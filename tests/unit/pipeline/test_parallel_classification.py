@@ -0,0 +1,182 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+import pyarrow as pa
+from dateutil.tz import UTC
+
+from prmdata.domain.gp2gp.transfer_outcome import TransferOutcomePredicate
+from prmdata.domain.gp2gp.transfer_service import TransferService
+from prmdata.domain.ods_portal.organisation_lookup import OrganisationLookup
+from prmdata.domain.spine.message import SPLUNK_COLUMNS
+from prmdata.pipeline.arrow import (
+    SpineTable,
+    convert_messages_to_table,
+    convert_spine_tables_to_messages,
+    sort_transfers_by_conversation_id,
+)
+from prmdata.pipeline.daily_transfers import build_daily_transfer_tables
+from prmdata.pipeline.parallel_classification import (
+    PartitionClassificationSettings,
+    classify_partitions_in_parallel,
+    partition_spine_tables,
+)
+from tests.builders import test_cases
+from tests.builders.ods_portal import build_practice_metadata
+from tests.unit.pipeline.test_vectorised_classification import ALL_TEST_CASES
+
+A_YEAR_MONTH = (2021, 3)
+A_DAILY_START_DATETIME = datetime(2021, 3, 2, tzinfo=UTC)
+
+
+# The test cases send their messages at random times, so each one is moved onto its own hour
+# of two consecutive days, sending its messages a minute apart in the order they were built.
+def _sent_from(start, messages):
+    for minute, message in enumerate(messages):
+        message.time = start + timedelta(minutes=minute)
+    return messages
+
+
+def _all_test_case_messages():
+    return [
+        message
+        for hour, test_case in enumerate(ALL_TEST_CASES)
+        for message in _sent_from(A_DAILY_START_DATETIME + timedelta(hours=hour), test_case())
+    ]
+
+
+def _organisation_lookups(organisation_lookup):
+    return {
+        A_DAILY_START_DATETIME: organisation_lookup,
+        A_DAILY_START_DATETIME + timedelta(days=1): organisation_lookup,
+    }
+
+
+def _classify_serially(messages, organisation_lookups):
+    transfer_service = TransferService(cutoff=timedelta(0), observability_probe=Mock())
+    conversations = transfer_service.group_into_conversations(messages)
+    gp2gp_conversations = transfer_service.parse_conversations_into_gp2gp_conversations(
+        conversations
+    )
+    return dict(
+        build_daily_transfer_tables(transfer_service, gp2gp_conversations, organisation_lookups)
+    )
+
+
+def _splunk_table(messages):
+    rows = [
+        (
+            message.time.isoformat(),
+            message.conversation_id,
+            message.guid,
+            message.interaction_id,
+            message.from_party_asid,
+            message.to_party_asid,
+            message.message_ref or "NotProvided",
+            "NONE" if message.error_code is None else str(message.error_code),
+            message.from_system,
+            message.to_system,
+        )
+        for message in messages
+    ]
+    columns = list(zip(*rows)) if rows else [() for _ in SPLUNK_COLUMNS]
+    return pa.table(
+        {name: pa.array(values, type=pa.string()) for name, values in zip(SPLUNK_COLUMNS, columns)}
+    )
+
+
+def _spine_tables(messages):
+    half = len(messages) // 2
+    return [
+        SpineTable(_splunk_table(messages[:half]), is_parsed=False),
+        SpineTable(convert_messages_to_table(messages[half:]), is_parsed=True),
+    ]
+
+
+def _guids_by_conversation_id(messages):
+    guids_by_conversation_id = defaultdict(list)
+    for message in messages:
+        guids_by_conversation_id[message.conversation_id].append(message.guid)
+    return guids_by_conversation_id
+
+
+def test_partitions_each_conversation_into_a_single_partition_in_order():
+    messages = _all_test_case_messages()
+
+    partitions = partition_spine_tables(_spine_tables(messages), partition_count=3)
+    partition_guids = [
+        _guids_by_conversation_id(convert_spine_tables_to_messages(partition))
+        for partition in partitions
+    ]
+
+    assert all(len(partition) == 2 for partition in partitions)
+    for conversation_id, expected_guids in _guids_by_conversation_id(messages).items():
+        holding_partitions = [guids for guids in partition_guids if conversation_id in guids]
+        assert [guids[conversation_id] for guids in holding_partitions] == [expected_guids]
+
+
+def test_parses_messages_from_both_csv_and_cached_spine_tables():
+    messages = _all_test_case_messages()
+
+    [partition] = partition_spine_tables(_spine_tables(messages), partition_count=1)
+
+    assert list(convert_spine_tables_to_messages(partition)) == messages
+
+
+def test_partitions_an_empty_table():
+    partitions = partition_spine_tables(
+        [SpineTable(_splunk_table([]), is_parsed=False)], partition_count=2
+    )
+
+    assert [[table.table.num_rows for table in partition] for partition in partitions] == [
+        [0],
+        [0],
+    ]
+
+
+def test_matches_serial_classification_apart_from_row_order():
+    messages = _all_test_case_messages()
+    organisation_lookup = OrganisationLookup(
+        practices=[build_practice_metadata(asids=[messages[0].from_party_asid])],
+        sicbls=[],
+        year_month=A_YEAR_MONTH,
+    )
+    organisation_lookups = _organisation_lookups(organisation_lookup)
+
+    expected = _classify_serially(messages, organisation_lookups)
+    actual = classify_partitions_in_parallel(
+        partition_spine_tables(_spine_tables(messages), partition_count=2),
+        PartitionClassificationSettings(
+            cutoff=timedelta(0), organisation_lookups=organisation_lookups
+        ),
+    )
+
+    assert list(actual) == list(expected)
+    assert sum(transfers.num_rows for transfers in actual.values()) == len(ALL_TEST_CASES)
+    for daily_start_datetime, expected_transfers in expected.items():
+        actual_transfers = actual[daily_start_datetime]
+        assert actual_transfers.schema == expected_transfers.schema
+        assert (
+            sort_transfers_by_conversation_id(actual_transfers).to_pydict()
+            == sort_transfers_by_conversation_id(expected_transfers).to_pydict()
+        )
+
+
+def test_includes_outcome_predicates_when_requested():
+    messages = _sent_from(A_DAILY_START_DATETIME, test_cases.ehr_integrated_successfully())
+    organisation_lookups = _organisation_lookups(
+        OrganisationLookup(practices=[], sicbls=[], year_month=A_YEAR_MONTH)
+    )
+
+    actual = classify_partitions_in_parallel(
+        partition_spine_tables(_spine_tables(messages), partition_count=1),
+        PartitionClassificationSettings(
+            cutoff=timedelta(0),
+            organisation_lookups=organisation_lookups,
+            include_outcome_predicates=True,
+        ),
+    )
+
+    assert actual[A_DAILY_START_DATETIME]["outcome_predicates"].to_pylist() == [
+        TransferOutcomePredicate.IS_INTEGRATED | TransferOutcomePredicate.INTEGRATED_WITHIN_SLA
+    ]
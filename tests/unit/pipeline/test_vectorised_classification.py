@@ -0,0 +1,329 @@
+from datetime import timedelta
+from typing import Callable, List, Set
+from unittest.mock import Mock, call
+
+import pytest
+
+from prmdata.domain.gp2gp.transfer_service import TransferService
+from prmdata.domain.ods_portal.organisation_lookup import OrganisationLookup
+from prmdata.domain.spine.message import (
+    APPLICATION_ACK,
+    EHR_REQUEST_COMPLETED,
+    EHR_REQUEST_STARTED,
+    Message,
+)
+from prmdata.pipeline.arrow import convert_messages_to_table, convert_transfers_to_table
+from prmdata.pipeline.vectorised_classification import (
+    add_practice_metadata,
+    classify_message_table,
+    filter_transfers_by_day,
+)
+from tests.builders import test_cases
+from tests.builders.common import a_datetime, a_duration, a_string
+from tests.builders.ods_portal import build_practice_metadata, build_sicbl_metadata
+from tests.builders.spine import build_message
+
+A_YEAR_MONTH = (2021, 3)
+
+ALL_TEST_CASES: List[Callable[..., List[Message]]] = [
+    test_cases.request_made,
+    test_cases.request_acknowledged_successfully,
+    test_cases.request_acknowledged_with_error,
+    test_cases.core_ehr_sent,
+    test_cases.core_ehr_sent_with_sender_error,
+    test_cases.acknowledged_duplicate_and_waiting_for_integration,
+    test_cases.only_acknowledged_duplicates,
+    test_cases.unacknowledged_duplicate_with_copcs_and_waiting_for_integration,
+    test_cases.ehr_integrated_successfully,
+    test_cases.ehr_integrated_late,
+    test_cases.ehr_suppressed,
+    test_cases.ehr_integration_failed,
+    test_cases.ehr_missing_message_for_an_acknowledgement,
+    test_cases.ehr_integrated_after_duplicate,
+    test_cases.integration_failed_after_duplicate,
+    test_cases.first_ehr_integrated_after_second_ehr_failed,
+    test_cases.first_ehr_integrated_before_second_ehr_failed,
+    test_cases.second_ehr_integrated_after_first_ehr_failed,
+    test_cases.second_ehr_integrated_before_first_ehr_failed,
+    test_cases.ehr_integrated_with_duplicate_having_second_sender_ack_after_integration,
+    test_cases.multiple_integration_failures,
+    test_cases.copc_continue_sent,
+    test_cases.copc_fragment_failure,
+    test_cases.copc_fragment_failure_and_missing_copc_fragment_ack,
+    test_cases.successful_integration_with_copc_fragments,
+    test_cases.pending_integration_with_copc_fragments,
+    test_cases.pending_integration_with_acked_copc_fragments,
+    test_cases.copc_fragment_failures,
+    test_cases.ehr_integrated_with_conflicting_acks_and_duplicate_ehrs,
+    test_cases.ehr_suppressed_with_conflicting_acks_and_duplicate_ehrs,
+    test_cases.integration_failed_with_conflicting_acks_and_duplicate_ehrs,
+    test_cases.ehr_integrated_with_conflicting_duplicate_and_conflicting_error_ack,
+    test_cases.ehr_suppressed_with_conflicting_duplicate_and_conflicting_error_ack,
+    test_cases.multiple_sender_acknowledgements,
+]
+
+
+def _an_empty_organisation_lookup():
+    return OrganisationLookup(practices=[], sicbls=[], year_month=A_YEAR_MONTH)
+
+
+def _classify_with_object_engine(
+    messages,
+    organisation_lookup,
+    cutoff=timedelta(0),
+    probe=None,
+    include_outcome_predicates=False,
+):
+    transfer_service = TransferService(cutoff=cutoff, observability_probe=probe or Mock())
+    conversations = transfer_service.group_into_conversations(messages)
+    gp2gp_conversations = transfer_service.parse_conversations_into_gp2gp_conversations(
+        conversations
+    )
+    transfers = transfer_service.convert_to_transfers(gp2gp_conversations, organisation_lookup)
+    return convert_transfers_to_table(transfers, include_outcome_predicates)
+
+
+def _classify_with_vectorised_engine(
+    messages,
+    organisation_lookup,
+    cutoff=timedelta(0),
+    probe=None,
+    include_outcome_predicates=False,
+):
+    transfers = classify_message_table(convert_messages_to_table(messages), cutoff)
+    return add_practice_metadata(
+        transfers, organisation_lookup, probe or Mock(), include_outcome_predicates
+    )
+
+
+@pytest.mark.parametrize("test_case", ALL_TEST_CASES)
+def test_matches_object_engine_for_each_test_case(test_case):
+    messages = test_case()
+    organisation_lookup = _an_empty_organisation_lookup()
+
+    expected = _classify_with_object_engine(messages, organisation_lookup)
+    actual = _classify_with_vectorised_engine(messages, organisation_lookup)
+
+    assert actual.schema == expected.schema
+    assert actual.to_pydict() == expected.to_pydict()
+
+
+@pytest.mark.parametrize("test_case", ALL_TEST_CASES)
+def test_matches_object_engine_outcome_predicates_for_each_test_case(test_case):
+    messages = test_case()
+    organisation_lookup = _an_empty_organisation_lookup()
+
+    expected = _classify_with_object_engine(
+        messages, organisation_lookup, include_outcome_predicates=True
+    )
+    actual = _classify_with_vectorised_engine(
+        messages, organisation_lookup, include_outcome_predicates=True
+    )
+
+    assert actual.schema == expected.schema
+    assert actual.to_pydict() == expected.to_pydict()
+
+
+def test_matches_object_engine_for_many_interleaved_conversations():
+    messages = [message for test_case in ALL_TEST_CASES for message in test_case()]
+    messages.sort(key=lambda message: message.time)
+    organisation_lookup = _an_empty_organisation_lookup()
+
+    expected = _classify_with_object_engine(messages, organisation_lookup)
+    actual = _classify_with_vectorised_engine(messages, organisation_lookup)
+
+    assert actual.to_pydict() == expected.to_pydict()
+
+
+def test_matches_object_engine_when_ignoring_messages_after_cutoff():
+    cutoff = timedelta(days=14)
+    messages = [
+        message
+        for test_case in ALL_TEST_CASES
+        for message in test_case()
+        if message.time.year % 2 == 0
+    ]
+    organisation_lookup = _an_empty_organisation_lookup()
+
+    expected = _classify_with_object_engine(messages, organisation_lookup, cutoff)
+    actual = _classify_with_vectorised_engine(messages, organisation_lookup, cutoff)
+
+    assert actual.to_pydict() == expected.to_pydict()
+
+
+def test_pairs_acks_only_with_the_latest_message_sharing_a_guid():
+    conversation_id = a_string()
+    start = a_datetime(year=2021, month=3, day=1)
+    messages = [
+        build_message(
+            conversation_id=conversation_id,
+            guid=conversation_id,
+            interaction_id=EHR_REQUEST_STARTED,
+            time=start,
+        ),
+        build_message(
+            conversation_id=conversation_id,
+            guid="ehr",
+            interaction_id=EHR_REQUEST_COMPLETED,
+            time=start + timedelta(hours=1),
+        ),
+        build_message(
+            conversation_id=conversation_id,
+            interaction_id=APPLICATION_ACK,
+            message_ref="ehr",
+            error_code=None,
+            time=start + timedelta(hours=2),
+        ),
+        build_message(
+            conversation_id=conversation_id,
+            guid="ehr",
+            interaction_id=EHR_REQUEST_COMPLETED,
+            time=start + timedelta(hours=3),
+        ),
+        build_message(
+            conversation_id=conversation_id,
+            interaction_id=APPLICATION_ACK,
+            message_ref="unknown",
+            error_code=30,
+            time=start + timedelta(hours=4),
+        ),
+    ]
+    organisation_lookup = _an_empty_organisation_lookup()
+
+    expected = _classify_with_object_engine(messages, organisation_lookup)
+    actual = _classify_with_vectorised_engine(messages, organisation_lookup)
+
+    assert actual.to_pydict() == expected.to_pydict()
+    assert actual["final_error_codes"].to_pylist() == [[]]
+
+
+def test_drops_conversations_not_starting_with_a_request():
+    conversation_id = a_string()
+    messages = [
+        build_message(
+            conversation_id=conversation_id,
+            interaction_id=EHR_REQUEST_COMPLETED,
+        )
+    ]
+
+    actual = classify_message_table(convert_messages_to_table(messages), timedelta(0))
+
+    assert actual.num_rows == 0
+
+
+def test_adds_practice_metadata_from_organisation_lookup():
+    requesting_asid = a_string()
+    practice = build_practice_metadata(asids=[requesting_asid])
+    sicbl = build_sicbl_metadata(practices=[practice.ods_code])
+    organisation_lookup = OrganisationLookup(
+        practices=[practice], sicbls=[sicbl], year_month=A_YEAR_MONTH
+    )
+    messages = test_cases.request_made(requesting_asid=requesting_asid)
+    probe = Mock()
+
+    expected = _classify_with_object_engine(messages, organisation_lookup)
+    actual = _classify_with_vectorised_engine(messages, organisation_lookup, probe=probe)
+
+    assert actual.to_pydict() == expected.to_pydict()
+    assert actual["requesting_practice_ods_code"].to_pylist() == [practice.ods_code]
+    assert actual["requesting_practice_sicbl_name"].to_pylist() == [sicbl.name]
+    probe.record_no_ods_code_for_asid.assert_called_once_with(
+        actual["conversation_id"][0].as_py(), actual["sending_practice_asid"][0].as_py()
+    )
+
+
+def test_leaves_sicbl_metadata_empty_given_a_practice_without_a_sicbl():
+    requesting_asid, sending_asid = a_string(), a_string()
+    requesting_practice = build_practice_metadata(asids=[requesting_asid])
+    sending_practice = build_practice_metadata(asids=[sending_asid])
+    sicbl = build_sicbl_metadata(practices=[sending_practice.ods_code])
+    organisation_lookup = OrganisationLookup(
+        practices=[requesting_practice, sending_practice], sicbls=[sicbl], year_month=A_YEAR_MONTH
+    )
+    messages = test_cases.request_made(requesting_asid=requesting_asid, sending_asid=sending_asid)
+
+    expected = _classify_with_object_engine(messages, organisation_lookup)
+    actual = _classify_with_vectorised_engine(messages, organisation_lookup)
+
+    assert actual.to_pydict() == expected.to_pydict()
+    assert actual["requesting_practice_ods_code"].to_pylist() == [requesting_practice.ods_code]
+    assert actual["requesting_practice_sicbl_ods_code"].to_pylist() == [None]
+    assert actual["sending_practice_sicbl_ods_code"].to_pylist() == [sicbl.ods_code]
+
+
+def test_records_an_unknown_asid_for_the_first_conversation_it_is_in():
+    requesting_asid, other_requesting_asid, sending_asid = a_string(), a_string(), a_string()
+    messages = [
+        *test_cases.request_made(
+            conversation_id="a", requesting_asid=requesting_asid, sending_asid=sending_asid
+        ),
+        *test_cases.request_made(
+            conversation_id="b", requesting_asid=requesting_asid, sending_asid=sending_asid
+        ),
+        *test_cases.request_made(
+            conversation_id="c", requesting_asid=other_requesting_asid, sending_asid=sending_asid
+        ),
+    ]
+    organisation_lookup = OrganisationLookup(
+        practices=[build_practice_metadata(asids=[sending_asid])],
+        sicbls=[],
+        year_month=A_YEAR_MONTH,
+    )
+    object_engine_probe, probe = Mock(), Mock()
+
+    _classify_with_object_engine(messages, organisation_lookup, probe=object_engine_probe)
+    _classify_with_vectorised_engine(messages, organisation_lookup, probe=probe)
+
+    expected_calls = [call("a", requesting_asid), call("c", other_requesting_asid)]
+    assert object_engine_probe.record_no_ods_code_for_asid.call_args_list == expected_calls
+    assert probe.record_no_ods_code_for_asid.call_args_list == expected_calls
+
+
+def test_records_an_unknown_asid_once_across_days_sharing_recorded_asids():
+    sending_asid = a_string()
+    organisation_lookup = _an_empty_organisation_lookup()
+    probe = Mock()
+    recorded_unknown_asids: Set[str] = set()
+    daily_transfers = [
+        classify_message_table(
+            convert_messages_to_table(
+                test_cases.request_made(
+                    conversation_id=conversation_id,
+                    requesting_asid=sending_asid,
+                    sending_asid=sending_asid,
+                )
+            ),
+            timedelta(0),
+        )
+        for conversation_id in ["a", "b"]
+    ]
+
+    for transfers in daily_transfers:
+        add_practice_metadata(
+            transfers, organisation_lookup, probe, recorded_unknown_asids=recorded_unknown_asids
+        )
+
+    assert probe.record_no_ods_code_for_asid.call_args_list == [call("a", sending_asid)]
+
+
+def test_filters_transfers_requested_within_a_day():
+    daily_start_datetime = a_datetime(year=2021, month=3, day=2, hour=0, minute=0, second=0)
+    times = [
+        daily_start_datetime - a_duration(max_length=80000),
+        daily_start_datetime,
+        daily_start_datetime + timedelta(hours=23, minutes=59),
+        daily_start_datetime + timedelta(days=1),
+    ]
+    conversation_ids = [a_string() for _ in times]
+    messages = [
+        message
+        for conversation_id, time in zip(conversation_ids, times)
+        for message in test_cases.request_made(
+            conversation_id=conversation_id, request_sent_date=time
+        )
+    ]
+    transfers = classify_message_table(convert_messages_to_table(messages), timedelta(0))
+
+    actual = filter_transfers_by_day(transfers, daily_start_datetime)
+
+    assert actual["conversation_id"].to_pylist() == conversation_ids[1:3]
@@ -0,0 +1,81 @@
+import gzip
+from unittest import mock
+
+import boto3
+import pytest
+from moto import mock_s3
+
+from prmdata.utils.input_output.disk_cache import S3ObjectDiskCache
+from prmdata.utils.input_output.s3 import JsonFileNotFoundException, S3DataManager
+from tests.unit.utils.io.s3 import MOTO_MOCK_REGION
+
+
+@mock_s3
+def test_reads_unchanged_object_from_disk_cache_on_second_read(tmp_path):
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    bucket.Object("test_object.json").put(Body=b'{"fruit": "mango"}')
+    cache = S3ObjectDiskCache(str(tmp_path), max_size_bytes=1024)
+    object_uri = "s3://test_bucket/test_object.json"
+
+    S3DataManager(conn, disk_cache=cache).read_json(object_uri)
+
+    s3_manager = S3DataManager(conn, disk_cache=cache)
+    with mock.patch.object(conn.Object("test_bucket", "test_object.json").__class__, "get") as get:
+        actual = s3_manager.read_json(object_uri)
+
+    assert actual == {"fruit": "mango"}
+    get.assert_not_called()
+
+
+@mock_s3
+def test_downloads_object_again_when_it_has_changed(tmp_path):
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    bucket.Object("test_object.json").put(Body=b'{"fruit": "mango"}')
+    s3_manager = S3DataManager(conn, disk_cache=S3ObjectDiskCache(str(tmp_path), 1024))
+    object_uri = "s3://test_bucket/test_object.json"
+    s3_manager.read_json(object_uri)
+
+    bucket.Object("test_object.json").put(Body=b'{"fruit": "apple"}')
+
+    assert s3_manager.read_json(object_uri) == {"fruit": "apple"}
+
+
+@mock_s3
+def test_reads_gzip_csv_through_disk_cache(tmp_path):
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    bucket.Object("test.csv.gz").put(Body=gzip.compress(b"id,fruit\n1,mango\n"))
+    s3_manager = S3DataManager(conn, disk_cache=S3ObjectDiskCache(str(tmp_path), 1024))
+    object_uri = "s3://test_bucket/test.csv.gz"
+
+    first = list(s3_manager.read_gzip_csv(object_uri))
+    second = s3_manager.read_gzip_csv_table(object_uri, column_names=["fruit"]).to_pydict()
+
+    assert first == [{"id": "1", "fruit": "mango"}]
+    assert second == {"fruit": ["mango"]}
+
+
+@mock_s3
+def test_reads_listed_json_files_through_disk_cache(tmp_path):
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    bucket.Object("v1/event1.json").put(Body=b'{"eventId": "1234"}')
+    s3_manager = S3DataManager(conn, disk_cache=S3ObjectDiskCache(str(tmp_path), 1024))
+
+    first = s3_manager.read_json_files_from_paths(["s3://test_bucket/v1"])
+    second = s3_manager.read_json_files_from_paths(["s3://test_bucket/v1"])
+
+    assert first == second == [{"eventId": "1234"}]
+
+
+@mock_s3
+def test_raises_json_file_not_found_exception_when_object_is_missing(tmp_path):
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    conn.create_bucket(Bucket="test_bucket")
+    s3_manager = S3DataManager(conn, disk_cache=S3ObjectDiskCache(str(tmp_path), 1024))
+    object_uri = "s3://test_bucket/test_object.json"
+
+    with pytest.raises(JsonFileNotFoundException):
+        s3_manager.read_json(object_uri)
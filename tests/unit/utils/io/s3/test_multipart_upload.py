@@ -0,0 +1,81 @@
+import os
+
+import boto3
+import pytest
+from moto import mock_s3
+
+from prmdata.utils.input_output.multipart_upload import (
+    MINIMUM_PART_SIZE_BYTES,
+    S3MultipartUploadStream,
+)
+from tests.unit.utils.io.s3 import MOTO_MOCK_REGION
+
+SOME_METADATA = {"metadata_field": "metadata_value"}
+
+
+# Newer botocore sends upload parts with trailing checksums, which moto cannot yet decode
+@pytest.fixture(autouse=True)
+def _checksum_only_when_required(monkeypatch):
+    monkeypatch.setenv("AWS_REQUEST_CHECKSUM_CALCULATION", "when_required")
+
+
+def _a_bucket():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    return conn.create_bucket(Bucket="test_bucket")
+
+
+@mock_s3
+def test_uploads_an_object_smaller_than_a_part_with_a_single_put():
+    bucket = _a_bucket()
+
+    with S3MultipartUploadStream(
+        bucket.Object("small"), SOME_METADATA, MINIMUM_PART_SIZE_BYTES
+    ) as stream:
+        stream.write(b"some ")
+        stream.write(b"bytes")
+
+    actual = bucket.Object("small").get()
+
+    assert actual["Body"].read() == b"some bytes"
+    assert actual["Metadata"] == SOME_METADATA
+    assert "-" not in actual["ETag"]
+
+
+@mock_s3
+def test_uploads_an_object_larger_than_a_part_in_parts():
+    bucket = _a_bucket()
+    data = os.urandom(2 * MINIMUM_PART_SIZE_BYTES + 1024)
+
+    with S3MultipartUploadStream(
+        bucket.Object("large"), SOME_METADATA, MINIMUM_PART_SIZE_BYTES
+    ) as stream:
+        for start in range(0, len(data), 1024 * 1024):
+            end = start + 1024 * 1024
+            stream.write(data[start:end])
+
+    actual = bucket.Object("large").get()
+
+    assert stream.tell() == len(data)
+    assert actual["Body"].read() == data
+    assert actual["Metadata"] == SOME_METADATA
+    assert actual["ETag"].strip('"').endswith("-3")
+
+
+@mock_s3
+def test_aborts_the_upload_when_writing_fails():
+    bucket = _a_bucket()
+
+    with pytest.raises(RuntimeError):
+        with S3MultipartUploadStream(
+            bucket.Object("failed"), SOME_METADATA, MINIMUM_PART_SIZE_BYTES
+        ) as stream:
+            stream.write(os.urandom(MINIMUM_PART_SIZE_BYTES + 1024))
+            raise RuntimeError("failed part way through")
+
+    assert list(bucket.objects.all()) == []
+    assert list(bucket.multipart_uploads.all()) == []
+
+
+def test_rejects_parts_smaller_than_s3_allows():
+    with pytest.raises(ValueError):
+        S3MultipartUploadStream(None, SOME_METADATA, MINIMUM_PART_SIZE_BYTES - 1)
@@ -1,9 +1,11 @@
 from unittest import mock
 
 import boto3
+import pyarrow as pa
+import pytest
 from moto import mock_s3
 
-from prmdata.utils.input_output.s3 import S3DataManager, logger
+from prmdata.utils.input_output.s3 import CsvColumnsNotFoundException, S3DataManager, logger
 from tests.builders.file import build_gzip_csv
 from tests.unit.utils.io.s3 import MOTO_MOCK_REGION
 
@@ -55,3 +57,110 @@ def test_will_log_reading_file_event():
             f"Reading file from: {object_uri}",
             extra={"event": "READING_FILE_FROM_S3", "object_uri": object_uri},
         )
+
+
+@mock_s3
+def test_returns_csv_as_table_of_string_columns():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    s3_object = bucket.Object("test_object.csv.gz")
+    s3_object.put(
+        Body=build_gzip_csv(
+            header=["id", "message", "comment"],
+            rows=[["0123", "A message", "A comment"], ["321", "Another message", ""]],
+        )
+    )
+
+    s3_manager = S3DataManager(conn)
+
+    expected = {"id": ["0123", "321"], "comment": ["A comment", ""]}
+
+    actual = s3_manager.read_gzip_csv_table(
+        "s3://test_bucket/test_object.csv.gz", column_names=["id", "comment"]
+    )
+
+    assert actual.to_pydict() == expected
+
+
+@mock_s3
+def test_returns_null_column_when_optional_column_is_missing_from_csv():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    s3_object = bucket.Object("test_object.csv.gz")
+    s3_object.put(Body=build_gzip_csv(header=["id", "message"], rows=[["123", "A message"]]))
+
+    s3_manager = S3DataManager(conn)
+
+    expected = {"id": ["123"], "comment": [None]}
+
+    actual = s3_manager.read_gzip_csv_table(
+        "s3://test_bucket/test_object.csv.gz",
+        column_names=["id"],
+        optional_column_names=["comment"],
+    )
+
+    assert actual.to_pydict() == expected
+
+
+@mock_s3
+def test_raises_exception_when_required_column_is_missing_from_csv():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    s3_object = bucket.Object("test_object.csv.gz")
+    s3_object.put(Body=build_gzip_csv(header=["id"], rows=[["123"]]))
+
+    s3_manager = S3DataManager(conn)
+
+    with pytest.raises(CsvColumnsNotFoundException) as e:
+        s3_manager.read_gzip_csv_table(
+            "s3://test_bucket/test_object.csv.gz", column_names=["id", "comment"]
+        )
+
+    missing_columns_exception = e.value
+    assert isinstance(missing_columns_exception, CsvColumnsNotFoundException)
+    assert missing_columns_exception.missing_column_names == ["comment"]
+
+
+@mock_s3
+def test_reads_only_requested_columns_keeping_quoted_newlines():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    s3_object = bucket.Object("test_object.csv.gz")
+    s3_object.put(
+        Body=build_gzip_csv(
+            header=["id", "raw", "comment"],
+            rows=[
+                ["0123", '"a multi\nline value"', "A comment"],
+                ["321", "1.5", '"Another\ncomment"'],
+            ],
+        )
+    )
+
+    s3_manager = S3DataManager(conn)
+
+    expected = {"id": ["0123", "321"], "comment": ["A comment", "Another\ncomment"]}
+
+    actual = s3_manager.read_gzip_csv_table(
+        "s3://test_bucket/test_object.csv.gz", column_names=["id", "comment"]
+    )
+
+    assert actual.to_pydict() == expected
+    assert actual.schema == pa.schema([("id", pa.string()), ("comment", pa.string())])
+
+
+@mock_s3
+def test_returns_empty_table_given_csv_with_only_a_header():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    s3_object = bucket.Object("test_object.csv.gz")
+    s3_object.put(Body=build_gzip_csv(header=["id", "message"], rows=[]))
+
+    s3_manager = S3DataManager(conn)
+
+    actual = s3_manager.read_gzip_csv_table(
+        "s3://test_bucket/test_object.csv.gz",
+        column_names=["id"],
+        optional_column_names=["comment"],
+    )
+
+    assert actual.to_pydict() == {"id": [], "comment": []}
@@ -60,3 +60,33 @@ def test_json_file_not_found_exception_missing_json_uri_property_returns_uri():
     object_uri = "s3://test_bucket/test_object.json"
     actual_exception = JsonFileNotFoundException(object_uri)
     assert actual_exception.missing_json_uri == object_uri
+
+
+@mock_s3
+def test_read_json_e_tag_returns_the_objects_e_tag():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    s3_object = bucket.Object("test_object.json")
+    s3_object.put(Body=b'{"fruit": "mango"}')
+
+    s3_manager = S3DataManager(conn)
+
+    actual = s3_manager.read_json_e_tag("s3://test_bucket/test_object.json")
+
+    assert actual == s3_object.e_tag
+
+
+@mock_s3
+def test_read_json_e_tag_throws_json_file_not_found_exception_given_no_object():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    conn.create_bucket(Bucket="test_bucket")
+
+    s3_manager = S3DataManager(conn)
+    object_uri = "s3://test_bucket/test_object.json"
+
+    with pytest.raises(JsonFileNotFoundException) as e:
+        s3_manager.read_json_e_tag(object_uri)
+
+    json_file_not_found = e.value
+    assert isinstance(json_file_not_found, JsonFileNotFoundException)
+    assert json_file_not_found.missing_json_uri == object_uri
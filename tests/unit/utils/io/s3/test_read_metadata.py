@@ -0,0 +1,46 @@
+import boto3
+import pytest
+from moto import mock_s3
+
+from prmdata.utils.input_output.s3 import S3DataManager
+from tests.unit.utils.io.s3 import MOTO_MOCK_REGION
+
+
+@mock_s3
+def test_read_metadata_returns_object_metadata():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    bucket.Object("test_object.parquet").put(
+        Body=b"transfers", Metadata={"build-tag": "abc456", "input-fingerprint": "f00d"}
+    )
+
+    s3_manager = S3DataManager(conn)
+
+    actual = s3_manager.read_metadata("s3://test_bucket/test_object.parquet")
+
+    assert actual == {"build-tag": "abc456", "input-fingerprint": "f00d"}
+
+
+@mock_s3
+def test_read_metadata_returns_none_given_object_does_not_exist():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    conn.create_bucket(Bucket="test_bucket")
+
+    s3_manager = S3DataManager(conn)
+
+    assert s3_manager.read_metadata("s3://test_bucket/missing.parquet") is None
+
+
+@mock_s3
+def test_read_e_tag_logs_and_raises_given_object_does_not_exist(caplog):
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    conn.create_bucket(Bucket="test_bucket")
+
+    s3_manager = S3DataManager(conn)
+
+    with pytest.raises(conn.meta.client.exceptions.NoSuchKey):
+        s3_manager.read_e_tag("s3://test_bucket/missing.csv.gz")
+
+    [record] = [record for record in caplog.records if record.levelname == "ERROR"]
+    assert record.event == "FILE_NOT_FOUND_IN_S3"
+    assert record.object_uri == "s3://test_bucket/missing.csv.gz"
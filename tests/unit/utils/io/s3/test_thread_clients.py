@@ -0,0 +1,32 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from moto import mock_s3
+
+from prmdata.utils.input_output.s3 import S3DataManager
+from tests.unit.utils.io.s3 import MOTO_MOCK_REGION
+
+
+@mock_s3
+def test_builds_one_client_for_each_other_thread_that_reads():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    bucket.Object("test_object.json").put(Body=b'{"fruit": "mango"}')
+    object_uri = "s3://test_bucket/test_object.json"
+    built_clients = []
+
+    def client_factory():
+        client = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+        built_clients.append(client)
+        return client
+
+    s3_manager = S3DataManager(conn, client_factory=client_factory)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        first = executor.submit(s3_manager.read_json, object_uri).result()
+        second = executor.submit(s3_manager.read_json, object_uri).result()
+    on_this_thread = s3_manager.read_json(object_uri)
+
+    assert first == second == on_this_thread == {"fruit": "mango"}
+    assert len(built_clients) == 1
+    assert built_clients[0] is not conn
@@ -1,9 +1,15 @@
+import os
+from io import BytesIO
 from unittest import mock
 
 import boto3
 import pyarrow as pa
+import pytest
 from moto import mock_s3
+from pyarrow import parquet as pq
 
+from prmdata.utils.input_output.multipart_upload import MINIMUM_PART_SIZE_BYTES
+from prmdata.utils.input_output.parquet_options import ParquetWriteOptions
 from prmdata.utils.input_output.s3 import S3DataManager, logger
 from tests.builders.s3 import read_s3_parquet
 from tests.unit.utils.io.s3 import MOTO_MOCK_REGION
@@ -11,6 +17,12 @@ from tests.unit.utils.io.s3 import MOTO_MOCK_REGION
 SOME_METADATA = {"metadata_field": "metadata_value"}
 
 
+# Newer botocore sends upload parts with trailing checksums, which moto cannot yet decode
+@pytest.fixture(autouse=True)
+def _checksum_only_when_required(monkeypatch):
+    monkeypatch.setenv("AWS_REQUEST_CHECKSUM_CALCULATION", "when_required")
+
+
 @mock_s3
 def test_writes_table_as_parquet():
     conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
@@ -96,3 +108,71 @@ def test_will_write_metatdata():
     actual = bucket.Object("test_object.parquet").get()["Metadata"]
 
     assert actual == expected
+
+
+@mock_s3
+def test_writes_a_table_larger_than_an_upload_part():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    data = {"id": [os.urandom(16).hex() for _ in range(200_000)]}
+
+    s3_manager = S3DataManager(conn, upload_part_size_bytes=MINIMUM_PART_SIZE_BYTES)
+    s3_manager.write_parquet(pa.table(data), "s3://test_bucket/ids.parquet", SOME_METADATA)
+
+    actual = read_s3_parquet(bucket, "ids.parquet")
+
+    assert actual == data
+    assert bucket.Object("ids.parquet").e_tag.strip('"').endswith("-2")
+
+
+@mock_s3
+def test_writes_record_batches_as_parquet():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    batches = [
+        pa.record_batch([pa.array(["mango", "lemon"])], names=["fruit"]),
+        pa.record_batch([pa.array(["apple"])], names=["fruit"]),
+    ]
+
+    s3_manager = S3DataManager(conn)
+    with mock.patch.object(logger, "info") as mock_log_info:
+        s3_manager.write_parquet_batches(
+            iter(batches), batches[0].schema, "s3://test_bucket/fruits.parquet", SOME_METADATA
+        )
+
+    actual = read_s3_parquet(bucket, "fruits.parquet")
+
+    assert actual == {"fruit": ["mango", "lemon", "apple"]}
+    assert mock_log_info.call_args.kwargs["extra"]["row_count"] == 3
+
+
+@mock_s3
+def test_writes_parquet_with_the_given_options():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    table = pa.table({"fruit": ["mango", "lemon", "mango"], "id": ["1", "2", "3"]})
+    parquet_options = ParquetWriteOptions(
+        dictionary_columns=["fruit"],
+        compression="zstd",
+        compression_level=9,
+        row_group_size=2,
+        write_statistics=False,
+    )
+
+    s3_manager = S3DataManager(conn, parquet_options=parquet_options)
+    s3_manager.write_parquet(table, "s3://test_bucket/fruits.parquet", SOME_METADATA)
+
+    body = BytesIO()
+    bucket.download_fileobj("fruits.parquet", body)
+    metadata = pq.ParquetFile(body).metadata
+    fruit_column, id_column = metadata.row_group(0).column(0), metadata.row_group(0).column(1)
+
+    assert read_s3_parquet(bucket, "fruits.parquet") == table.to_pydict()
+    assert [metadata.row_group(index).num_rows for index in range(metadata.num_row_groups)] == [
+        2,
+        1,
+    ]
+    assert fruit_column.compression == "ZSTD"
+    assert "RLE_DICTIONARY" in fruit_column.encodings
+    assert "RLE_DICTIONARY" not in id_column.encodings
+    assert not fruit_column.is_stats_set
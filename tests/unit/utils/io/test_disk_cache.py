@@ -0,0 +1,64 @@
+import os
+from io import BytesIO
+
+import pytest
+
+from prmdata.utils.input_output.disk_cache import S3ObjectDiskCache
+
+
+def test_returns_path_to_cached_contents_for_matching_e_tag(tmp_path):
+    cache = S3ObjectDiskCache(str(tmp_path), max_size_bytes=1024)
+    cache.put("bucket", "a/key", '"etag-1"', BytesIO(b"contents"))
+
+    actual = cache.get("bucket", "a/key", '"etag-1"')
+
+    assert actual is not None
+    assert actual.read_bytes() == b"contents"
+
+
+def test_misses_when_e_tag_has_changed(tmp_path):
+    cache = S3ObjectDiskCache(str(tmp_path), max_size_bytes=1024)
+    cache.put("bucket", "a/key", '"etag-1"', BytesIO(b"contents"))
+
+    assert cache.get("bucket", "a/key", '"etag-2"') is None
+    assert cache.get("other-bucket", "a/key", '"etag-1"') is None
+
+
+def test_evicts_least_recently_used_entries_when_over_size_limit(tmp_path):
+    cache = S3ObjectDiskCache(str(tmp_path), max_size_bytes=20)
+    first = cache.put("bucket", "first", "e", BytesIO(b"x" * 8))
+    second = cache.put("bucket", "second", "e", BytesIO(b"x" * 8))
+    os.utime(first, (1, 1))
+    os.utime(second, (2, 2))
+    cache.get("bucket", "first", "e")
+
+    cache.put("bucket", "third", "e", BytesIO(b"x" * 8))
+
+    assert cache.get("bucket", "first", "e") is not None
+    assert cache.get("bucket", "second", "e") is None
+    assert cache.get("bucket", "third", "e") is not None
+
+
+def test_keeps_newest_entry_even_when_it_exceeds_size_limit(tmp_path):
+    cache = S3ObjectDiskCache(str(tmp_path), max_size_bytes=4)
+    cache.put("bucket", "old", "e", BytesIO(b"xx"))
+
+    cache.put("bucket", "large", "e", BytesIO(b"x" * 8))
+
+    assert cache.get("bucket", "old", "e") is None
+    assert cache.get("bucket", "large", "e") is not None
+
+
+class _FailingBody(BytesIO):
+    def read(self, *args):
+        raise ConnectionResetError("connection dropped")
+
+
+def test_removes_partial_file_when_copying_the_body_fails(tmp_path):
+    cache = S3ObjectDiskCache(str(tmp_path), max_size_bytes=1024)
+
+    with pytest.raises(ConnectionResetError):
+        cache.put("bucket", "a/key", '"etag-1"', _FailingBody())
+
+    assert os.listdir(tmp_path) == []
+    assert cache.get("bucket", "a/key", '"etag-1"') is None
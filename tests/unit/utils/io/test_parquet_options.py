@@ -0,0 +1,32 @@
+import pyarrow as pa
+
+from prmdata.utils.input_output.parquet_options import ParquetWriteOptions, group_rows
+
+
+def _batches(*sizes):
+    start = 0
+    for size in sizes:
+        yield pa.record_batch([pa.array(range(start, start + size))], names=["value"])
+        start += size
+
+
+def test_groups_batches_into_tables_of_the_row_group_size():
+    row_groups = list(group_rows(_batches(3, 1, 5, 2), row_group_size=4))
+
+    assert [row_group.num_rows for row_group in row_groups] == [4, 4, 3]
+    assert pa.concat_tables(row_groups)["value"].to_pylist() == list(range(11))
+
+
+def test_splits_a_batch_larger_than_the_row_group_size():
+    row_groups = list(group_rows(_batches(9), row_group_size=4))
+
+    assert [row_group.num_rows for row_group in row_groups] == [4, 4, 1]
+
+
+def test_groups_no_batches_into_no_row_groups():
+    assert list(group_rows(_batches(), row_group_size=4)) == []
+
+
+def test_dictionary_encodes_every_column_unless_columns_are_given():
+    assert ParquetWriteOptions().use_dictionary() is True
+    assert ParquetWriteOptions(dictionary_columns=["status"]).use_dictionary() == ["status"]
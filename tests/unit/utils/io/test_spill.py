@@ -0,0 +1,81 @@
+import os
+import pickle
+
+from prmdata.utils.input_output.spill import spill_into_partitions
+
+
+def _spilled_size(items):
+    return len(pickle.dumps(items, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def test_spill_into_partitions_returns_every_item_once():
+    items = [(f"key-{i % 7}", i) for i in range(100)]
+
+    partitions = list(
+        spill_into_partitions(items, key=lambda item: item[0], memory_budget_bytes=1000)
+    )
+
+    assert sorted(item for partition in partitions for item in partition) == sorted(items)
+
+
+def test_spill_into_partitions_derives_partition_count_from_memory_budget():
+    items = [(f"key-{i % 50}", i) for i in range(1000)]
+    budget = _spilled_size(items)
+
+    partitions = list(
+        spill_into_partitions(items, key=lambda item: item[0], memory_budget_bytes=budget)
+    )
+    single_partition = list(
+        spill_into_partitions(items, key=lambda item: item[0], memory_budget_bytes=budget * 10)
+    )
+
+    assert len(partitions) == 4
+    assert len(single_partition) == 1
+
+
+def test_spill_into_partitions_keeps_items_with_the_same_key_together_in_order():
+    items = [(f"key-{i % 7}", i) for i in range(100)]
+
+    partitions = list(
+        spill_into_partitions(items, key=lambda item: item[0], memory_budget_bytes=500)
+    )
+
+    for key in {key for key, _ in items}:
+        containing = [partition for partition in partitions if any(k == key for k, _ in partition)]
+        assert len(containing) == 1
+        assert [i for k, i in containing[0] if k == key] == [i for k, i in items if k == key]
+
+
+def test_spill_into_partitions_returns_keys_in_the_order_they_were_first_seen():
+    items = [(f"key-{(i * 13) % 31}", i) for i in range(300)]
+
+    partitions = list(
+        spill_into_partitions(items, key=lambda item: item[0], memory_budget_bytes=1000)
+    )
+    keys = [key for partition in partitions for key, _ in partition]
+
+    assert len(partitions) > 1
+    assert list(dict.fromkeys(keys)) == list(dict.fromkeys(key for key, _ in items))
+
+
+def test_spill_into_partitions_handles_missing_keys():
+    items = [(None, 1), ("a", 2), (None, 3)]
+
+    partitions = list(spill_into_partitions(items, key=lambda item: item[0], memory_budget_bytes=1))
+
+    assert [item for partition in partitions for item in partition if item[0] is None] == [
+        (None, 1),
+        (None, 3),
+    ]
+
+
+def test_spill_into_partitions_removes_spilled_files(tmp_path):
+    items = [(str(i), i) for i in range(10)]
+
+    list(
+        spill_into_partitions(
+            items, key=lambda item: item[0], memory_budget_bytes=10, directory=str(tmp_path)
+        )
+    )
+
+    assert os.listdir(tmp_path) == []
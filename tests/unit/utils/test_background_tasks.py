@@ -0,0 +1,114 @@
+import threading
+
+import pytest
+
+from prmdata.utils.background_tasks import BackgroundTasks
+
+
+def test_runs_tasks_in_calling_thread_when_disabled():
+    ran_on = []
+
+    with BackgroundTasks(max_workers=0) as tasks:
+        tasks.submit(lambda: ran_on.append(threading.get_ident()))
+        assert ran_on == [threading.get_ident()]
+
+
+def test_runs_every_task_in_the_background_before_the_block_exits():
+    ran_on = []
+
+    with BackgroundTasks(max_workers=2) as tasks:
+        for _ in range(5):
+            tasks.submit(lambda: ran_on.append(threading.get_ident()))
+
+    assert len(ran_on) == 5
+    assert threading.get_ident() not in ran_on
+
+
+def test_starts_tasks_in_submission_order():
+    started = []
+
+    with BackgroundTasks(max_workers=1) as tasks:
+        for item in range(5):
+            tasks.submit(lambda item=item: started.append(item))
+
+    assert started == [0, 1, 2, 3, 4]
+
+
+def test_waits_for_the_oldest_task_before_holding_more_than_max_workers():
+    first_task_can_finish = threading.Event()
+    finished = []
+
+    def first_task():
+        first_task_can_finish.wait()
+        finished.append("first")
+
+    with BackgroundTasks(max_workers=1) as tasks:
+        tasks.submit(first_task)
+        submitting = threading.Thread(
+            target=lambda: tasks.submit(lambda: finished.append("second"))
+        )
+        submitting.start()
+        submitting.join(timeout=0.1)
+
+        assert submitting.is_alive()
+
+        first_task_can_finish.set()
+        submitting.join()
+
+    assert finished == ["first", "second"]
+
+
+def test_raises_a_failed_task_when_the_block_exits():
+    def fail():
+        raise ValueError("upload failed")
+
+    with pytest.raises(ValueError, match="upload failed"):
+        with BackgroundTasks(max_workers=2) as tasks:
+            tasks.submit(fail)
+
+
+def test_raises_a_failed_task_from_the_next_submit():
+    failed = threading.Event()
+
+    def fail():
+        failed.set()
+        raise ValueError("upload failed")
+
+    with BackgroundTasks(max_workers=2) as tasks:
+        tasks.submit(fail)
+        failed.wait()
+        with pytest.raises(ValueError, match="upload failed"):
+            while True:
+                tasks.submit(lambda: None)
+
+
+def test_raises_the_earliest_submitted_failure():
+    second_task_failed = threading.Event()
+
+    def fail_first():
+        second_task_failed.wait()
+        raise ValueError("first failed")
+
+    def fail_second():
+        second_task_failed.set()
+        raise ValueError("second failed")
+
+    with pytest.raises(ValueError, match="first failed"):
+        with BackgroundTasks(max_workers=2) as tasks:
+            tasks.submit(fail_first)
+            tasks.submit(fail_second)
+
+
+def test_keeps_the_error_raised_in_the_block_over_failed_tasks():
+    task_finished = threading.Event()
+
+    def fail():
+        task_finished.set()
+        raise ValueError("upload failed")
+
+    with pytest.raises(RuntimeError, match="classification failed"):
+        with BackgroundTasks(max_workers=1) as tasks:
+            tasks.submit(fail)
+            raise RuntimeError("classification failed")
+
+    assert task_finished.is_set()
@@ -1,12 +1,14 @@
 from datetime import datetime
 
 import pytest
-from dateutil.tz import UTC
+from dateutil import parser
+from dateutil.tz import UTC, tzoffset
 
 from prmdata.utils.date_converter import (
     convert_date_range_to_dates,
     convert_to_datetime_string,
     convert_to_datetimes_string,
+    parse_timestamp,
 )
 from tests.builders.common import a_datetime
 
@@ -62,3 +64,42 @@ def test_convert_to_datetimes_string_returns_datetimes_string_given_datetimes():
     expected = ["2021-11-13T02:00:00+00:00", "2022-10-13T02:00:00+00:00"]
 
     assert actual == expected
+
+
+@pytest.mark.parametrize(
+    "timestamp",
+    [
+        "2019-12-02 09:41:48.337 BST",
+        "2019-12-02 09:41:48.337 UTC",
+        "2019-12-02 09:41:48 UTC",
+        "2019-12-31T23:37:55.334+0000",
+        "2019-12-31T23:37:55.334-0130",
+        "2019-12-02T09:41:48.12Z",
+        "2022-02-23T14:00:12",
+        "2022-02-23T14:00:12.123456+01:00",
+        "0123-02-23T14:00:12+00:00",
+        "2019-12-02T09:41:48.1234567Z",
+        "02/12/2019 09:41:48 BST",
+    ],
+)
+def test_parse_timestamp_returns_same_datetime_as_dateutil(timestamp):
+    expected = parser.parse(timestamp, tzinfos={"BST": 3600, "UTC": 0})
+
+    actual = parse_timestamp(timestamp)
+
+    assert actual == expected
+    assert actual.utcoffset() == expected.utcoffset()
+    assert actual.tzname() == expected.tzname()
+
+
+def test_parse_timestamp_applies_bst_offset():
+    actual = parse_timestamp("2019-07-01 10:10:00.334 BST")
+
+    expected = datetime(2019, 7, 1, 10, 10, 0, 334000, tzinfo=tzoffset("BST", 3600))
+
+    assert actual == expected
+
+
+def test_parse_timestamp_throws_value_error_given_invalid_date():
+    with pytest.raises(ValueError):
+        parse_timestamp("2019-02-30 10:10:00.334 UTC")
@@ -0,0 +1,63 @@
+import threading
+import time
+
+import pytest
+
+from prmdata.utils.prefetch import prefetch
+
+
+def test_prefetch_yields_results_in_item_order():
+    def load(item):
+        time.sleep(0.01 * (5 - item))
+        return item * 10
+
+    actual = list(prefetch(load, range(5), max_workers=3, depth=3))
+
+    assert actual == [0, 10, 20, 30, 40]
+
+
+def test_prefetch_loads_on_demand_in_calling_thread_when_disabled():
+    loaded_on = []
+
+    def load(item):
+        loaded_on.append(threading.get_ident())
+        return item
+
+    actual = list(prefetch(load, range(3), max_workers=0, depth=2))
+
+    assert actual == [0, 1, 2]
+    assert loaded_on == [threading.get_ident()] * 3
+
+
+def test_prefetch_loads_at_most_depth_items_ahead_of_the_consumer():
+    started = []
+    item_started = threading.Condition()
+
+    def load(item):
+        with item_started:
+            started.append(item)
+            item_started.notify_all()
+        return item
+
+    results = prefetch(load, range(10), max_workers=2, depth=2)
+
+    assert next(results) == 0
+    with item_started:
+        assert item_started.wait_for(lambda: len(started) == 3, timeout=5)
+        assert sorted(started) == [0, 1, 2]
+
+    results.close()
+
+
+def test_prefetch_raises_load_error_when_its_result_is_reached():
+    def load(item):
+        if item == 2:
+            raise ValueError("bad file")
+        return item
+
+    results = prefetch(load, range(5), max_workers=2, depth=2)
+
+    assert next(results) == 0
+    assert next(results) == 1
+    with pytest.raises(ValueError, match="bad file"):
+        next(results)
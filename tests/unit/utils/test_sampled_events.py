@@ -0,0 +1,73 @@
+from unittest.mock import Mock
+
+from prmdata.utils.sampled_events import EventSummary, SampledEventCounter, log_event_summaries
+
+
+def test_counts_events_by_key_keeping_the_first_examples():
+    events = SampledEventCounter(sample_size=2)
+
+    for conversation_id in ["a", "b", "c"]:
+        if events.count("AN_EVENT", "asid-1"):
+            events.sample("AN_EVENT", "asid-1", {"conversation_id": conversation_id})
+    if events.count("AN_EVENT", "asid-2"):
+        events.sample("AN_EVENT", "asid-2", {"conversation_id": "d"})
+
+    assert events.drain() == [
+        EventSummary(
+            event="AN_EVENT",
+            counts={"asid-1": 3, "asid-2": 1},
+            samples={
+                "asid-1": [{"conversation_id": "a"}, {"conversation_id": "b"}],
+                "asid-2": [{"conversation_id": "d"}],
+            },
+        )
+    ]
+
+
+def test_keeps_no_examples_given_a_sample_size_of_zero():
+    events = SampledEventCounter(sample_size=0)
+
+    assert not events.count("AN_EVENT", "a-key")
+    assert events.drain() == [
+        EventSummary(event="AN_EVENT", counts={"a-key": 1}, samples={"a-key": []})
+    ]
+
+
+def test_draining_resets_the_counts():
+    events = SampledEventCounter(sample_size=1)
+    events.count("AN_EVENT", "a-key")
+
+    events.drain()
+
+    assert events.drain() == []
+    assert events.count("AN_EVENT", "a-key")
+
+
+def test_logs_one_summary_per_event():
+    mock_logger = Mock()
+    events = SampledEventCounter(sample_size=1)
+    events.count("AN_EVENT", "a-key")
+    events.sample("AN_EVENT", "a-key", {"guid": "abc"})
+    events.count("AN_EVENT", "another-key")
+    events.count("ANOTHER_EVENT", "a-key")
+
+    log_event_summaries(mock_logger, events)
+
+    assert mock_logger.warning.call_count == 2
+    mock_logger.warning.assert_any_call(
+        ":Summary of AN_EVENT events",
+        extra={
+            "event": "AN_EVENT_SUMMARY",
+            "total_count": 2,
+            "counts": {"a-key": 1, "another-key": 1},
+            "samples": {"a-key": [{"guid": "abc"}], "another-key": []},
+        },
+    )
+
+
+def test_logs_nothing_given_no_events():
+    mock_logger = Mock()
+
+    log_event_summaries(mock_logger, SampledEventCounter(sample_size=1))
+
+    mock_logger.warning.assert_not_called()